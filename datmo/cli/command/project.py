@@ -4,6 +4,10 @@ from datmo import __version__
 from datmo.core.util.i18n import get as __
 from datmo.core.util.json_store import JSONStore
 from datmo.core.util.remote_api import RemoteAPI
+from datmo.core.util.misc_functions import bytes2human
+from datmo.core.util.exceptions import (ProjectNotInitialized,
+                                        InvalidArgumentType, DALException,
+                                        FileStructureError)
 from datmo.cli.driver.helper import Helper
 from datmo.cli.command.base import BaseCommand
 from datmo.core.controller.project import ProjectController
@@ -247,6 +251,82 @@ class ProjectCommand(BaseCommand):
                     }))
         return False
 
+    def migrate(self, driver):
+        """Migrate command
+
+        Parameters
+        ----------
+        driver : str
+            type of DAL driver to migrate the project database to
+
+        Returns
+        -------
+        int or None
+            number of entities migrated, None if the migration failed
+        """
+        self.cli_helper.echo(
+            __("info", "cli.project.migrate", {
+                "driver_type": driver,
+                "path": self.project_controller.home
+            }))
+        try:
+            count = self.project_controller.migrate(driver_type=driver)
+        except (ProjectNotInitialized, InvalidArgumentType, DALException):
+            self.cli_helper.echo(
+                __("info", "cli.project.migrate.failure",
+                   {"driver_type": driver}))
+            return None
+        self.cli_helper.echo(
+            __("info", "cli.project.migrate.success", {
+                "count": count,
+                "driver_type": driver
+            }))
+        return count
+
+    def gc(self, dry_run):
+        """Garbage collection command
+
+        Parameters
+        ----------
+        dry_run : bool
+            if True nothing is deleted, only what would be is reported
+
+        Returns
+        -------
+        dict or None
+            report of the items deleted, None if the garbage collection failed
+        """
+        name = self.project_controller.model.name \
+            if self.project_controller.model else ""
+        path = self.project_controller.home
+        self.cli_helper.echo(
+            __("info", "cli.project.gc", {
+                "name": name,
+                "path": path
+            }))
+        try:
+            report = self.project_controller.gc(dry_run=dry_run)
+        except (ProjectNotInitialized, FileStructureError, DALException):
+            self.cli_helper.echo(
+                __("info", "cli.project.gc.failure", {
+                    "name": name,
+                    "path": path
+                }))
+            return None
+        suffix = ".dry_run" if dry_run else ""
+        for kind in sorted(report):
+            self.cli_helper.echo(
+                __("info", "cli.project.gc.kind" + suffix, {
+                    "count": report[kind]["count"],
+                    "kind": kind,
+                    "size": bytes2human(report[kind]["bytes"])
+                }))
+        total_bytes = sum(item["bytes"] for item in report.values())
+        self.cli_helper.echo(
+            __("info", "cli.project.gc" + (suffix or ".success"),
+               {"size": bytes2human(total_bytes)}))
+        return report
+
     def dashboard(self):
         if not self.project_controller.is_initialized:
             self.cli_helper.echo(
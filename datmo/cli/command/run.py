@@ -66,7 +66,9 @@ class RunCommand(ProjectCommand):
         # Get all task meta information
         self.task_controller = TaskController()
         task_objs = self.task_controller.list(
-            sort_key="created_at", sort_order="descending")
+            sort_key="created_at",
+            sort_order="descending",
+            fields=Run.LIST_FIELDS)
         header_list = [
             "id", "command", "type", "status", "config", "results",
             "created at"
@@ -195,6 +197,27 @@ class RunCommand(ProjectCommand):
                 self.cli_helper.echo(__("error", "cli.run.stop.all"))
             return False
 
+    @Helper.notify_no_project_found
+    def logs(self, **kwargs):
+        self.task_controller = TaskController()
+        task_id = kwargs.get("id", None)
+        if not task_id:
+            raise RequiredArgumentMissing()
+        try:
+            logs = self.task_controller.get_logs(
+                task_id,
+                start=kwargs.get("start", 0),
+                end=kwargs.get("end", None),
+                lines=kwargs.get("lines", None))
+        except Exception:
+            self.cli_helper.echo(__("error", "cli.run.logs", task_id))
+            return False
+        if logs is None:
+            self.cli_helper.echo(__("info", "cli.run.logs.none", task_id))
+            return False
+        self.cli_helper.echo(logs)
+        return logs
+
     @Helper.notify_environment_active(TaskController)
     @Helper.notify_no_project_found
     def delete(self, **kwargs):
@@ -538,6 +538,61 @@ class TestProjectCommand():
         assert isinstance(result, bool)
         assert result
 
+    def test_migrate(self):
+        test_name = "foobar"
+        test_description = "test model"
+        self.project_command.parse(
+            ["init", "--name", test_name, "--description", test_description])
+        _ = self.project_command.execute()
+
+        self.project_command.parse(["migrate", "--driver", "sqlite"])
+        result = self.project_command.execute()
+        assert result == 1
+        assert os.path.isfile(
+            os.path.join(self.temp_dir, ".datmo", "database",
+                         "datmo.sqlite"))
+
+        # migrating twice fails
+        self.project_command.parse(["migrate"])
+        result = self.project_command.execute()
+        assert result is None
+
+    def test_gc(self):
+        test_name = "foobar"
+        test_description = "test model"
+        self.project_command.parse(
+            ["init", "--name", test_name, "--description", test_description])
+        _ = self.project_command.execute()
+        with open(os.path.join(self.temp_dir, "test.txt"), "wb") as f:
+            f.write(to_bytes("test"))
+        filehash, _, _ = self.project_command.project_controller.file_driver.\
+            create_collection(["test.txt"])
+
+        self.project_command.parse(["gc", "--dry-run"])
+        result = self.project_command.execute()
+        assert result["collections"]["count"] == 1
+        assert self.project_command.project_controller.file_driver.\
+            exists_collection(filehash)
+
+        self.project_command.parse(["gc"])
+        result = self.project_command.execute()
+        assert result["collections"]["count"] == 1
+        assert not self.project_command.project_controller.file_driver.\
+            exists_collection(filehash)
+
+    def test_gc_not_initialized(self):
+        self.project_command.parse(["gc"])
+        result = self.project_command.execute()
+        assert result is None
+
+    def test_gc_invalid_arg(self):
+        exception_thrown = False
+        try:
+            self.project_command.parse(["gc", "--foobar"])
+        except UnrecognizedCLIArgument:
+            exception_thrown = True
+        assert exception_thrown
+
     def test_cleanup_invalid_arg(self):
         exception_thrown = False
         try:
@@ -583,6 +583,36 @@ class TestRunCommand():
         run_delete_command = self.run_command.execute()
         assert run_delete_command == True
 
+    @pytest_docker_environment_failed_instantiation(test_datmo_dir)
+    def test_run_logs(self):
+        self.__set_variables()
+        test_command = ["sh", "-c", "echo yo && echo accuracy:0.45"]
+        test_dockerfile = os.path.join(self.temp_dir, "Dockerfile")
+
+        self.run_command.parse(
+            ["run", "--environment-paths", test_dockerfile, test_command])
+        test_run_obj = self.run_command.execute()
+
+        # 1) Test all of the logs
+        self.run_command.parse(["logs", test_run_obj.id])
+        result = self.run_command.execute()
+        assert "yo" in result
+        assert "accuracy:0.45" in result
+        assert result == test_run_obj.logs
+
+        # 2) Test the last line of the logs
+        self.run_command.parse(["logs", test_run_obj.id, "--lines", "1"])
+        assert self.run_command.args.lines == 1
+        result = self.run_command.execute()
+        assert result == test_run_obj.get_logs(lines=1)
+        assert "yo" not in result
+
+    def test_run_logs_invalid_task_id(self):
+        self.__set_variables()
+        self.run_command.parse(["logs", "invalid-task-id"])
+        result = self.run_command.execute()
+        assert not result
+
     def test_run_delete_invalid_task_id(self):
         self.__set_variables()
         # Passing wrong task id
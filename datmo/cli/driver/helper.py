@@ -149,9 +149,9 @@ class Helper():
     def get_command_choices(self):
         return [
             "init", "version", "--version", "-v", "status", "cleanup",
-            "configure", "dashboard", "snapshot", "notebook", "jupyterlab",
-            "terminal", "rstudio", "environment", "run", "rerun", "stop",
-            "delete", "ls"
+            "migrate", "gc", "configure", "dashboard", "snapshot", "notebook",
+            "jupyterlab", "terminal", "rstudio", "environment", "run", "rerun",
+            "stop", "delete", "ls", "logs"
         ]
 
     def prompt_available_options(self, available_options, option_type):
@@ -303,7 +303,7 @@ class TestHelper():
         # assert same as output
         assert self.cli.get_command_choices() == [
             "init", "version", "--version", "-v", "status", "cleanup",
-            "configure", "dashboard", "snapshot", "notebook", "jupyterlab",
-            "terminal", "rstudio", "environment", "run", "rerun", "stop",
-            "delete", "ls"
+            "migrate", "gc", "configure", "dashboard", "snapshot", "notebook",
+            "jupyterlab", "terminal", "rstudio", "environment", "run", "rerun",
+            "stop", "delete", "ls", "logs"
         ]
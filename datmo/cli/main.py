@@ -42,6 +42,12 @@ def main():
         elif command_name == "cleanup":
             command_name = "project"
             sys.argv[1] = "cleanup"
+        elif command_name == "migrate":
+            command_name = "project"
+            sys.argv[1] = "migrate"
+        elif command_name == "gc":
+            command_name = "project"
+            sys.argv[1] = "gc"
         elif command_name == "dashboard":
             command_name = "project"
             sys.argv[1] = "dashboard"
@@ -72,6 +78,8 @@ def main():
             command_name = "run"
         elif command_name == "delete":  # delete command in run.py
             command_name = "run"
+        elif command_name == "logs":  # logs command in run.py
+            command_name = "run"
         command_class = cli_helper.get_command_class(command_name)
     elif len(sys.argv) == 1:
         command_name = "datmo_command"
@@ -26,6 +26,23 @@ def get_datmo_parser():
 
     cleanup_parser = subparsers.add_parser("cleanup", help="remove project")
 
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="migrate project database to another storage driver")
+    migrate_parser.add_argument(
+        "--driver",
+        dest="driver",
+        default="sqlite",
+        choices=["sqlite"],
+        help="storage driver to migrate the project database to")
+
+    gc_parser = subparsers.add_parser(
+        "gc", help="delete stored code, environments and files no longer used")
+    gc_parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="report what would be deleted without deleting anything")
+
     dashboard_parser = subparsers.add_parser(
         "dashboard", help="start dashboard")
 
@@ -301,6 +318,30 @@ def get_datmo_parser():
     delete_run_parser = subparsers.add_parser("delete", help="delete runs")
     delete_run_parser.add_argument("id", default=None, help="run id to delete")
 
+    # Logs
+    logs_run_parser = subparsers.add_parser(
+        "logs", help="view the logs of a run")
+    logs_run_parser.add_argument("id", help="run id to view the logs for")
+    logs_run_parser.add_argument(
+        "--lines",
+        "-n",
+        dest="lines",
+        default=None,
+        type=int,
+        help="number of lines to show from the end of the logs")
+    logs_run_parser.add_argument(
+        "--start",
+        dest="start",
+        default=0,
+        type=int,
+        help="byte offset to start showing the logs from, negative to count from the end")
+    logs_run_parser.add_argument(
+        "--end",
+        dest="end",
+        default=None,
+        type=int,
+        help="byte offset to stop showing the logs at, negative to count from the end")
+
     # Rerun
     rerun_parser = subparsers.add_parser(
         "rerun", help="To rerun an experiment")
@@ -4,6 +4,7 @@ from datmo.core.util.i18n import get as __
 from datmo.core.util.logger import DatmoLogger
 from datmo.core.util import get_class_contructor
 from datmo.core.util.json_store import JSONStore
+from datmo.core.util.hashing import DEFAULT_ALGORITHM
 from datmo.core.util.exceptions import (InvalidProjectPath)
 from datmo.config import Config
 
@@ -38,6 +39,16 @@ class BaseController(object):
         Return the config dictionary based on key
     get_config_defaults()
         Return the configuration defaults
+    get_storage_driver_type()
+        Return the type of DAL driver set in the project config
+    get_hash_algorithm()
+        Return the hash algorithm set in the project config
+    get_pack_collections()
+        Return whether the project config sets new file collections to be packed
+    get_code_driver_type()
+        Return the type of code driver set in the project config
+    get_private_index()
+        Return whether the project config sets git commits to use a private index
     """
 
     def __init__(self, home=None):
@@ -63,9 +74,8 @@ class BaseController(object):
         return self._file_driver
 
     @property
-    # Controller objects are only in sync if the data drivers are the same between objects
-    # Currently pass dal_driver down from controller to controller to ensure syncing dals
-    # TODO: To fix dal from different controllers so they sync within one session; they do NOT currently
+    # Controller objects are in sync since dals with the same options share their data
+    # driver within the process (see datmo.core.storage.local.dal.get_driver)
     def dal(self):
         if self._dal == None:
             dal_dict = self.config_loader("storage.local")
@@ -117,21 +127,50 @@ class BaseController(object):
         return module_details
 
     def get_config_defaults(self):
-        return {
-            "controller.code.driver": {
+        database_path = os.path.join(self.home,
+                                     Config().datmo_directory_name, "database")
+        # Read the project config once for all of the values set in it
+        project_config = self._get_project_config()
+        storage_driver_type = self.get_storage_driver_type(project_config)
+        hash_algorithm = self.get_hash_algorithm(project_config)
+        if self.get_code_driver_type(project_config) == "git":
+            code_driver = {
+                "class_constructor":
+                    "datmo.core.controller.code.driver.git.GitCodeDriver",
+                "options": {
+                    "filepath": self.home,
+                    "execpath": "git",
+                    "private_index": self.get_private_index(project_config)
+                }
+            }
+        else:
+            code_driver = {
                 "class_constructor":
                     "datmo.core.controller.code.driver.file.FileCodeDriver",
                 "options": {
                     "root": self.home,
-                    "datmo_directory_name": Config().datmo_directory_name
+                    "datmo_directory_name": Config().datmo_directory_name,
+                    "hash_algorithm": hash_algorithm
                 }
-            },
+            }
+        if storage_driver_type == "sqlite":
+            storage_driver_options = {"connection_string": database_path}
+        else:
+            storage_driver_options = {
+                "driver_type": "file",
+                "connection_string": database_path
+            }
+        return {
+            "controller.code.driver": code_driver,
             "controller.file.driver": {
                 "class_constructor":
                     "datmo.core.controller.file.driver.local.LocalFileDriver",
                 "options": {
                     "root": self.home,
-                    "datmo_directory_name": Config().datmo_directory_name
+                    "datmo_directory_name": Config().datmo_directory_name,
+                    "hash_algorithm": hash_algorithm,
+                    "pack_collections":
+                        self.get_pack_collections(project_config)
                 }
             },
             "controller.environment.driver": {
@@ -146,15 +185,113 @@ class BaseController(object):
             "storage.local": {
                 "class_constructor": "datmo.core.storage.local.dal.LocalDAL",
                 "options": {
-                    "driver_type": "blitzdb",
-                    "driver_options": {
-                        "driver_type":
-                            "file",
-                        "connection_string":
-                            os.path.join(self.home,
-                                         Config().datmo_directory_name,
-                                         "database")
-                    }
+                    "driver_type": storage_driver_type,
+                    "driver_options": storage_driver_options
                 }
             },
         }
+
+    def get_storage_driver_type(self, project_config=None):
+        """Returns the type of DAL driver set in the project config
+
+        Parameters
+        ----------
+        project_config : JSONStore, optional
+            project config already read, read from the file if not given
+
+        Returns
+        -------
+        str
+            "blitzdb" unless the project has been migrated to another driver
+        """
+        driver_type = self._get_project_config_value(
+            "storage.local.driver_type", project_config)
+        return driver_type if driver_type else "blitzdb"
+
+    def get_hash_algorithm(self, project_config=None):
+        """Returns the algorithm set in the project config to hash code and files
+
+        Parameters
+        ----------
+        project_config : JSONStore, optional
+            project config already read, read from the file if not given
+
+        Returns
+        -------
+        str
+            datmo.core.util.hashing.DEFAULT_ALGORITHM for projects created before
+            the algorithm was saved in the config
+        """
+        hash_algorithm = self._get_project_config_value(
+            "hash.algorithm", project_config)
+        return hash_algorithm if hash_algorithm else DEFAULT_ALGORITHM
+
+    def get_pack_collections(self, project_config=None):
+        """Returns whether new file collections are compressed into packs, which is
+        set with "file.collection.pack" in the project config
+
+        Parameters
+        ----------
+        project_config : JSONStore, optional
+            project config already read, read from the file if not given
+
+        Returns
+        -------
+        bool
+            False unless the project config sets it
+        """
+        return self._get_project_config_value("file.collection.pack",
+                                              project_config) is True
+
+    def get_code_driver_type(self, project_config=None):
+        """Returns the type of code driver set with "code.driver.type" in the
+        project config
+
+        Parameters
+        ----------
+        project_config : JSONStore, optional
+            project config already read, read from the file if not given
+
+        Returns
+        -------
+        str
+            "git" to keep the code in the git repository of the project, else
+            "file" unless the project config sets it
+        """
+        driver_type = self._get_project_config_value("code.driver.type",
+                                                     project_config)
+        return driver_type if driver_type else "file"
+
+    def get_private_index(self, project_config=None):
+        """Returns whether the git code driver commits from a private index,
+        without moving the branch of the user, which is set with
+        "code.git.private_index" in the project config
+
+        Parameters
+        ----------
+        project_config : JSONStore, optional
+            project config already read, read from the file if not given
+
+        Returns
+        -------
+        bool
+            False unless the project config sets it
+        """
+        return self._get_project_config_value("code.git.private_index",
+                                              project_config) is True
+
+    def _get_project_config(self):
+        """Return the project config, None if the project has no config file. Its
+        values are read from the file once and kept in memory"""
+        config_filepath = os.path.join(self.home,
+                                       Config().datmo_directory_name, ".config")
+        if os.path.isfile(config_filepath):
+            return JSONStore(config_filepath)
+        return None
+
+    def _get_project_config_value(self, key, project_config=None):
+        if project_config is None:
+            project_config = self._get_project_config()
+        if project_config is not None:
+            return project_config.get(key)
+        return None
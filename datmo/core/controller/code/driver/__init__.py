@@ -14,6 +14,8 @@ class CodeDriver(with_metaclass(ABCMeta, object)):
         delete commit reference if exists
     list_refs()
         list all commit references
+    gc(commit_ids, dry_run=False)
+        delete commit references which are not kept and their stored contents
     push_ref()
         push commit reference given
     fetch_ref()
@@ -141,6 +143,33 @@ class CodeDriver(with_metaclass(ABCMeta, object)):
         """
         pass
 
+    @abstractmethod
+    def gc(self, commit_ids, dry_run=False):
+        """Delete the commit refs which are not kept and the stored contents which
+        are not used by any remaining commit. The latest commit and recent commits,
+        which may not be recorded by a snapshot yet, are always kept
+
+        Parameters
+        ----------
+        commit_ids : list
+            commit ids of the commit refs to keep
+        dry_run : bool, optional
+            if True nothing is deleted, only what would be is reported
+            (default is False)
+
+        Returns
+        -------
+        dict
+            for each kind of item deleted, the "count" of items and the "bytes"
+            reclaimed by deleting them
+
+        Raises
+        ------
+        CodeNotInitialized
+            error if not initialized (must initialize first)
+        """
+        pass
+
     # @abstractmethod
     # def push_ref(self, commit_id="*"):
     #     """Push commit reference given
@@ -1,16 +1,19 @@
 import os
+import json
+import time
 import shutil
-import errno
 import pathspec
 import tempfile
-import hashlib
-import checksumdir
 try:
     to_unicode = str
 except NameError:
     to_unicode = str
 
-from datmo.core.util.misc_functions import list_all_filepaths
+from datmo.core.util.misc_functions import (list_all_filepaths, get_mtime_ns,
+                                            clone_file)
+from datmo.core.util.hashing import (get_filehash, get_filehashes,
+                                     get_hasher, get_dirhash_from_filehashes,
+                                     ALGORITHMS, DEFAULT_ALGORITHM)
 from datmo.core.util.i18n import get as __
 from datmo.core.util.exceptions import (PathDoesNotExist, FileIOError,
                                         UnstagedChanges, CodeNotInitialized,
@@ -19,11 +22,40 @@ from datmo.core.controller.code.driver import CodeDriver
 
 class FileCodeDriver(CodeDriver):
     """File-based Code Driver handles source control management for the project with files
+
+    Parameters
+    ----------
+    root : str
+        absolute path of the root of the project
+    datmo_directory_name : str
+        name of the datmo directory within the root
+    hash_algorithm : str, optional
+        name of the algorithm new commits are hashed with, commits hashed with
+        another algorithm are still matched by their files and can be checked out
+        (default is datmo.core.util.hashing.DEFAULT_ALGORITHM)
     """
 
-    def __init__(self, root, datmo_directory_name):
+    # Algorithm of the file hashes in commits created before the object store,
+    # whose ids are the hash of those file hashes rather than of the manifest
+    LEGACY_ALGORITHM = "md5"
+    # First line of a commit file with the algorithm the commit is hashed with,
+    # which has no comma unlike the lines of the manifest
+    ALGORITHM_HEADER_PREFIX = "#algorithm "
+    # Seconds within which a file modified before a scan is hashed again next scan
+    HASH_INDEX_MTIME_RESOLUTION = 2
+    # Seconds after which commits, and objects in no commit, are no longer in use
+    # by a running command and are deleted by gc
+    GC_MIN_AGE = 60 * 60
+
+    def __init__(self,
+                 root,
+                 datmo_directory_name,
+                 hash_algorithm=DEFAULT_ALGORITHM):
         super(FileCodeDriver, self).__init__()
         self.root = root
+        # Fail on an unsupported algorithm before anything is hashed
+        get_hasher(hash_algorithm)
+        self.hash_algorithm = hash_algorithm
         # Check if filepath exists
         if not os.path.exists(self.root):
             raise PathDoesNotExist(
@@ -32,6 +64,18 @@ class FileCodeDriver(CodeDriver):
         self._datmo_directory_path = os.path.join(self.root,
                                                   self._datmo_directory_name)
         self._code_filepath = os.path.join(self._datmo_directory_path, "code")
+        self._objects_path = os.path.join(self._code_filepath, "objects")
+        self._commits_path = os.path.join(self._code_filepath, "commits")
+        # Files are written here first and moved in place once they are complete
+        self._temp_path = os.path.join(self._code_filepath, "tmp")
+        # File with the id of the latest commit
+        self._head_filepath = os.path.join(self._code_filepath, "HEAD")
+        # Hashes from each algorithm are kept in their own index
+        self._hash_index_filepath = self._get_hash_index_filepath(
+            hash_algorithm)
+        # File with the algorithms commits are hashed with
+        self._commit_algorithms_filepath = os.path.join(
+            self._code_filepath, "cache", "algorithms.json")
         self._datmo_ignore_filepath = os.path.join(self.root, ".datmoignore")
         self._is_initialized = self.is_initialized
         self.type = "file"
@@ -49,6 +93,10 @@ class FileCodeDriver(CodeDriver):
         # Create code path if does not exist
         if not os.path.isdir(self._code_filepath):
             os.makedirs(self._code_filepath)
+        if not os.path.isdir(self._objects_path):
+            os.makedirs(self._objects_path)
+        if not os.path.isdir(self._commits_path):
+            os.makedirs(self._commits_path)
         return True
 
     def _get_tracked_files(self):
@@ -63,88 +111,312 @@ class FileCodeDriver(CodeDriver):
         list
             list of filepaths relative to the the root of the repo
         """
-        all_files = set(list_all_filepaths(self.root))
+        # Ignore the .datmo/ and .git/ folders and all contents within them
+        ignore_specs = [
+            pathspec.PathSpec.from_lines(
+                'gitwildmatch', [self._datmo_directory_name, ".git"])
+        ]
+
+        # Load ignored files from .datmoignore file if exists
+        if os.path.isfile(self._datmo_ignore_filepath):
+            with open(self._datmo_ignore_filepath, "r") as f:
+                ignore_specs.append(
+                    pathspec.PathSpec.from_lines('gitignore', f))
 
-        # Ignore the .datmo/ folder and all contents within it
-        spec = pathspec.PathSpec.from_lines('gitwildmatch',
-                                            [self._datmo_directory_name])
-        dot_datmo_files = set(spec.match_tree(self.root))
+        # Ignored directories are pruned while walking the tree
+        return [
+            filepath
+            for filepath in list_all_filepaths(self.root, ignore_specs)
+            if filepath != ".datmoignore"
+        ]
 
-        # Ignore the .git/ folder and all contents within it
-        spec = pathspec.PathSpec.from_lines('gitwildmatch', [".git"])
-        dot_git_files = set(spec.match_tree(self.root))
+    def _get_manifest(self, tracked_files, algorithm=None):
+        """Return the manifest of the tracked files, hashing them in place
 
-        # Load ignored files from .datmoignore file if exi
-        datmoignore_files = {".datmoignore"}
-        if os.path.isfile(os.path.join(self.root, ".datmoignore")):
-            with open(self._datmo_ignore_filepath, "r") as f:
-                spec = pathspec.PathSpec.from_lines('gitignore', f)
-                datmoignore_files.update(set(spec.match_tree(self.root)))
-        return list(
-            all_files - dot_datmo_files - dot_git_files - datmoignore_files)
+        Only files whose size, modification time or inode changed since they were
+        last hashed are read, the hashes of the others come from the file hash index
 
-    def _calculate_commit_hash(self, tracked_files):
-        """Return the commit hash of the repository"""
-        # Move tracked files to temp directory within _code_filepath
-        # Hash files and return hash
+        Parameters
+        ----------
+        tracked_files : list
+            list of filepaths relative to the the root of the repo
+        algorithm : str, optional
+            name of the algorithm to hash the files with
+            (default is the algorithm of the driver)
+
+        Returns
+        -------
+        list
+            list of (filepath, filehash) tuples sorted by filepath
+        """
+        manifest, _ = self._scan_files(tracked_files, algorithm=algorithm)
+        return manifest
+
+    def _scan_files(self, tracked_files, algorithm=None):
+        """Return the manifest of the tracked files as _get_manifest does, and the
+        stats they were hashed with
+
+        Returns
+        -------
+        manifest : list
+            list of (filepath, filehash) tuples sorted by filepath
+        file_stats : dict
+            [size, modification time in ns, inode] of each filepath
+        """
+        algorithm = algorithm or self.hash_algorithm
+        index = self._load_hash_index(algorithm)
+        updated_index = {}
+        tracked_filepaths = sorted(tracked_files)
+        filehashes = {}
+        file_stats = {}
+        scan_time = time.time()
+        for tracked_filepath in tracked_filepaths:
+            stat = os.stat(os.path.join(self.root, tracked_filepath))
+            file_stat = [stat.st_size, get_mtime_ns(stat), stat.st_ino]
+            entry = index.get(tracked_filepath)
+            if entry is not None and entry[:3] == file_stat:
+                filehashes[tracked_filepath] = entry[3]
+            file_stats[tracked_filepath] = (file_stat, stat.st_mtime)
+        # Hash the files which changed in parallel
+        changed_filepaths = [
+            tracked_filepath for tracked_filepath in tracked_filepaths
+            if tracked_filepath not in filehashes
+        ]
+        filehashes.update(
+            zip(changed_filepaths,
+                get_filehashes(
+                    [
+                        os.path.join(self.root, tracked_filepath)
+                        for tracked_filepath in changed_filepaths
+                    ],
+                    algorithm=algorithm)))
+        for tracked_filepath in tracked_filepaths:
+            file_stat, mtime = file_stats[tracked_filepath]
+            # A file modified within the mtime resolution of the scan can change
+            # again without changing its stat, so it is hashed again next time
+            if mtime < scan_time - self.HASH_INDEX_MTIME_RESOLUTION:
+                updated_index[tracked_filepath] = file_stat + [
+                    filehashes[tracked_filepath]
+                ]
+        if updated_index != index:
+            self._save_hash_index(updated_index, algorithm)
+        manifest = [(tracked_filepath, filehashes[tracked_filepath])
+                    for tracked_filepath in tracked_filepaths]
+        return manifest, {
+            tracked_filepath: file_stat
+            for tracked_filepath, (file_stat, _) in file_stats.items()
+        }
+
+    def _get_hash_index_filepath(self, algorithm):
+        return os.path.join(self._code_filepath, "cache",
+                            "index-%s.json" % algorithm)
+
+    def _load_hash_index(self, algorithm=None):
+        """Return the file hash index, a dictionary of filepaths relative to the
+        root to a list of the size, mtime in ns, inode and hash of the file"""
+        return self._load_cache_file(
+            self._get_hash_index_filepath(algorithm or self.hash_algorithm),
+            {})
+
+    def _save_hash_index(self, index, algorithm=None):
+        self._save_cache_file(
+            self._get_hash_index_filepath(algorithm or self.hash_algorithm),
+            index)
+
+    @staticmethod
+    def _load_cache_file(cache_filepath, default):
+        if not os.path.isfile(cache_filepath):
+            return default
         try:
-            temp_dir = tempfile.mkdtemp(dir=self._code_filepath)
-            for rel_filepath in tracked_files:
-                # Ensure new directory will exist in the temp dir
-                filename = os.path.basename(rel_filepath)
-                rel_dirpath = rel_filepath.replace(filename, "")
-                new_dirpath = os.path.join(temp_dir, rel_dirpath)
-                # Ensure directory exists
-                if not os.path.isdir(new_dirpath):
-                    os.makedirs(new_dirpath)
-                # Move individual file from old_filepath to new_filepath
-                old_filepath = os.path.join(self.root, rel_filepath)
-                new_filepath = os.path.join(new_dirpath, filename)
-                shutil.copy2(old_filepath, new_filepath)
-            return self._get_dirhash(temp_dir)
-        finally:
-            try:
-                shutil.rmtree(temp_dir)  # delete directory
-            except OSError as exc:
-                if exc.errno != errno.ENOENT:  # ENOENT - no such file or directory
-                    raise  # re-raise exception
+            with open(cache_filepath, "r") as f:
+                return json.load(f)
+        except ValueError:
+            # A corrupt cache file is rebuilt as if it did not exist
+            return default
 
     @staticmethod
-    def _get_filehash(absolute_filepath):
-        if not os.path.isfile(absolute_filepath):
-            raise PathDoesNotExist(
-                __("error", "util.misc_functions.get_filehash",
-                   absolute_filepath))
-        BUFF_SIZE = 65536
-        sha1 = hashlib.md5()
-        with open(absolute_filepath, "rb") as f:
-            while True:
-                data = f.read(BUFF_SIZE)
-                if not data:
-                    break
-                sha1.update(data)
-        return sha1.hexdigest()
+    def _save_cache_file(cache_filepath, value):
+        cache_dirpath = os.path.dirname(cache_filepath)
+        if not os.path.isdir(cache_dirpath):
+            os.makedirs(cache_dirpath)
+        temp_cache_filepath = cache_filepath + ".tmp"
+        with open(temp_cache_filepath, "w") as f:
+            json.dump(value, f)
+        os.replace(temp_cache_filepath, cache_filepath)
 
     @staticmethod
-    def _get_dirhash(absolute_dirpath):
-        return checksumdir.dirhash(absolute_dirpath)
+    def _get_manifest_lines(manifest):
+        return [
+            tracked_filepath + "," + filehash + "\n"
+            for tracked_filepath, filehash in manifest
+        ]
+
+    def _get_manifest_hash(self, manifest, algorithm=None):
+        """Return the commit hash for the manifest, which is the hash of the
+        manifest lines of the commit file written for it"""
+        manifest_hash = get_hasher(algorithm or self.hash_algorithm)
+        for line in self._get_manifest_lines(manifest):
+            manifest_hash.update(line.encode("utf-8"))
+        return manifest_hash.hexdigest()
+
+    def _calculate_commit_hash(self, tracked_files):
+        """Return the commit hash of the repository"""
+        return self._get_manifest_hash(self._get_manifest(tracked_files))
+
+    def _find_commit_hash(self, manifest):
+        """Return the id of the existing commit with the files of the manifest, None
+        if there is none. The files are hashed again with each other algorithm
+        commits are hashed with, so commits keep matching an unchanged tree after
+        the algorithm of the project changes. Commits created before the object
+        store are found by the hash of their file hashes"""
+        manifests = {self.hash_algorithm: manifest}
+        algorithms = [self.hash_algorithm] + [
+            algorithm for algorithm in self._get_commit_algorithms()
+            if algorithm != self.hash_algorithm
+        ]
+        for algorithm in algorithms:
+            if algorithm not in manifests:
+                manifests[algorithm] = self._get_manifest(
+                    [tracked_filepath for tracked_filepath, _ in manifest],
+                    algorithm=algorithm)
+            commit_hash = self._get_manifest_hash(manifests[algorithm],
+                                                  algorithm)
+            if self.exists_ref(commit_hash):
+                return commit_hash
+            if algorithm == self.LEGACY_ALGORITHM:
+                legacy_commit_hash = get_dirhash_from_filehashes(
+                    [filehash for _, filehash in manifests[algorithm]],
+                    algorithm=algorithm)
+                if self.exists_ref(legacy_commit_hash):
+                    return legacy_commit_hash
+        return None
+
+    def _get_commit_algorithms(self):
+        """Return the names of the algorithms the commits are hashed with, which are
+        found from the commits once and then kept in a cache file"""
+        commit_algorithms = self._load_cache_file(
+            self._commit_algorithms_filepath, None)
+        if commit_algorithms is None:
+            commit_algorithms = sorted(
+                set(
+                    self._get_commit_algorithm(commit_id)
+                    for commit_id in self.list_refs()))
+            self._save_cache_file(self._commit_algorithms_filepath,
+                                  commit_algorithms)
+        return commit_algorithms
+
+    def _add_commit_algorithm(self, algorithm):
+        commit_algorithms = self._get_commit_algorithms()
+        if algorithm not in commit_algorithms:
+            self._save_cache_file(self._commit_algorithms_filepath,
+                                  sorted(commit_algorithms + [algorithm]))
+
+    def _get_commit_algorithm(self, commit_id):
+        """Return the name of the algorithm the commit is hashed with
+
+        Commits created before the object store are hashed with LEGACY_ALGORITHM.
+        Commits created before the algorithm was written in their file are hashed
+        with the algorithm which gives their id from their manifest
+        """
+        commit_filepath = self._get_commit_filepath(commit_id)
+        if os.path.dirname(commit_filepath) != self._commits_path:
+            return self.LEGACY_ALGORITHM
+        algorithm, manifest = self._read_commit(commit_id)
+        if algorithm is not None:
+            return algorithm
+        for algorithm in [DEFAULT_ALGORITHM] + sorted(ALGORITHMS):
+            if self._get_manifest_hash(manifest, algorithm) == commit_id:
+                return algorithm
+        return DEFAULT_ALGORITHM
+
+    def _get_object_path(self, filehash):
+        """Return the path of the object with the file contents in the store"""
+        return os.path.join(self._objects_path, filehash[:2], filehash[2:])
+
+    def _write_object(self, absolute_filepath, filehash, file_stat):
+        """Add the file to the object store unless an object with the same contents
+        is already stored by another commit
+
+        Parameters
+        ----------
+        absolute_filepath : str
+            absolute path of the file to store
+        filehash : str
+            hash of the file when it was hashed
+        file_stat : list
+            [size, modification time in ns, inode] of the file when it was hashed
+
+        Returns
+        -------
+        str
+            hash of the stored contents, which is different from filehash if the
+            file was changed after it was hashed
+        """
+        if os.path.isfile(self._get_object_path(filehash)):
+            return filehash
+        # Write to a temp file first so partially written objects are never used
+        temp_object_path = self._get_temp_filepath()
+        try:
+            shutil.copy2(absolute_filepath, temp_object_path)
+            # The copy keeps the modification time, so it is the same file
+            # as was hashed if its size and modification time are the same
+            temp_object_stat = os.stat(temp_object_path)
+            if [temp_object_stat.st_size, get_mtime_ns(temp_object_stat)] != \
+                    file_stat[:2]:
+                filehash = self._get_filehash(temp_object_path)
+            object_path = self._get_object_path(filehash)
+            if os.path.isfile(object_path):
+                os.remove(temp_object_path)
+                return filehash
+            object_dirpath = os.path.dirname(object_path)
+            if not os.path.isdir(object_dirpath):
+                os.makedirs(object_dirpath)
+            os.rename(temp_object_path, object_path)
+        except (IOError, OSError):
+            if os.path.isfile(temp_object_path):
+                os.remove(temp_object_path)
+            raise
+        return filehash
+
+    def _get_temp_filepath(self):
+        """Return the path of a new empty temp file, which is outside of the object
+        store so partially written files are never taken for objects"""
+        if not os.path.isdir(self._temp_path):
+            os.makedirs(self._temp_path)
+        fd, temp_filepath = tempfile.mkstemp(dir=self._temp_path)
+        os.close(fd)
+        return temp_filepath
+
+    def _get_commit_source_filepath(self, tracked_filepath, filehash):
+        """Return the path of the stored contents of a file in a commit. Commits
+        created before the object store keep a copy of the file per path"""
+        object_path = self._get_object_path(filehash)
+        if os.path.isfile(object_path):
+            return object_path
+        return os.path.join(self._code_filepath, tracked_filepath, filehash)
+
+    def _get_filehash(self, absolute_filepath):
+        return get_filehash(absolute_filepath, algorithm=self.hash_algorithm)
 
     def _has_unstaged_changes(self):
         """Return whether there are unstaged changes"""
         # TODO: fix circular logic: for empty tracked filepaths, must return "unstaged" until commit is created.
         # TODO: otherwise initial commit will always fail because of no unstaged changes
         tracked_filepaths = self._get_tracked_files()
-        commit_hash = self._calculate_commit_hash(tracked_filepaths)
-        if self.exists_ref(commit_hash):
-            return False
-        return True
+        manifest = self._get_manifest(tracked_filepaths)
+        return self._find_commit_hash(manifest) is None
 
     def current_hash(self):
-        self.check_unstaged_changes()
+        if not self.is_initialized:
+            raise CodeNotInitialized()
         # Find all tracked files (_get_tracked_files)
         tracked_filepaths = self._get_tracked_files()
-        # Return hash of the files (_calculate_commit_hash)
-        return self._calculate_commit_hash(tracked_filepaths)
+        # Return the commit of the files if they are committed
+        commit_hash = self._find_commit_hash(
+            self._get_manifest(tracked_filepaths))
+        if commit_hash is None:
+            raise UnstagedChanges()
+        return commit_hash
 
     def create_ref(self, commit_id=None):
         """Add all files except for those in .datmoignore, and make a commit
@@ -180,35 +452,76 @@ class FileCodeDriver(CodeDriver):
                        "controller.code.driver.file.create_ref.no_commit",
                        commit_id))
             return commit_id
-        # Find all tracked files (_get_tracked_files)
-        tracked_filepaths = self._get_tracked_files()
-        # Create the hash of the files (_calculate_commit_hash)
-        commit_hash = self._calculate_commit_hash(tracked_filepaths)
-        # Check if the hash already exists with exists_ref
-        if self.exists_ref(commit_hash):
-            return commit_hash
-        # Create a new file with the commit hash if it is new, else ERROR (no changes)
-        commit_filepath = os.path.join(self._code_filepath, commit_hash)
-        with open(commit_filepath, "a+") as f:
-            # Loop through the tracked files
-            for tracked_filepath in tracked_filepaths:
-                absolute_filepath = os.path.join(self.root, tracked_filepath)
-                absolute_dirpath = os.path.join(self._code_filepath,
-                                                tracked_filepath)
-                # 1) create dir for file (use path name from tracked files list) -- if already exists skip
-                if not os.path.isdir(absolute_dirpath):
-                    os.makedirs(absolute_dirpath)
-                # 2) hash the file
-                filehash = self._get_filehash(absolute_filepath)
-                # 3) add file with file hash as name to folder for the file (if already exists, will overwrite file -- new ts)
-                new_absolute_filepath = os.path.join(absolute_dirpath,
-                                                     filehash)
-                shutil.copy2(absolute_filepath, new_absolute_filepath)
-                # 4) append a line into the new file for the commit hash with the following "filepath, filehash"
-                f.write(tracked_filepath + "," + filehash + "\n")
+        # Find all tracked files (_get_tracked_files) and hash them in place
+        manifest, file_stats = self._scan_files(self._get_tracked_files())
+        # Return the existing commit of the files, if any
+        existing_commit_hash = self._find_commit_hash(manifest)
+        if existing_commit_hash is not None:
+            return existing_commit_hash
+        # Add the contents of each file to the object store, if not already stored.
+        # Hashes change if files are changed while they are stored
+        if not os.path.isdir(self._objects_path):
+            os.makedirs(self._objects_path)
+        manifest = [(tracked_filepath,
+                     self._write_object(
+                         os.path.join(self.root, tracked_filepath), filehash,
+                         file_stats[tracked_filepath]))
+                    for tracked_filepath, filehash in manifest]
+        # Create the hash of the manifest
+        commit_hash = self._get_manifest_hash(manifest)
+        # Write the manifest as the file for the commit once all objects exist
+        if not os.path.isdir(self._commits_path):
+            os.makedirs(self._commits_path)
+        commit_filepath = os.path.join(self._commits_path, commit_hash)
+        temp_commit_filepath = self._get_temp_filepath()
+        with open(temp_commit_filepath, "w") as f:
+            f.write(to_unicode(self.ALGORITHM_HEADER_PREFIX +
+                               self.hash_algorithm + "\n"))
+            f.writelines(self._get_manifest_lines(manifest))
+        self._add_commit_algorithm(self.hash_algorithm)
+        os.rename(temp_commit_filepath, commit_filepath)
+        self._write_head(commit_hash)
         # Return commit hash if success else ERROR
         return commit_hash
 
+    def _get_commit_filepath(self, commit_id):
+        """Return the path of the file of the commit, or None if it does not exist.
+        Commits created before the commits directory are in the code directory"""
+        if not commit_id or os.path.basename(commit_id) != commit_id or \
+                commit_id == os.path.basename(self._head_filepath):
+            return None
+        commit_filepath = os.path.join(self._commits_path, commit_id)
+        if os.path.isfile(commit_filepath):
+            return commit_filepath
+        legacy_commit_filepath = os.path.join(self._code_filepath, commit_id)
+        if os.path.isfile(legacy_commit_filepath):
+            return legacy_commit_filepath
+        return None
+
+    def _read_head(self):
+        if not os.path.isfile(self._head_filepath):
+            return None
+        with open(self._head_filepath, "r") as f:
+            return f.read().strip()
+
+    def _write_head(self, commit_id):
+        temp_head_filepath = self._get_temp_filepath()
+        with open(temp_head_filepath, "w") as f:
+            f.write(to_unicode(commit_id))
+        os.replace(temp_head_filepath, self._head_filepath)
+
+    def _find_latest_ref(self):
+        """Return the commit whose file was written last, None if there are none"""
+
+        def getmtime(commit_id):
+            # Keeping it granular as timestaps in git
+            return int(os.path.getmtime(self._get_commit_filepath(commit_id)))
+
+        commit_ids = self.list_refs()
+        if not commit_ids:
+            return None
+        return max(commit_ids, key=getmtime)
+
     def current_ref(self):
         """Returns the current ref of the code (may not be a commit id, if not saved)
 
@@ -225,7 +538,11 @@ class FileCodeDriver(CodeDriver):
         if not self.is_initialized:
             raise CodeNotInitialized()
         tracked_filepaths = self._get_tracked_files()
-        return self._calculate_commit_hash(tracked_filepaths)
+        manifest = self._get_manifest(tracked_filepaths)
+        commit_hash = self._find_commit_hash(manifest)
+        if commit_hash is None:
+            return self._get_manifest_hash(manifest)
+        return commit_hash
 
     def latest_ref(self):
         """Returns the latest ref of the code
@@ -237,22 +554,11 @@ class FileCodeDriver(CodeDriver):
         """
         if not self.is_initialized:
             raise CodeNotInitialized()
-
-        def getmtime(absolute_filepath):
-            # Keeping it granular as timestaps in git
-            return int(os.path.getmtime(absolute_filepath))
-
-        # List all files in the code directory (ignore directories)
-        for _, _, commit_hashes in os.walk(self._code_filepath):
-            sorted_commit_hashes = sorted(
-                [
-                    os.path.join(self._code_filepath, commit_hash)
-                    for commit_hash in commit_hashes
-                ],
-                key=getmtime,
-                reverse=True)
-            _, filename = os.path.split(sorted_commit_hashes[0])
-            return filename
+        commit_id = self._read_head()
+        if self.exists_ref(commit_id):
+            return commit_id
+        # Projects created before the HEAD file find the latest commit file
+        return self._find_latest_ref()
 
     def exists_ref(self, commit_id):
         """Returns a boolean if the commit exists
@@ -274,12 +580,7 @@ class FileCodeDriver(CodeDriver):
         """
         if not self.is_initialized:
             raise CodeNotInitialized()
-        # List all files in code directory
-        commit_hashes = self.list_refs()
-        # Check if commit_id exists in the list
-        if commit_id in commit_hashes:
-            return True
-        return False
+        return self._get_commit_filepath(commit_id) is not None
 
     def delete_ref(self, commit_id):
         """Removes the commit hash file, but not the file references
@@ -294,8 +595,14 @@ class FileCodeDriver(CodeDriver):
         if not self.exists_ref(commit_id):
             raise FileIOError(
                 __("error", "controller.code.driver.file.delete_ref"))
-        commit_filepath = os.path.join(self._code_filepath, commit_id)
-        os.remove(commit_filepath)
+        os.remove(self._get_commit_filepath(commit_id))
+        # Move the HEAD back to the latest remaining commit
+        if self._read_head() == commit_id:
+            latest_commit_id = self._find_latest_ref()
+            if latest_commit_id:
+                self._write_head(latest_commit_id)
+            else:
+                os.remove(self._head_filepath)
         return True
 
     def list_refs(self):
@@ -308,9 +615,93 @@ class FileCodeDriver(CodeDriver):
         """
         if not self.is_initialized:
             raise CodeNotInitialized()
-        # List all files in the code directory (ignore directories)
-        for _, _, commit_hashes in os.walk(self._code_filepath):
-            return commit_hashes
+        commit_hashes = os.listdir(self._commits_path) \
+            if os.path.isdir(self._commits_path) else []
+        # Commits created before the commits directory are files in the code directory
+        for filename in os.listdir(self._code_filepath):
+            if filename != os.path.basename(self._head_filepath) and \
+                    os.path.isfile(os.path.join(self._code_filepath, filename)):
+                commit_hashes.append(filename)
+        return commit_hashes
+
+    def gc(self, commit_ids, dry_run=False):
+        """Delete the commits which are not kept and the objects which are not in
+        any remaining commit. The commit in HEAD is always kept, and commits and
+        objects which are in no commit at all are only deleted once they are
+        GC_MIN_AGE seconds old, so those of a commit being created, which is not
+        recorded by a snapshot yet, are kept. Copies of files kept per path by
+        commits created before the object store are left in place
+
+        Parameters
+        ----------
+        commit_ids : list
+            ids of the commits to keep, along with HEAD and the recent commits
+        dry_run : bool, optional
+            if True nothing is deleted, only what would be is reported
+            (default is False)
+
+        Returns
+        -------
+        dict
+            "commits" and "objects" each with the "count" of items and the "bytes"
+            reclaimed by deleting them
+
+        Raises
+        ------
+        CodeNotInitialized
+            error if not initialized (must initialize first)
+        """
+        if not self.is_initialized:
+            raise CodeNotInitialized()
+        commit_ids = set(commit_ids)
+        commit_ids.add(self._read_head())
+        now = time.time()
+        deleted_commit_ids = []
+        filehashes, deleted_filehashes = set(), set()
+        for commit_id in self.list_refs():
+            manifest_filehashes = set(
+                filehash for _, filehash in self._read_manifest(commit_id))
+            if commit_id in commit_ids or now - os.path.getmtime(
+                    self._get_commit_filepath(commit_id)) < self.GC_MIN_AGE:
+                filehashes.update(manifest_filehashes)
+            else:
+                deleted_commit_ids.append(commit_id)
+                deleted_filehashes.update(manifest_filehashes)
+        commit_bytes = sum(
+            os.path.getsize(self._get_commit_filepath(commit_id))
+            for commit_id in deleted_commit_ids)
+        object_paths, object_bytes = [], 0
+        object_dirnames = os.listdir(self._objects_path) \
+            if os.path.isdir(self._objects_path) else []
+        for object_dirname in object_dirnames:
+            object_dirpath = os.path.join(self._objects_path, object_dirname)
+            if not os.path.isdir(object_dirpath):
+                continue
+            for filename in os.listdir(object_dirpath):
+                filehash = object_dirname + filename
+                if filehash in filehashes:
+                    continue
+                object_stat = os.lstat(os.path.join(object_dirpath, filename))
+                if filehash not in deleted_filehashes and \
+                        now - object_stat.st_ctime < self.GC_MIN_AGE:
+                    continue
+                object_paths.append(os.path.join(object_dirpath, filename))
+                object_bytes += object_stat.st_size
+        if not dry_run:
+            for commit_id in deleted_commit_ids:
+                self.delete_ref(commit_id)
+            for object_path in object_paths:
+                os.remove(object_path)
+        return {
+            "commits": {
+                "count": len(deleted_commit_ids),
+                "bytes": commit_bytes
+            },
+            "objects": {
+                "count": len(object_paths),
+                "bytes": object_bytes
+            }
+        }
 
     def check_unstaged_changes(self):
         """Checks if there exists any unstaged changes for code. Returns False if it's already staged
@@ -348,26 +739,88 @@ class FileCodeDriver(CodeDriver):
         if not self.exists_ref(commit_id):
             raise FileIOError(
                 __("error", "controller.code.driver.file.checkout_ref"))
-        # Check if unstaged changes exist
-        if self._has_unstaged_changes():
+        # Check if unstaged changes exist, hashing the tracked files once
+        current_manifest = self._get_manifest(self._get_tracked_files())
+        current_commit_hash = self._find_commit_hash(current_manifest)
+        if current_commit_hash is None:
             raise UnstagedChanges()
         # Check if commit given is same as current
-        tracked_filepaths = self._get_tracked_files()
-        if self._calculate_commit_hash(tracked_filepaths) == commit_id:
+        if current_commit_hash == commit_id:
             return True
-        # Remove all tracked files from repository
-        for tracked_filepath in self._get_tracked_files():
-            absolute_filepath = os.path.join(self.root, tracked_filepath)
-            os.remove(absolute_filepath)
-        # Add in files from the commit
-        commit_filepath = os.path.join(self._code_filepath, commit_id)
+        # Only files which are not in the commit or whose contents differ change,
+        # so the files are compared by their hash with the algorithm of the commit
+        commit_algorithm = self._get_commit_algorithm(commit_id)
+        if commit_algorithm != self.hash_algorithm:
+            current_manifest = self._get_manifest(
+                [tracked_filepath for tracked_filepath, _ in current_manifest],
+                algorithm=commit_algorithm)
+        current_filehashes = dict(current_manifest)
+        commit_filehashes = dict(self._read_manifest(commit_id))
+        removed_filepaths = [
+            tracked_filepath for tracked_filepath in current_filehashes
+            if tracked_filepath not in commit_filehashes
+        ]
+        changed_filepaths = [
+            tracked_filepath
+            for tracked_filepath, filehash in commit_filehashes.items()
+            if current_filehashes.get(tracked_filepath) != filehash
+        ]
+        # Remove files first, so directories replaced by files are emptied
+        for tracked_filepath in removed_filepaths:
+            os.remove(os.path.join(self.root, tracked_filepath))
+            self._remove_empty_dirpaths(os.path.dirname(tracked_filepath))
+        # Add in the new and changed files from the commit
+        for tracked_filepath in changed_filepaths:
+            self._checkout_object(
+                self._get_commit_source_filepath(
+                    tracked_filepath, commit_filehashes[tracked_filepath]),
+                os.path.join(self.root, tracked_filepath))
+        return True
+
+    def _read_manifest(self, commit_id):
+        """Return the manifest in the file of the commit"""
+        return self._read_commit(commit_id)[1]
+
+    def _read_commit(self, commit_id):
+        """Return the name of the algorithm written in the file of the commit, None
+        for commits created before it was written, and the manifest of the commit"""
+        commit_filepath = self._get_commit_filepath(commit_id)
+        algorithm, manifest = None, []
         with open(commit_filepath, "r") as f:
             for line in f:
-                tracked_filepath, filehash = line.rstrip().split(",")
-                source_absolute_filepath = os.path.join(
-                    self._code_filepath, tracked_filepath, filehash)
-                destination_absolute_filepath = os.path.join(
-                    self.root, tracked_filepath)
-                shutil.copy2(source_absolute_filepath,
-                             destination_absolute_filepath)
-        return True
+                line = line.rstrip("\n")
+                if not manifest and algorithm is None and "," not in line and \
+                        line.startswith(self.ALGORITHM_HEADER_PREFIX):
+                    algorithm = line[len(self.ALGORITHM_HEADER_PREFIX):]
+                    continue
+                tracked_filepath, filehash = line.rsplit(",", 1)
+                manifest.append((tracked_filepath, filehash))
+        return algorithm, manifest
+
+    def _checkout_object(self, source_absolute_filepath,
+                         destination_absolute_filepath):
+        """Replace the file with the stored contents, reflinked where the filesystem
+        supports it. Objects are never hardlinked, since changes to the file in place
+        would change the stored contents"""
+        destination_dirpath = os.path.dirname(destination_absolute_filepath)
+        if not os.path.isdir(destination_dirpath):
+            os.makedirs(destination_dirpath)
+        # Write to a temp file first so a file is never partially checked out
+        fd, temp_filepath = tempfile.mkstemp(dir=destination_dirpath)
+        os.close(fd)
+        try:
+            clone_file(source_absolute_filepath, temp_filepath)
+            os.replace(temp_filepath, destination_absolute_filepath)
+        except (IOError, OSError):
+            if os.path.isfile(temp_filepath):
+                os.remove(temp_filepath)
+            raise
+
+    def _remove_empty_dirpaths(self, tracked_dirpath):
+        """Remove the directory and its parents within the root if they are empty"""
+        while tracked_dirpath:
+            try:
+                os.rmdir(os.path.join(self.root, tracked_dirpath))
+            except OSError:
+                return
+            tracked_dirpath = os.path.dirname(tracked_dirpath)
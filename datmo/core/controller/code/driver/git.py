@@ -1,5 +1,8 @@
 import os
+import time
 import shutil
+import weakref
+import threading
 import subprocess
 import semver
 from io import open
@@ -22,28 +25,313 @@ except TypeError:
 from giturlparse import parse
 
 from datmo.core.util.i18n import get as __
+from datmo.core.util.misc_functions import get_mtime_ns
 from datmo.core.util.exceptions import (
     PathDoesNotExist, GitUrlArgumentError, GitExecutionError, FileIOError,
     CommitDoesNotExist, CommitFailed, DatmoFolderInWorkTree, UnstagedChanges)
 from datmo.core.controller.code.driver import CodeDriver
 from datmo.config import Config
 
+class GitCatFile(object):
+    """Long-lived `git cat-file` process to look up objects without forking git
+    for each lookup. Object names are written to its stdin in batches and the
+    process is stopped by close, or when the object is garbage collected or the
+    interpreter exits
+
+    Parameters
+    ----------
+    filepath : str
+        path of the git repository
+    execpath : str
+        path of the git executable
+    mode : str, optional
+        "batch-check" to read the type and size of objects, or "batch" to
+        also read their contents
+        (default is "batch-check")
+
+    Methods
+    -------
+    check(names)
+        return the id, type and size of objects
+    read(name)
+        return the type and contents of an object
+    close()
+        stop the git process
+    """
+
+    # Names written before reading their results, small enough that neither the
+    # input nor the output of a batch fills up a pipe buffer
+    BATCH_SIZE = 256
+    # Seconds within which a directory modified before the process started may
+    # have been modified again without changing its modification time
+    MTIME_RESOLUTION = 2
+
+    def __init__(self, filepath, execpath, mode="batch-check"):
+        self.filepath = filepath
+        self.execpath = execpath
+        self.mode = mode
+        self._objects_dirpath = os.path.join(filepath, ".git", "objects")
+        self._process = None
+        self._finalizer = None
+        self._lock = threading.Lock()
+        # Modification times of the object directories when the process started
+        self._objects_mtimes = {}
+        self._started_at = None
+
+    def _ensure_process(self):
+        if self._is_running():
+            return self._process
+        self._started_at = time.time()
+        self._objects_mtimes = self._get_objects_mtimes()
+        try:
+            self._process = subprocess.Popen(
+                [self.execpath, "cat-file", "--" + self.mode],
+                cwd=self.filepath,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise GitExecutionError(
+                __("error", "controller.code.driver.git.run",
+                   ("cat-file --" + self.mode, str(e))))
+        if self._finalizer is not None:
+            self._finalizer.detach()
+        self._finalizer = weakref.finalize(self, GitCatFile._stop,
+                                           self._process)
+        return self._process
+
+    @staticmethod
+    def _stop(process):
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+                process.wait()
+        process.stdout.close()
+
+    def _get_objects_mtimes(self):
+        """Return the modification time in ns of each directory of objects"""
+        objects_mtimes = {}
+        if os.path.isdir(self._objects_dirpath):
+            for dirname in os.listdir(self._objects_dirpath):
+                mtime_ns = self._get_mtime_ns(
+                    os.path.join(self._objects_dirpath, dirname))
+                if mtime_ns is not None:
+                    objects_mtimes[dirname] = mtime_ns
+        return objects_mtimes
+
+    @staticmethod
+    def _get_mtime_ns(dirpath):
+        try:
+            return get_mtime_ns(os.stat(dirpath))
+        except OSError:
+            return None
+
+    def _has_new_objects(self, names):
+        """Return whether objects the names may refer to were written since the
+        process started. git caches the loose objects in a directory when it looks
+        up abbreviated ids and the packs it has opened, while refs and HEAD are
+        read again on each lookup"""
+        dirnames = set(["pack"])
+        for name in names:
+            prefix = name[:2].lower()
+            if len(prefix) == 2 and all(
+                    char in "0123456789abcdef" for char in prefix):
+                dirnames.add(prefix)
+        racy_mtime_ns = (self._started_at - self.MTIME_RESOLUTION) * 1e9
+        for dirname in dirnames:
+            mtime_ns = self._get_mtime_ns(
+                os.path.join(self._objects_dirpath, dirname))
+            if mtime_ns != self._objects_mtimes.get(dirname):
+                return True
+            # Changes right after an earlier change may keep the same mtime
+            if mtime_ns is not None and mtime_ns >= racy_mtime_ns:
+                return True
+        return False
+
+    @staticmethod
+    def _parse_header(line):
+        """Return the id, type and size in an output line, None if missing"""
+        parts = line.decode().split()
+        if len(parts) != 3 or not parts[2].isdigit():
+            return None
+        return parts[0], parts[1], int(parts[2])
+
+    def check(self, names):
+        """Return the id, type and size of objects
+
+        Parameters
+        ----------
+        names : list
+            names of the objects, anything git rev-parse accepts
+            (e.g. "HEAD", "<commit id>^{commit}")
+
+        Returns
+        -------
+        list
+            (id, type, size) tuple for each name, None if there is no object
+
+        Raises
+        ------
+        GitExecutionError
+            if the git process fails
+        """
+        names = list(names)
+        with self._lock:
+            is_running = self._is_running()
+            results = self._check_batches(names)
+            missing_names = [
+                name for name, result in zip(names, results) if result is None
+            ]
+            if missing_names and is_running and \
+                    self._has_new_objects(missing_names):
+                # git caches the object directories when it looks up abbreviated
+                # ids, so objects written since then are looked up again
+                self.close()
+                retried_results = dict(
+                    zip(missing_names, self._check_batches(missing_names)))
+                results = [
+                    result if result is not None else retried_results[name]
+                    for name, result in zip(names, results)
+                ]
+        return results
+
+    def _is_running(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _check_batches(self, names):
+        results = []
+        for idx in range(0, len(names), self.BATCH_SIZE):
+            results.extend(self._check_batch(names[idx:idx + self.BATCH_SIZE]))
+        return results
+
+    def _check_batch(self, names):
+        # Names with newlines would be split into several requests
+        valid_names = [name for name in names if name and "\n" not in name]
+        headers = {}
+        if valid_names:
+            process = self._ensure_process()
+            try:
+                process.stdin.write(
+                    to_bytes("".join(name + "\n" for name in valid_names)))
+                process.stdin.flush()
+                for name in valid_names:
+                    line = process.stdout.readline()
+                    if not line:
+                        raise IOError("git cat-file exited")
+                    header = self._parse_header(line)
+                    if header and self.mode == "batch":
+                        # Skip the contents and the newline after them
+                        process.stdout.read(header[2] + 1)
+                    headers[name] = header
+            except (IOError, OSError) as e:
+                self.close()
+                raise GitExecutionError(
+                    __("error", "controller.code.driver.git.run",
+                       ("cat-file --" + self.mode, str(e))))
+        return [headers.get(name) for name in names]
+
+    def read(self, name):
+        """Return the type and contents of an object, in batch mode only
+
+        Parameters
+        ----------
+        name : str
+            name of the object
+
+        Returns
+        -------
+        tuple or None
+            (type, contents) of the object, None if there is no object
+
+        Raises
+        ------
+        GitExecutionError
+            if the git process fails
+        """
+        if not name or "\n" in name:
+            return None
+        with self._lock:
+            is_running = self._is_running()
+            result = self._read(name)
+            if result is None and is_running and \
+                    self._has_new_objects([name]):
+                # objects written since git cached the object directories
+                self.close()
+                result = self._read(name)
+        return result
+
+    def _read(self, name):
+        process = self._ensure_process()
+        try:
+            process.stdin.write(to_bytes(name + "\n"))
+            process.stdin.flush()
+            line = process.stdout.readline()
+            if not line:
+                raise IOError("git cat-file exited")
+            header = self._parse_header(line)
+            if header is None:
+                return None
+            contents = process.stdout.read(header[2] + 1)[:-1]
+        except (IOError, OSError) as e:
+            self.close()
+            raise GitExecutionError(
+                __("error", "controller.code.driver.git.run",
+                   ("cat-file --" + self.mode, str(e))))
+        return header[1], contents
+
+    def close(self):
+        """Stop the git process, it is started again on the next lookup"""
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._process = None
+
 class GitCodeDriver(CodeDriver):
     """
     TODO: Reimplement functions with robust library: https://github.com/gitpython-developers/GitPython
 
     This CodeDriver manages source control management for the project using git
+
+    Parameters
+    ----------
+    filepath : str
+        path of the git repository
+    execpath : str
+        path of the git executable
+    remote_url : str, optional
+        url of the remote repository
+    private_index : bool, optional
+        if True, create_ref builds commits from a private index file and only
+        stores them under refs/datmo, leaving the index and branch of the user
+        untouched. current_hash, check_unstaged_changes and checkout_ref then
+        compare the work tree with the datmo commits instead of the branch
+        (default is False, which commits on the current branch)
     """
 
-    def __init__(self, filepath, execpath, remote_url=None):
+    # Index file for commits created with a private index, relative to .git
+    PRIVATE_INDEX_FILENAME = "datmo_index"
+    # Seconds after which datmo refs are no longer in use by a running command
+    # and are deleted by gc
+    GC_MIN_AGE = 60 * 60
+
+    def __init__(self, filepath, execpath, remote_url=None,
+                 private_index=False):
         super(GitCodeDriver, self).__init__()
         self.filepath = filepath
+        self.private_index = private_index
         # Check if filepath exists
         if not os.path.exists(self.filepath):
             raise PathDoesNotExist(
                 __("error", "controller.code.driver.git.__init__.dne",
                    filepath))
         self.execpath = execpath
+        # git processes to look up objects, started on the first lookup
+        self._cat_file = GitCatFile(self.filepath, self.execpath)
+        self._cat_file_contents = GitCatFile(
+            self.filepath, self.execpath, mode="batch")
         # Check the execpath and the version
         try:
             p = subprocess.Popen(
@@ -145,9 +433,190 @@ class GitCodeDriver(CodeDriver):
                 __("error", "controller.code.driver.git.init.file", str(e)))
         return code_refs_success and datmo_files_ignored_success
 
+    def _run(self, args, stdin=None, env=None):
+        """Run a git command in the repository
+
+        Parameters
+        ----------
+        args : list
+            arguments for git (e.g. ["rev-parse", "HEAD"])
+        stdin : str, optional
+            input written to the command
+        env : dict, optional
+            environment variables set for the command in addition to the
+            current ones
+
+        Returns
+        -------
+        returncode : int
+            exit code of the command
+        stdout : str
+            output of the command
+        stderr : str
+            error output of the command
+
+        Raises
+        ------
+        GitExecutionError
+            if git cannot be run
+        """
+        try:
+            process = subprocess.Popen(
+                [self.execpath] + args,
+                cwd=self.filepath,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=dict(os.environ, **env) if env else None)
+            stdout, stderr = process.communicate(
+                input=to_bytes(stdin) if stdin is not None else None)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise GitExecutionError(
+                __("error", "controller.code.driver.git.run",
+                   (" ".join(args), str(e))))
+        return process.returncode, stdout.decode(), stderr.decode()
+
+    def _run_checked(self, args, stdin=None, env=None):
+        """Run a git command in the repository and return its stripped output,
+        raising GitExecutionError if it fails"""
+        returncode, stdout, stderr = self._run(args, stdin=stdin, env=env)
+        if returncode > 0:
+            raise GitExecutionError(
+                __("error", "controller.code.driver.git.run",
+                   (" ".join(args), stderr.strip())))
+        return stdout.strip()
+
+    def _commit_index(self, env=None):
+        """Commit the tree of the index with plumbing commands, without running
+        hooks or rendering a summary. The current branch is moved to the commit
+        unless a private index is used
+
+        Parameters
+        ----------
+        env : dict, optional
+            environment variables for the git commands, with GIT_INDEX_FILE set
+            to commit a private index
+
+        Returns
+        -------
+        str
+            id of the new commit, or of the latest commit if the tree of the index
+            is the same as its tree, instead of an empty commit
+
+        Raises
+        ------
+        GitExecutionError
+            if the index is empty and there is no commit yet, or the commit could
+            not be created
+        """
+        tree_id = self._run_checked(["write-tree"], env=env)
+        returncode, stdout, _ = self._run(
+            ["rev-parse", "--verify", "-q", "HEAD"])
+        parent_id = stdout.strip() if returncode == 0 else None
+        if parent_id:
+            if self._run_checked(["rev-parse", parent_id + "^{tree}"
+                                  ]) == tree_id:
+                return parent_id
+            message = "auto commit by datmo"
+            commit_args = ["commit-tree", tree_id, "-p", parent_id]
+        else:
+            empty_tree_id = self._run_checked(
+                ["hash-object", "-t", "tree", "--stdin"], stdin="")
+            if tree_id == empty_tree_id:
+                raise GitExecutionError(
+                    __("error", "controller.code.driver.git.run",
+                       ("write-tree", "nothing to commit")))
+            message = "auto initial commit by datmo"
+            commit_args = ["commit-tree", tree_id]
+        commit_id = self._run_checked(commit_args + ["-m", message])
+        if env and "GIT_INDEX_FILE" in env:
+            # The commit is only referenced by the datmo ref created for it
+            return commit_id
+        # Move the current branch to the commit, only if no one else moved it
+        self._run_checked(
+            ["update-ref", "-m", "datmo: " + message, "HEAD", commit_id] +
+            ([parent_id] if parent_id else []))
+        return commit_id
+
+    def _commit_private_index(self):
+        """Add all files to the private index and commit its tree with the latest
+        commit of the current branch as parent, without moving the branch
+
+        The private index is kept between commits, so only files which changed
+        since the last one are hashed again. It starts as a copy of the index of
+        the user, which is never written to
+
+        Returns
+        -------
+        str
+            id of the new commit, or of the latest commit if the tree is the same
+
+        Raises
+        ------
+        GitExecutionError
+            if there is nothing to commit or the commit could not be created
+        """
+        env = self._update_private_index()
+        return self._commit_index(env=env)
+
+    def _update_private_index(self):
+        """Add all files to the private index, which starts as a copy of the
+        index of the user, and return the environment variables to use it"""
+        git_dirpath = os.path.join(self.filepath, ".git")
+        index_filepath = os.path.join(git_dirpath,
+                                      self.PRIVATE_INDEX_FILENAME)
+        user_index_filepath = os.path.join(git_dirpath, "index")
+        if not os.path.isfile(index_filepath) and \
+                os.path.isfile(user_index_filepath):
+            shutil.copy2(user_index_filepath, index_filepath)
+        env = {"GIT_INDEX_FILE": index_filepath}
+        self._run_checked(["add", "-A"], env=env)
+        return env
+
+    def _find_private_commit(self):
+        """Return the commit with the files of the work tree, which is the latest
+        commit of the current branch if it has the same tree, as create_ref would
+        return it, else the latest commit of a datmo ref with the same tree
+
+        Returns
+        -------
+        tree_id : str
+            id of the tree of the work tree
+        commit_id : str
+            id of the commit, None if no commit has the tree
+        """
+        env = self._update_private_index()
+        tree_id = self._run_checked(["write-tree"], env=env)
+        returncode, stdout, _ = self._run(
+            ["log", "-1", "--format=%H %T", "HEAD"])
+        commit_trees = [stdout.strip()] if returncode == 0 else []
+        commit_trees.extend(
+            self._run_checked([
+                "for-each-ref", "--sort=-committerdate",
+                "--format=%(objectname) %(tree)", "refs/datmo/"
+            ]).splitlines())
+        for commit_tree in commit_trees:
+            commit_id, commit_tree_id = commit_tree.split()
+            if commit_tree_id == tree_id:
+                return tree_id, commit_id
+        return tree_id, None
+
     # Implemented functions for every CodeDriver
 
     def current_hash(self):
+        """Return the commit of the current code, which with a private index is
+        the datmo commit of the work tree, as the branch of the user is not moved
+
+        Raises
+        ------
+        UnstagedChanges
+            if the work tree has changes which are not in a commit
+        """
+        if self.private_index:
+            _, commit_id = self._find_private_commit()
+            if not commit_id:
+                raise UnstagedChanges()
+            return commit_id
         self.check_unstaged_changes()
         return self.latest_commit()
 
@@ -173,16 +642,15 @@ class GitCodeDriver(CodeDriver):
         """
         self.ensure_code_refs_dir()
         if not commit_id:
+            if not self.private_index:
+                # add files and commit changes on current branch
+                self.add("-A")
             try:
-                _ = self.latest_commit()
-                message = "auto commit by datmo"
-            except Exception:
-                message = "auto initial commit by datmo"
-            # add files and commit changes on current branch
-            self.add("-A")
-            _ = self.commit(options=["-m", message])
-            try:
-                commit_id = self.latest_commit()
+                if self.private_index:
+                    # commit the files without touching the current branch
+                    commit_id = self._commit_private_index()
+                else:
+                    commit_id = self._commit_index()
             except GitExecutionError as e:
                 raise CommitFailed(
                     __("error",
@@ -239,6 +707,29 @@ class GitCodeDriver(CodeDriver):
         code_refs_list = os.listdir(code_refs_path)
         return code_refs_list
 
+    def gc(self, commit_ids, dry_run=False):
+        """Delete the datmo refs which are not kept. The latest ref is always kept,
+        and refs are only deleted once they are GC_MIN_AGE seconds old, so the ref
+        of a commit which is not recorded by a snapshot yet is kept. The commits are
+        git objects, which git gc removes once they are no longer reachable, so no
+        bytes are reclaimed here
+        """
+        commit_ids = set(commit_ids)
+        code_refs_path = os.path.join(self.filepath, ".git/refs/datmo/")
+        # The latest ref is the current code of the project
+        if self.list_refs():
+            commit_ids.add(self.latest_ref())
+        now = time.time()
+        deleted_commit_ids = [
+            commit_id for commit_id in self.list_refs()
+            if commit_id not in commit_ids and now - os.path.getmtime(
+                os.path.join(code_refs_path, commit_id)) >= self.GC_MIN_AGE
+        ]
+        if not dry_run:
+            for commit_id in deleted_commit_ids:
+                self.delete_ref(commit_id)
+        return {"commits": {"count": len(deleted_commit_ids), "bytes": 0}}
+
     # Datmo specific remote calls
     # def push_ref(self, commit_id="*"):
     #     datmo_ref = "refs/datmo/" + commit_id
@@ -265,9 +756,20 @@ class GitCodeDriver(CodeDriver):
     #     return True
 
     def checkout_ref(self, commit_id):
+        if self.private_index:
+            # Files are overwritten from the private index, so changes which
+            # are not in a commit would be lost
+            self.check_unstaged_changes()
         try:
-            # Run checkout for the specific ref as usual
             datmo_ref = "refs/datmo/" + commit_id
+            if self.private_index:
+                # Check out the files of the ref without moving the branch or
+                # changing the index of the user
+                self._run_checked(
+                    ["read-tree", "-m", "-u", datmo_ref],
+                    env=self._update_private_index())
+                return True
+            # Run checkout for the specific ref as usual
             checkout_result = self.checkout(datmo_ref)
             return checkout_result
         except Exception as e:
@@ -303,7 +805,7 @@ class GitCodeDriver(CodeDriver):
     def exists_datmo_files_in_worktree(self):
         try:
             process = subprocess.Popen(
-                [self.execpath, "ls-files", "|", "grep", ".datmo"],
+                [self.execpath, "ls-files", "--", ".datmo"],
                 cwd=self.filepath,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE)
@@ -431,18 +933,51 @@ class GitCodeDriver(CodeDriver):
         return True
 
     def exists_commit(self, commit_id):
+        return self.exists_commits([commit_id])[0]
+
+    def exists_commits(self, commit_ids):
+        """Check if commits exist, looking them up in the long-lived cat-file process
+
+        Parameters
+        ----------
+        commit_ids : list
+            commit ids to check for
+
+        Returns
+        -------
+        list
+            True for each commit id which is a commit in the repository, else False
+        """
+        commit_ids = list(commit_ids)
         try:
-            process = subprocess.Popen(
-                [self.execpath, "show", commit_id],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=self.filepath)
-            stdout, stderr = process.communicate()
-            if process.returncode > 0 or "fatal" in str(stdout):
-                return False
-        except subprocess.CalledProcessError:
-            return False
-        return True
+            results = self._cat_file.check([
+                commit_id + "^{commit}" if commit_id else ""
+                for commit_id in commit_ids
+            ])
+        except GitExecutionError:
+            return [False] * len(commit_ids)
+        return [result is not None for result in results]
+
+    def read_object(self, name):
+        """Return the type and contents of an object, looking it up in the
+        long-lived cat-file process
+
+        Parameters
+        ----------
+        name : str
+            name of the object (e.g. "<commit id>", "<commit id>:path/to/file")
+
+        Returns
+        -------
+        tuple or None
+            (type, contents) of the object, None if there is no object
+        """
+        return self._cat_file_contents.read(name)
+
+    def close(self):
+        """Stop the git processes used to look up objects"""
+        self._cat_file.close()
+        self._cat_file_contents.close()
 
     # def branch(self, name, option=None):
     #     try:
@@ -470,7 +1005,8 @@ class GitCodeDriver(CodeDriver):
     #     return True
 
     def check_unstaged_changes(self):
-        """Checks if there exists any unstaged changes for code
+        """Checks if there exists any unstaged changes for code. With a private
+        index, changes are staged once they are in a datmo commit
 
         Raises
         ------
@@ -481,23 +1017,21 @@ class GitCodeDriver(CodeDriver):
             error if there exists any error while using git
 
         """
-        try:
-            process = subprocess.Popen(
-                [self.execpath, "status"],
-                cwd=self.filepath,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
-            if process.returncode > 0:
-                raise GitExecutionError(
-                    __("error", "controller.code.driver.git.status",
-                       str(stderr)))
-            stdout = stdout.decode().strip()
-            if "clean" not in stdout:
+        if self.private_index:
+            tree_id, commit_id = self._find_private_commit()
+            empty_tree_id = self._run_checked(
+                ["hash-object", "-t", "tree", "--stdin"], stdin="")
+            if not commit_id and tree_id != empty_tree_id:
                 raise UnstagedChanges()
-        except subprocess.CalledProcessError as e:
+            return False
+        # Porcelain output is stable and empty when there are no changes,
+        # including untracked files
+        returncode, stdout, stderr = self._run(["status", "--porcelain", "-z"])
+        if returncode > 0:
             raise GitExecutionError(
-                __("error", "controller.code.driver.git.status", str(e)))
+                __("error", "controller.code.driver.git.status", str(stderr)))
+        if stdout:
+            raise UnstagedChanges()
         return False
 
     def checkout(self, name, option=None):
@@ -628,23 +1162,13 @@ class GitCodeDriver(CodeDriver):
     #     return git_stash_apply
 
     def latest_commit(self):
-        try:
-            process = subprocess.Popen(
-                [self.execpath, "log", "--format=%H", "-n", "1"],
-                cwd=self.filepath,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
-            if process.returncode > 0:
-                raise GitExecutionError(
-                    __("error", "controller.code.driver.git.latest_commit",
-                       str(stderr)))
-            git_commit = stdout.decode().strip()
-        except subprocess.CalledProcessError as e:
+        returncode, stdout, stderr = self._run(
+            ["rev-parse", "--verify", "HEAD^{commit}"])
+        if returncode > 0:
             raise GitExecutionError(
                 __("error", "controller.code.driver.git.latest_commit",
-                   str(e)))
-        return git_commit
+                   str(stderr)))
+        return stdout.strip()
 
     def reset(self, git_commit):
         try:
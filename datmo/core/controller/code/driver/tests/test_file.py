@@ -7,6 +7,7 @@ import time
 import shutil
 import tempfile
 import platform
+import checksumdir
 from io import open
 try:
     to_unicode = str
@@ -26,7 +27,9 @@ except TypeError:
     to_bytes("test")
 
 from datmo.core.controller.code.driver.file import FileCodeDriver
-from datmo.core.util.exceptions import PathDoesNotExist, FileIOError, CodeNotInitialized, UnstagedChanges, CommitDoesNotExist
+from datmo.core.util.misc_functions import get_mtime_ns
+from datmo.core.util.exceptions import PathDoesNotExist, FileIOError, CodeNotInitialized, UnstagedChanges, CommitDoesNotExist, \
+    InvalidArgumentType
 
 class TestFileCodeDriver():
     """
@@ -124,6 +127,22 @@ class TestFileCodeDriver():
         result = self.file_code_driver._get_tracked_files()
         assert result == ["test2.txt"]
 
+        # Test if it ignores directories in .datmoignore and nested .git directories
+        data_dirpath = os.path.join(self.temp_dir, "data", "nested")
+        os.makedirs(data_dirpath)
+        with open(os.path.join(data_dirpath, "test.csv"), "wb") as f:
+            f.write(to_bytes("cool"))
+        os.makedirs(os.path.join(self.temp_dir, "lib", ".git"))
+        with open(os.path.join(self.temp_dir, "lib", ".git", "test"),
+                  "wb") as f:
+            f.write(to_bytes("cool"))
+        with open(os.path.join(self.temp_dir, "lib", "test.py"), "wb") as f:
+            f.write(to_bytes("cool"))
+        with open(os.path.join(self.temp_dir, ".datmoignore"), "wb") as f:
+            f.write(to_bytes("test.txt\ndata/"))
+        result = self.file_code_driver._get_tracked_files()
+        assert sorted(result) == [os.path.join("lib", "test.py"), "test2.txt"]
+
     def test_calculate_commit_hash(self):
         self.__setup()
         # Test if the hash matches the test file
@@ -131,7 +150,114 @@ class TestFileCodeDriver():
         result = self.file_code_driver._calculate_commit_hash(
             tracked_filepaths)
         # Assert the correct commit hash was returned
-        assert result == "69a329523ce1ec88bf63061863d9cb14"
+        assert result == "a3e9bb0ea815304498631dd9167e87ae"
+
+    def test_calculate_commit_hash_algorithm(self):
+        self.__setup()
+        blake2b_file_code_driver = FileCodeDriver(
+            root=self.temp_dir,
+            datmo_directory_name=".datmo",
+            hash_algorithm="blake2b")
+        tracked_filepaths = self.file_code_driver._get_tracked_files()
+        result = blake2b_file_code_driver._calculate_commit_hash(
+            tracked_filepaths)
+        assert len(result) == 32
+        assert result != self.file_code_driver._calculate_commit_hash(
+            tracked_filepaths)
+        # Each algorithm keeps its own file hash index
+        assert blake2b_file_code_driver._hash_index_filepath != \
+               self.file_code_driver._hash_index_filepath
+        failed = False
+        try:
+            _ = FileCodeDriver(
+                root=self.temp_dir,
+                datmo_directory_name=".datmo",
+                hash_algorithm="crc32")
+        except InvalidArgumentType:
+            failed = True
+        assert failed
+
+    def test_commit_algorithm(self):
+        self.__setup()
+        commit_hash = self.file_code_driver.create_ref()
+        assert self.file_code_driver._get_commit_algorithm(
+            commit_hash) == "md5"
+        assert self.file_code_driver._get_commit_algorithms() == ["md5"]
+        # Test the unchanged tree matches the commit after the algorithm changes
+        blake2b_file_code_driver = FileCodeDriver(
+            root=self.temp_dir,
+            datmo_directory_name=".datmo",
+            hash_algorithm="blake2b")
+        assert not blake2b_file_code_driver.check_unstaged_changes()
+        assert blake2b_file_code_driver.current_hash() == commit_hash
+        assert blake2b_file_code_driver.create_ref() == commit_hash
+        # Test new commits are hashed with the new algorithm
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes("hello"))
+        blake2b_commit_hash = blake2b_file_code_driver.create_ref()
+        assert blake2b_commit_hash != commit_hash
+        assert blake2b_file_code_driver._get_commit_algorithm(
+            blake2b_commit_hash) == "blake2b"
+        assert self.file_code_driver._get_commit_algorithms() == \
+               ["blake2b", "md5"]
+        assert self.file_code_driver.current_hash() == blake2b_commit_hash
+
+        # Test the algorithm of commits written without it is found from their id
+        commit_filepath = os.path.join(self.file_code_driver._code_filepath,
+                                       "commits", blake2b_commit_hash)
+        with open(commit_filepath, "r") as f:
+            commit_lines = f.readlines()
+        with open(commit_filepath, "wb") as f:
+            f.write(to_bytes("".join(commit_lines[1:])))
+        os.remove(self.file_code_driver._commit_algorithms_filepath)
+        assert self.file_code_driver._get_commit_algorithm(
+            blake2b_commit_hash) == "blake2b"
+        assert self.file_code_driver._read_manifest(blake2b_commit_hash) == \
+               blake2b_file_code_driver._get_manifest(
+                   blake2b_file_code_driver._get_tracked_files())
+        assert self.file_code_driver.current_hash() == blake2b_commit_hash
+        assert self.file_code_driver._get_commit_algorithms() == \
+               ["blake2b", "md5"]
+
+    def test_calculate_commit_hash_index(self):
+        self.__setup()
+        filepath = os.path.join(self.temp_dir, "test.txt")
+        # Files modified within the mtime resolution are not cached
+        tracked_filepaths = self.file_code_driver._get_tracked_files()
+        result = self.file_code_driver._calculate_commit_hash(
+            tracked_filepaths)
+        assert self.file_code_driver._load_hash_index() == {}
+        # Unchanged files are not read once cached in the index
+        os.utime(filepath, (1000000000, 1000000000))
+        result_2 = self.file_code_driver._calculate_commit_hash(
+            tracked_filepaths)
+        assert result_2 == result
+        index = self.file_code_driver._load_hash_index()
+        assert list(index) == ["test.txt"]
+        assert index["test.txt"][0] == 5
+        assert index["test.txt"][3] == \
+               self.file_code_driver._get_filehash(filepath)
+        index["test.txt"][3] = "cached_hash"
+        self.file_code_driver._save_hash_index(index)
+        cached_manifest = self.file_code_driver._get_manifest(
+            tracked_filepaths)
+        assert cached_manifest == [("test.txt", "cached_hash")]
+        # Files whose stat changed are hashed again
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("hello"))
+        os.utime(filepath, (1000000001, 1000000001))
+        result_3 = self.file_code_driver._calculate_commit_hash(
+            tracked_filepaths)
+        assert result_3 == result
+        # Removed files are dropped from the index
+        os.remove(filepath)
+        result_4 = self.file_code_driver._calculate_commit_hash([])
+        assert result_4 != result
+        assert self.file_code_driver._load_hash_index() == {}
+        # A corrupt index is ignored
+        with open(self.file_code_driver._hash_index_filepath, "wb") as f:
+            f.write(to_bytes("{corrupt"))
+        assert self.file_code_driver._load_hash_index() == {}
 
     def test_current_hash(self):
         self.__setup()
@@ -166,21 +292,48 @@ class TestFileCodeDriver():
         # Test successful creation of ref
         self.__setup()
         result = self.file_code_driver.create_ref()
-        assert result == "69a329523ce1ec88bf63061863d9cb14"
+        assert result == "a3e9bb0ea815304498631dd9167e87ae"
         # Assert the commit file was added in the correct place
         commit_filepath = os.path.join(self.file_code_driver._code_filepath,
-                                       result)
+                                       "commits", result)
         assert os.path.isfile(commit_filepath)
-        # Assert only the tracked files were added in the correct locations
+        # Assert the tracked files were added to the object store by content
         tracked_filepaths = self.file_code_driver._get_tracked_files()
         for tracked_filepath in tracked_filepaths:
-            absolute_dirpath = os.path.join(
-                self.file_code_driver._code_filepath, tracked_filepath)
-            assert os.path.isdir(absolute_dirpath)
-            assert len(os.listdir(absolute_dirpath)) == 1
-            file_line_str = tracked_filepath + "," + os.listdir(
-                absolute_dirpath)[0]
+            filehash = self.file_code_driver._get_filehash(
+                os.path.join(self.temp_dir, tracked_filepath))
+            object_path = os.path.join(self.file_code_driver._code_filepath,
+                                       "objects", filehash[:2], filehash[2:])
+            assert os.path.isfile(object_path)
+            file_line_str = tracked_filepath + "," + filehash
             assert file_line_str in open(commit_filepath).read()
+        # Assert the commit file starts with the algorithm of the commit and the
+        # commit hash is the hash of its manifest
+        with open(commit_filepath, "r") as f:
+            assert f.readline() == "#algorithm md5\n"
+            manifest_str = f.read()
+        assert self.file_code_driver._get_filehash(commit_filepath) != result
+        manifest_filepath = os.path.join(self.temp_dir, "manifest")
+        with open(manifest_filepath, "wb") as f:
+            f.write(to_bytes(manifest_str))
+        assert self.file_code_driver._get_filehash(manifest_filepath) == result
+        os.remove(manifest_filepath)
+
+        # Test objects are shared between files and commits with the same contents
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes("hello"))
+        result_2 = self.file_code_driver.create_ref()
+        assert result_2 != result
+        object_dirpaths = os.listdir(
+            os.path.join(self.file_code_driver._code_filepath, "objects"))
+        assert len(object_dirpaths) == 1
+
+        # Test renaming a file creates a new commit
+        os.rename(
+            os.path.join(self.temp_dir, "test2.txt"),
+            os.path.join(self.temp_dir, "test3.txt"))
+        result_3 = self.file_code_driver.create_ref()
+        assert result_3 not in [result, result_2]
 
     def test_current_ref(self):
         # Test failure, not initialized
@@ -232,6 +385,24 @@ class TestFileCodeDriver():
         self.file_code_driver.checkout_ref(commit_id=commit_hash)
         result = self.file_code_driver.latest_ref()
         assert result == commit_hash_2
+        # Test the latest commit is tracked in the HEAD file
+        with open(os.path.join(self.file_code_driver._code_filepath,
+                               "HEAD")) as f:
+            assert f.read() == commit_hash_2
+        # Test success after deleting the latest commit
+        self.file_code_driver.delete_ref(commit_hash_2)
+        result = self.file_code_driver.latest_ref()
+        assert result == commit_hash
+        self.file_code_driver.delete_ref(commit_hash)
+        assert self.file_code_driver.latest_ref() is None
+        assert not os.path.isfile(
+            os.path.join(self.file_code_driver._code_filepath, "HEAD"))
+        # Test success for commits created before the HEAD file
+        legacy_commit_filepath = os.path.join(
+            self.file_code_driver._code_filepath, "legacy_commit")
+        with open(legacy_commit_filepath, "wb") as f:
+            f.write(to_bytes("test.txt,hash\n"))
+        assert self.file_code_driver.latest_ref() == "legacy_commit"
 
     def test_exists_ref(self):
         # Test failure, not initialized
@@ -242,7 +413,7 @@ class TestFileCodeDriver():
             failed = True
         assert failed
         self.__setup()
-        commit_hash = "69a329523ce1ec88bf63061863d9cb14"
+        commit_hash = "a3e9bb0ea815304498631dd9167e87ae"
         # Test does not exist case
         result = self.file_code_driver.exists_ref(commit_id=commit_hash)
         assert result == False
@@ -250,6 +421,10 @@ class TestFileCodeDriver():
         commit_hash = self.file_code_driver.create_ref()
         result = self.file_code_driver.exists_ref(commit_id=commit_hash)
         assert result == True
+        # Test other files and directories in the code directory are not commits
+        for commit_id in ["HEAD", "objects", "commits", "..", "",
+                          os.path.join("commits", commit_hash)]:
+            assert not self.file_code_driver.exists_ref(commit_id=commit_id)
 
     def test_delete_ref(self):
         # Test failure, not initialized
@@ -260,7 +435,7 @@ class TestFileCodeDriver():
             failed = True
         assert failed
         self.__setup()
-        commit_hash = "69a329523ce1ec88bf63061863d9cb14"
+        commit_hash = "a3e9bb0ea815304498631dd9167e87ae"
         # Test trying to delete failure
         failed = False
         try:
@@ -273,7 +448,7 @@ class TestFileCodeDriver():
         result = self.file_code_driver.delete_ref(commit_id=commit_hash)
         assert result
         commit_filepath = os.path.join(self.file_code_driver._code_filepath,
-                                       commit_hash)
+                                       "commits", commit_hash)
         assert not os.path.isfile(commit_filepath)
 
     def test_list_refs(self):
@@ -292,6 +467,86 @@ class TestFileCodeDriver():
         commit_hash = self.file_code_driver.create_ref()
         result = self.file_code_driver.list_refs()
         assert result == [commit_hash]
+        # Test commits created before the commits directory are listed
+        with open(
+                os.path.join(self.file_code_driver._code_filepath,
+                             "legacy_commit"), "wb") as f:
+            f.write(to_bytes("test.txt,hash\n"))
+        result = self.file_code_driver.list_refs()
+        assert sorted(result) == sorted([commit_hash, "legacy_commit"])
+        assert self.file_code_driver.exists_ref("legacy_commit")
+
+    def test_gc(self):
+        self.__setup()
+        commit_hash = self.file_code_driver.create_ref()
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes("hello2"))
+        commit_hash_2 = self.file_code_driver.create_ref()
+        object_path = self.file_code_driver._get_object_path(
+            self.file_code_driver._get_filehash(
+                os.path.join(self.temp_dir, "test.txt")))
+        object_path_2 = self.file_code_driver._get_object_path(
+            self.file_code_driver._get_filehash(
+                os.path.join(self.temp_dir, "test2.txt")))
+        commit_bytes = os.path.getsize(
+            self.file_code_driver._get_commit_filepath(commit_hash_2))
+        # Test an object in no commit is kept until it is old enough
+        stray_stat = os.stat(os.path.join(self.temp_dir, "test2.txt"))
+        stray_object_path = self.file_code_driver._get_object_path(
+            self.file_code_driver._write_object(
+                os.path.join(self.temp_dir, "test2.txt"), "ff" + "0" * 30, [
+                    stray_stat.st_size,
+                    get_mtime_ns(stray_stat), stray_stat.st_ino
+                ]))
+
+        # Test the commit in HEAD is kept
+        result = self.file_code_driver.gc([commit_hash])
+        assert result["commits"]["count"] == 0
+        assert self.file_code_driver.exists_ref(commit_hash_2)
+
+        # Test a recent commit is kept once it is no longer in HEAD
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes("hello3"))
+        commit_hash_3 = self.file_code_driver.create_ref()
+        result = self.file_code_driver.gc([commit_hash])
+        assert result["commits"]["count"] == 0
+        assert self.file_code_driver.exists_ref(commit_hash_2)
+
+        # Test the dry run only reports the old commit and the object only it uses
+        old_time = time.time() - 2 * self.file_code_driver.GC_MIN_AGE
+        os.utime(
+            self.file_code_driver._get_commit_filepath(commit_hash_2),
+            (old_time, old_time))
+        result = self.file_code_driver.gc([commit_hash], dry_run=True)
+        assert result == {
+            "commits": {
+                "count": 1,
+                "bytes": commit_bytes
+            },
+            "objects": {
+                "count": 1,
+                "bytes": 6
+            }
+        }
+        assert self.file_code_driver.exists_ref(commit_hash_2)
+        assert os.path.isfile(object_path_2)
+
+        result = self.file_code_driver.gc([commit_hash])
+        assert result["commits"]["count"] == 1
+        assert sorted(self.file_code_driver.list_refs()) == sorted(
+            [commit_hash, commit_hash_3])
+        assert self.file_code_driver.latest_ref() == commit_hash_3
+        assert os.path.isfile(object_path)
+        assert not os.path.isfile(object_path_2)
+        assert os.path.isfile(stray_object_path)
+
+        # Test the object in no commit is deleted once it is old enough
+        self.file_code_driver.GC_MIN_AGE = 0
+        result = self.file_code_driver.gc([commit_hash])
+        assert result["commits"]["count"] == 0
+        assert result["objects"] == {"count": 1, "bytes": 6}
+        assert not os.path.isfile(stray_object_path)
+        assert os.path.isfile(object_path)
 
     def test_check_unstaged_changes(self):
         # Test failure, not initialized
@@ -326,7 +581,7 @@ class TestFileCodeDriver():
             failed = True
         assert failed
         self.__setup()
-        commit_hash = "69a329523ce1ec88bf63061863d9cb14"
+        commit_hash = "a3e9bb0ea815304498631dd9167e87ae"
         # Test trying to checkout failure (commit does not exist)
         failed = False
         try:
@@ -352,9 +607,10 @@ class TestFileCodeDriver():
         result = self.file_code_driver.checkout_ref(commit_id=commit_hash)
         assert result
         commit_filepath = os.path.join(self.file_code_driver._code_filepath,
-                                       commit_hash)
+                                       "commits", commit_hash)
         # Check all files in commit file exist and are at the correct point
         with open(commit_filepath, "r") as f:
+            assert f.readline() == "#algorithm md5\n"
             for line in f:
                 tracked_filepath, filehash = line.rstrip().split(",")
                 destination_absolute_filepath = os.path.join(
@@ -364,3 +620,179 @@ class TestFileCodeDriver():
                     destination_absolute_filepath)
         # Check that files in the latest commit are not present
         assert not os.path.isfile(os.path.join(self.temp_dir, "test2.txt"))
+
+        # Test checkout of a commit created before the object store, which keeps
+        # a copy of each file in a directory for its path
+        legacy_filehash = self.file_code_driver._get_filehash(
+            os.path.join(self.temp_dir, "test.txt"))
+        legacy_dirpath = os.path.join(self.file_code_driver._code_filepath,
+                                      "legacy.txt")
+        os.makedirs(legacy_dirpath)
+        with open(os.path.join(legacy_dirpath, legacy_filehash), "wb") as f:
+            f.write(to_bytes("legacy"))
+        with open(
+                os.path.join(self.file_code_driver._code_filepath,
+                             "legacy_commit"), "wb") as f:
+            f.write(to_bytes("legacy.txt," + legacy_filehash + "\n"))
+        # Remove the object so the legacy copy is used
+        shutil.rmtree(
+            os.path.join(self.file_code_driver._code_filepath, "objects"))
+        result = self.file_code_driver.checkout_ref(commit_id="legacy_commit")
+        assert result
+        assert open(os.path.join(self.temp_dir,
+                                 "legacy.txt")).read() == "legacy"
+        assert not os.path.isfile(os.path.join(self.temp_dir, "test.txt"))
+
+    def test_checkout_ref_algorithm(self):
+        self.__setup()
+        same_filepath = os.path.join(self.temp_dir, "same.txt")
+        with open(same_filepath, "wb") as f:
+            f.write(to_bytes("same"))
+        commit_hash = self.file_code_driver.create_ref()
+        same_inode = os.stat(same_filepath).st_ino
+        # Test checkout of a commit hashed with another algorithm only replaces
+        # the files which differ from it
+        blake2b_file_code_driver = FileCodeDriver(
+            root=self.temp_dir,
+            datmo_directory_name=".datmo",
+            hash_algorithm="blake2b")
+        with open(os.path.join(self.temp_dir, "test.txt"), "wb") as f:
+            f.write(to_bytes("changed"))
+        blake2b_commit_hash = blake2b_file_code_driver.create_ref()
+        result = blake2b_file_code_driver.checkout_ref(commit_id=commit_hash)
+        assert result
+        assert open(os.path.join(self.temp_dir, "test.txt")).read() == "hello"
+        assert os.stat(same_filepath).st_ino == same_inode
+        assert blake2b_file_code_driver.current_hash() == commit_hash
+        result = blake2b_file_code_driver.checkout_ref(
+            commit_id=blake2b_commit_hash)
+        assert result
+        assert open(os.path.join(self.temp_dir,
+                                 "test.txt")).read() == "changed"
+        assert os.stat(same_filepath).st_ino == same_inode
+
+    def test_legacy_commit(self):
+        self.__setup()
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes("world"))
+        # Create a commit as before the object store, whose id is the hash of the
+        # directory of its files and whose files are copied per path
+        tracked_filepaths = self.file_code_driver._get_tracked_files()
+        copy_dirpath = tempfile.mkdtemp(dir=self.temp_dir)
+        for tracked_filepath in tracked_filepaths:
+            shutil.copy2(
+                os.path.join(self.temp_dir, tracked_filepath),
+                os.path.join(copy_dirpath, tracked_filepath))
+        legacy_commit_hash = checksumdir.dirhash(copy_dirpath)
+        shutil.rmtree(copy_dirpath)
+        legacy_lines = []
+        for tracked_filepath in tracked_filepaths:
+            filehash = self.file_code_driver._get_filehash(
+                os.path.join(self.temp_dir, tracked_filepath))
+            legacy_dirpath = os.path.join(self.file_code_driver._code_filepath,
+                                          tracked_filepath)
+            os.makedirs(legacy_dirpath)
+            shutil.copy2(
+                os.path.join(self.temp_dir, tracked_filepath),
+                os.path.join(legacy_dirpath, filehash))
+            legacy_lines.append(tracked_filepath + "," + filehash + "\n")
+        with open(
+                os.path.join(self.file_code_driver._code_filepath,
+                             legacy_commit_hash), "wb") as f:
+            f.write(to_bytes("".join(legacy_lines)))
+
+        # Test the unchanged tree matches the legacy commit
+        assert not self.file_code_driver.check_unstaged_changes()
+        assert self.file_code_driver.current_hash() == legacy_commit_hash
+        assert self.file_code_driver.current_ref() == legacy_commit_hash
+        assert self.file_code_driver.create_ref() == legacy_commit_hash
+        assert self.file_code_driver.list_refs() == [legacy_commit_hash]
+
+        # Test checkout back to the legacy commit after a new commit
+        os.remove(os.path.join(self.temp_dir, "test2.txt"))
+        commit_hash = self.file_code_driver.create_ref()
+        assert commit_hash != legacy_commit_hash
+        result = self.file_code_driver.checkout_ref(
+            commit_id=legacy_commit_hash)
+        assert result
+        assert open(os.path.join(self.temp_dir,
+                                 "test2.txt")).read() == "world"
+        assert self.file_code_driver.current_hash() == legacy_commit_hash
+
+    def test_create_ref_temp_files(self):
+        self.__setup()
+        self.file_code_driver.create_ref()
+        # Temp files are written outside of the object store and moved in place
+        assert os.listdir(self.file_code_driver._temp_path) == []
+        objects_path = os.path.join(self.file_code_driver._code_filepath,
+                                    "objects")
+        for object_dirname in os.listdir(objects_path):
+            for filename in os.listdir(
+                    os.path.join(objects_path, object_dirname)):
+                assert len(object_dirname + filename) == 32
+
+    def test_write_object_changed(self):
+        self.__setup()
+        filepath = os.path.join(self.temp_dir, "test.txt")
+        manifest, file_stats = self.file_code_driver._scan_files(["test.txt"])
+        filehash = manifest[0][1]
+        # Test a file changed after it was hashed is stored by its new contents
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("changed"))
+        result = self.file_code_driver._write_object(filepath, filehash,
+                                                     file_stats["test.txt"])
+        assert result == self.file_code_driver._get_filehash(filepath)
+        assert result != filehash
+        assert not os.path.isfile(
+            self.file_code_driver._get_object_path(filehash))
+        with open(self.file_code_driver._get_object_path(result), "rb") as f:
+            assert f.read() == to_bytes("changed")
+        assert os.listdir(self.file_code_driver._temp_path) == []
+
+    def test_checkout_ref_incremental(self):
+        self.__setup()
+        same_filepath = os.path.join(self.temp_dir, "same.txt")
+        with open(same_filepath, "wb") as f:
+            f.write(to_bytes("same"))
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes("hello"))
+        commit_hash = self.file_code_driver.create_ref()
+        same_inode = os.stat(same_filepath).st_ino
+        # Change a file, add a nested file and replace a file by a directory
+        with open(os.path.join(self.temp_dir, "test.txt"), "wb") as f:
+            f.write(to_bytes("changed"))
+        os.makedirs(os.path.join(self.temp_dir, "new_dir", "nested"))
+        with open(
+                os.path.join(self.temp_dir, "new_dir", "nested", "test.txt"),
+                "wb") as f:
+            f.write(to_bytes("nested"))
+        os.remove(os.path.join(self.temp_dir, "test2.txt"))
+        os.makedirs(os.path.join(self.temp_dir, "test2.txt"))
+        with open(os.path.join(self.temp_dir, "test2.txt", "test.txt"),
+                  "wb") as f:
+            f.write(to_bytes("in directory"))
+        new_commit_hash = self.file_code_driver.create_ref()
+
+        result = self.file_code_driver.checkout_ref(commit_id=commit_hash)
+        assert result
+        assert self.file_code_driver.current_hash() == commit_hash
+        assert open(os.path.join(self.temp_dir, "test2.txt")).read() == "hello"
+        assert not os.path.exists(os.path.join(self.temp_dir, "new_dir"))
+
+        result = self.file_code_driver.checkout_ref(commit_id=new_commit_hash)
+        assert result
+        assert self.file_code_driver.current_hash() == new_commit_hash
+        assert open(os.path.join(self.temp_dir, "test.txt")).read() == "changed"
+        assert open(
+            os.path.join(self.temp_dir, "new_dir", "nested",
+                         "test.txt")).read() == "nested"
+        # Files which are the same in both commits are not touched
+        assert os.stat(same_filepath).st_ino == same_inode
+
+        # Changing a checked out file in place does not change the stored contents
+        filepath = os.path.join(self.temp_dir, "test2.txt", "test.txt")
+        filehash = self.file_code_driver._get_filehash(filepath)
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("edited in place"))
+        assert open(self.file_code_driver._get_object_path(
+            filehash)).read() == "in directory"
@@ -26,7 +26,7 @@ except TypeError:
     to_bytes("test")
 
 from datmo.core.controller.code.driver.git import (GitCodeDriver,
-                                                   GitHostDriver)
+                                                   GitHostDriver, GitCatFile)
 from datmo.core.util.exceptions import (CommitFailed, CommitDoesNotExist,
                                         PathDoesNotExist, GitExecutionError,
                                         DatmoFolderInWorkTree, UnstagedChanges)
@@ -177,6 +177,13 @@ class TestGitCodeDriver():
         assert commit_hash_2 != commit_hash
         assert os.path.isfile(code_ref_path_2)
         assert self.git_code_manager.latest_commit() == commit_hash_2
+        # Test the commit is on the current branch with the previous as parent
+        assert self.git_code_manager._run_checked(
+            ["rev-parse", commit_hash_2 + "^"]) == commit_hash
+        self.git_code_manager.check_unstaged_changes()
+        # Test passing case with no changes returns the latest commit
+        commit_hash_3 = self.git_code_manager.create_ref()
+        assert commit_hash_3 == commit_hash_2
         # Test error raised with commit_id
         random_commit_id = str("random")
         failed = False
@@ -187,6 +194,124 @@ class TestGitCodeDriver():
             failed = True
         assert failed
 
+    def test_commit_index(self):
+        self.git_code_manager.init()
+        # Test failure for an empty index without a commit
+        failed = False
+        try:
+            self.git_code_manager._commit_index()
+        except GitExecutionError:
+            failed = True
+        assert failed
+        # Test the index is committed and the branch is moved to the commit
+        with open(os.path.join(self.temp_dir, "test.txt"), "wb") as f:
+            f.write(to_bytes(str("test")))
+        self.git_code_manager.add("-A")
+        commit_id = self.git_code_manager._commit_index()
+        assert self.git_code_manager.latest_commit() == commit_id
+        # Test the latest commit is returned when the tree has not changed,
+        # where committing the same tree again used to fail
+        result = self.git_code_manager._commit_index()
+        assert result == commit_id
+        assert self.git_code_manager._run_checked(
+            ["rev-list", "--count", "HEAD"]) == "1"
+        # Test a change is committed with the latest commit as parent
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes(str("test")))
+        self.git_code_manager.add("-A")
+        commit_id_2 = self.git_code_manager._commit_index()
+        assert commit_id_2 != commit_id
+        assert self.git_code_manager._run_checked(
+            ["rev-parse", commit_id_2 + "^"]) == commit_id
+        assert self.git_code_manager.latest_commit() == commit_id_2
+
+    def test_create_ref_private_index(self):
+        self.git_code_manager = GitCodeDriver(
+            filepath=self.temp_dir, execpath="git", private_index=True)
+        self.git_code_manager.init()
+        # Test failing case with no code_id and nothing to commit
+        failed = False
+        try:
+            self.git_code_manager.create_ref()
+        except CommitFailed:
+            failed = True
+        assert failed
+        # Test the commit has no parent when the branch has no commits
+        test_filepath = os.path.join(self.git_code_manager.filepath,
+                                     "test.txt")
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test")))
+        commit_hash = self.git_code_manager.create_ref()
+        assert os.path.isfile(
+            os.path.join(self.git_code_manager.filepath, ".git/refs/datmo/",
+                         commit_hash))
+        assert self.git_code_manager.read_object(commit_hash + ":test.txt") == \
+            ("blob", b"test")
+        returncode, _, _ = self.git_code_manager._run(
+            ["rev-parse", "--verify", "-q", "HEAD"])
+        assert returncode > 0
+        # Test the branch and index of the user are untouched
+        self.git_code_manager._run_checked(["add", "test.txt"])
+        self.git_code_manager._run_checked(["commit", "-m", "user commit"])
+        user_commit_hash = self.git_code_manager.latest_commit()
+        test_filepath_2 = os.path.join(self.git_code_manager.filepath,
+                                       "test2.txt")
+        with open(test_filepath_2, "wb") as f:
+            f.write(to_bytes(str("test")))
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test2")))
+        status = self.git_code_manager._run_checked(["status", "--porcelain"])
+        commit_hash_2 = self.git_code_manager.create_ref()
+        assert commit_hash_2 != user_commit_hash
+        assert self.git_code_manager.latest_commit() == user_commit_hash
+        assert self.git_code_manager._run_checked(["status",
+                                                   "--porcelain"]) == status
+        assert self.git_code_manager._run_checked(
+            ["rev-parse", commit_hash_2 + "^"]) == user_commit_hash
+        assert self.git_code_manager.read_object(commit_hash_2 + ":test.txt") == \
+            ("blob", b"test2")
+        assert self.git_code_manager.read_object(commit_hash_2 + ":test2.txt") == \
+            ("blob", b"test")
+        # Test the current hash is the datmo commit of the work tree
+        assert self.git_code_manager.current_hash() == commit_hash_2
+        assert not self.git_code_manager.check_unstaged_changes()
+        with open(test_filepath_2, "wb") as f:
+            f.write(to_bytes(str("test3")))
+        failed = False
+        try:
+            self.git_code_manager.current_hash()
+        except UnstagedChanges:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            self.git_code_manager.check_unstaged_changes()
+        except UnstagedChanges:
+            failed = True
+        assert failed
+        # Test changes which are not in a commit are not checked out over
+        failed = False
+        try:
+            self.git_code_manager.checkout_ref(commit_hash_2)
+        except UnstagedChanges:
+            failed = True
+        assert failed
+        # Test the ref can be checked out without moving the branch
+        os.remove(test_filepath_2)
+        self.git_code_manager._run_checked(["checkout", "--", "test.txt"])
+        assert self.git_code_manager.current_hash() == user_commit_hash
+        assert self.git_code_manager.checkout_ref(commit_hash_2)
+        with open(test_filepath_2, "rb") as f:
+            assert f.read() == to_bytes("test")
+        with open(test_filepath, "rb") as f:
+            assert f.read() == to_bytes("test2")
+        assert self.git_code_manager.latest_commit() == user_commit_hash
+        assert self.git_code_manager.current_hash() == commit_hash_2
+        # Test passing case with no changes returns the latest commit
+        os.remove(test_filepath_2)
+        self.git_code_manager._run_checked(["checkout", "--", "test.txt"])
+        assert self.git_code_manager.create_ref() == user_commit_hash
+
     def test_latest_ref(self):
         self.git_code_manager.init()
         # Test success (single commit)
@@ -249,6 +374,39 @@ class TestGitCodeDriver():
         assert code_refs and \
             code_id in code_refs
 
+    def test_gc(self):
+        self.git_code_manager.init()
+        test_filepath = os.path.join(self.git_code_manager.filepath,
+                                     "test.txt")
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test")))
+        code_id = self.git_code_manager.create_ref()
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test2")))
+        code_id_2 = self.git_code_manager.create_ref()
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test3")))
+        code_id_3 = self.git_code_manager.create_ref()
+        # Test recent refs are kept
+        result = self.git_code_manager.gc([code_id])
+        assert result == {"commits": {"count": 0, "bytes": 0}}
+        # Test old refs are deleted, except for the latest one
+        old_time = time.time() - 2 * self.git_code_manager.GC_MIN_AGE
+        for commit_id in [code_id, code_id_2, code_id_3]:
+            os.utime(
+                os.path.join(self.git_code_manager.filepath, ".git", "refs",
+                             "datmo", commit_id), (old_time, old_time))
+        os.utime(
+            os.path.join(self.git_code_manager.filepath, ".git", "refs",
+                         "datmo", code_id_3), None)
+        result = self.git_code_manager.gc([code_id], dry_run=True)
+        assert result == {"commits": {"count": 1, "bytes": 0}}
+        assert self.git_code_manager.exists_ref(code_id_2)
+        result = self.git_code_manager.gc([code_id])
+        assert result == {"commits": {"count": 1, "bytes": 0}}
+        assert sorted(self.git_code_manager.list_refs()) == sorted(
+            [code_id, code_id_3])
+
     # def test_push_ref(self):
     #     pass
     #
@@ -348,6 +506,19 @@ class TestGitCodeDriver():
         # Check that it doesn't exist
         result = self.git_code_manager.exists_datmo_files_in_worktree()
         assert result == False
+        # Check that other tracked files, even named like a shell command or
+        # starting with .datmo, are not taken for .datmo files
+        for filename in ["grep", "|", ".datmoignore"]:
+            with open(
+                    os.path.join(self.git_code_manager.filepath, filename),
+                    "wb") as f:
+                f.write(to_bytes(str("test")))
+        self.git_code_manager.add("grep")
+        self.git_code_manager.add("|")
+        self.git_code_manager.add(".datmoignore")
+        self.git_code_manager.commit(["-m", "other files"])
+        result = self.git_code_manager.exists_datmo_files_in_worktree()
+        assert result == False
         # Add files and commit then check they exist
         self.git_code_manager.add(".datmo", "-f")
         self.git_code_manager.commit(["-m", "test message"])
@@ -439,6 +610,65 @@ class TestGitCodeDriver():
         commit_id = self.git_code_manager.latest_commit()
         result = self.git_code_manager.exists_commit(commit_id)
         assert result == True
+        # Trees and options are not commits
+        tree_id = self.git_code_manager._run_checked(
+            ["rev-parse", commit_id + "^{tree}"])
+        assert self.git_code_manager.exists_commit(tree_id) == False
+        assert self.git_code_manager.exists_commit("--all") == False
+
+    def test_exists_commits(self):
+        self.git_code_manager.init()
+        assert self.git_code_manager.exists_commits([]) == []
+        test_filepath = os.path.join(self.git_code_manager.filepath,
+                                     "test.txt")
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test")))
+        commit_id = self.git_code_manager.create_ref()
+        tree_id = self.git_code_manager._run_checked(
+            ["rev-parse", commit_id + "^{tree}"])
+        result = self.git_code_manager.exists_commits(
+            [commit_id, "random", tree_id, "two words", commit_id[:10]])
+        assert result == [True, False, False, False, True]
+
+    def test_exists_commits_new_commit(self):
+        self.git_code_manager.init()
+        test_filepath = os.path.join(self.git_code_manager.filepath,
+                                     "test.txt")
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test")))
+        commit_id = self.git_code_manager.create_ref()
+        assert self.git_code_manager.exists_commits([commit_id[:10]]) == [True]
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test2")))
+        new_commit_id = self.git_code_manager.create_ref()
+        # Commits created after the process started are found
+        assert self.git_code_manager.exists_commits(
+            [commit_id, new_commit_id[:10]]) == [True, True]
+        assert self.git_code_manager._cat_file._process is not None
+        # Lookups which are found reuse the process
+        process = self.git_code_manager._cat_file._process
+        for _ in range(10):
+            assert self.git_code_manager.exists_commit(new_commit_id)
+        assert self.git_code_manager._cat_file._process is process
+        self.git_code_manager.close()
+        assert self.git_code_manager._cat_file._process is None
+
+    def test_read_object(self):
+        self.git_code_manager.init()
+        test_filepath = os.path.join(self.git_code_manager.filepath,
+                                     "test.txt")
+        with open(test_filepath, "wb") as f:
+            f.write(to_bytes(str("test")))
+        commit_id = self.git_code_manager.create_ref()
+        result = self.git_code_manager.read_object(commit_id + ":test.txt")
+        assert result == ("blob", b"test")
+        object_type, contents = self.git_code_manager.read_object(commit_id)
+        assert object_type == "commit"
+        assert contents.startswith(b"tree ")
+        assert self.git_code_manager.read_object("random") is None
+        assert self.git_code_manager.read_object("") is None
+        self.git_code_manager.close()
+
 
     # def test_branch(self):
     #     pass
@@ -603,6 +833,102 @@ class TestGitCodeDriver():
                              ".git/refs/datmo")
             )
 
+class TestGitCatFile():
+    """
+    Checks all functions of the GitCatFile
+    """
+
+    def setup_method(self):
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.git_code_manager = GitCodeDriver(
+            filepath=self.temp_dir, execpath="git")
+        self.git_code_manager.init()
+        with open(os.path.join(self.temp_dir, "test.txt"), "wb") as f:
+            f.write(to_bytes(str("test")))
+        self.commit_id = self.git_code_manager.create_ref()
+
+    def test_check(self):
+        cat_file = GitCatFile(self.temp_dir, "git")
+        assert cat_file.check([]) == []
+        result = cat_file.check([self.commit_id, "random", "two\nlines"])
+        assert result[0] == (self.commit_id, "commit", result[0][2])
+        assert result[1:] == [None, None]
+        cat_file.close()
+
+    def test_check_batches(self):
+        cat_file = GitCatFile(self.temp_dir, "git")
+        names = [self.commit_id, "random"] * (GitCatFile.BATCH_SIZE + 1)
+        result = cat_file.check(names)
+        assert len(result) == len(names)
+        assert all(item is not None for item in result[::2])
+        assert all(item is None for item in result[1::2])
+        cat_file.close()
+
+    def test_check_batch_mode(self):
+        cat_file = GitCatFile(self.temp_dir, "git", mode="batch")
+        result = cat_file.check([self.commit_id + ":test.txt", "random"] * 2)
+        assert [item[1] if item else None
+                for item in result] == ["blob", None, "blob", None]
+        cat_file.close()
+
+    def test_read(self):
+        cat_file = GitCatFile(self.temp_dir, "git", mode="batch")
+        assert cat_file.read(self.commit_id + ":test.txt") == ("blob",
+                                                                b"test")
+        assert cat_file.read("random") is None
+        cat_file.close()
+
+    def test_close(self):
+        cat_file = GitCatFile(self.temp_dir, "git")
+        cat_file.check([self.commit_id])
+        process = cat_file._process
+        cat_file.check([self.commit_id])
+        assert cat_file._process is process
+        cat_file.close()
+        assert process.poll() is not None
+        assert cat_file._process is None
+        # The process is started again on the next lookup
+        assert cat_file.check([self.commit_id])[0] is not None
+        cat_file.close()
+
+    def test_check_new_objects(self):
+        # Age the object directories as if they were written long before
+        objects_dirpath = os.path.join(self.temp_dir, ".git", "objects")
+        old_time = time.time() - 60
+        for dirname in os.listdir(objects_dirpath):
+            os.utime(
+                os.path.join(objects_dirpath, dirname), (old_time, old_time))
+        cat_file = GitCatFile(self.temp_dir, "git")
+        cat_file.check([self.commit_id])
+        process = cat_file._process
+        # Test missing objects do not restart the process if none were written
+        result = cat_file.check(["random", "0123456", self.commit_id[:8]])
+        assert result[:2] == [None, None]
+        assert result[2] is not None
+        assert cat_file._process is process
+        # Test objects written since the process started are found
+        with open(os.path.join(self.temp_dir, "test2.txt"), "wb") as f:
+            f.write(to_bytes(str("test2")))
+        commit_id = self.git_code_manager.create_ref()
+        result = cat_file.check([commit_id[:8], "random"])
+        assert result[0][0] == commit_id
+        assert result[1] is None
+        cat_file.close()
+
+    def test_check_not_repository(self):
+        temp_dir = tempfile.mkdtemp(dir=tempfile.gettempdir())
+        cat_file = GitCatFile(temp_dir, "git")
+        failed = False
+        try:
+            cat_file.check([self.commit_id])
+        except GitExecutionError:
+            failed = True
+        assert failed
+
 class TestGitHostDriver():
     """
     Checks all functions of the GitHostDriver
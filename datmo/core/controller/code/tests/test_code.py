@@ -25,6 +25,7 @@ except TypeError:
 from datmo.config import Config
 from datmo.core.controller.project import ProjectController
 from datmo.core.controller.code.code import CodeController
+from datmo.core.util.json_store import JSONStore
 from datmo.core.util.exceptions import (EntityNotFound, CommitDoesNotExist,
                                         CodeDoesNotExist, UnstagedChanges)
 
@@ -64,6 +65,36 @@ class TestCodeController():
         current_code_obj = self.code_controller.current_code()
         assert code_obj == current_code_obj
 
+    def test_current_code_private_index(self):
+        JSONStore(
+            os.path.join(self.temp_dir, Config().datmo_directory_name,
+                         ".config")).save("code.driver.type", "git")
+        JSONStore(
+            os.path.join(self.temp_dir, Config().datmo_directory_name,
+                         ".config")).save("code.git.private_index", True)
+        self.project_controller = ProjectController()
+        self.project_controller.init("test4", "test description")
+        self.code_controller = CodeController()
+        assert self.code_controller.code_driver.private_index
+
+        # Create test file
+        definition_filepath = os.path.join(self.code_controller.home,
+                                           "test.txt")
+        with open(definition_filepath, "wb") as f:
+            f.write(to_bytes(str("test")))
+
+        # Test failing with changes which are not in a commit
+        failed = False
+        try:
+            self.code_controller.current_code()
+        except UnstagedChanges:
+            failed = True
+        assert failed
+        # Test the current code is the code created from the private index
+        code_obj = self.code_controller.create()
+        current_code_obj = self.code_controller.current_code()
+        assert code_obj == current_code_obj
+
     def test_create(self):
         self.project_controller.init("test3", "test description")
 
@@ -8,6 +8,7 @@ from datmo.core.util.i18n import get as __
 from datmo.core.util.validation import validate
 from datmo.core.util.spinner import Spinner
 from datmo.core.util.json_store import JSONStore
+from datmo.core.util.hashing import get_hasher, get_dirhash_from_filehashes
 from datmo.core.util.misc_functions import get_datmo_temp_path, list_all_filepaths
 from datmo.core.util.exceptions import PathDoesNotExist, RequiredArgumentMissing, TooManyArgumentsFound,\
     EnvironmentNotInitialized, UnstagedChanges, ArgumentError, EnvironmentDoesNotExist, ProjectNotInitialized
@@ -291,11 +292,10 @@ class EnvironmentController(BaseController):
             get_by_id(environment_obj.file_collection_id)
         # TODO: Check hardware info here if different from creation time
         # Add in files for that environment id
-        environment_definition_path = os.path.join(self.home,
-                                                   file_collection_obj.path)
         # Copy to temp folder and remove files that are datmo specific
         _temp_env_dir = get_datmo_temp_path(self.home)
-        self.file_driver.copytree(environment_definition_path, _temp_env_dir)
+        self.file_driver.transfer_collection(file_collection_obj.filehash,
+                                             _temp_env_dir)
         # get definition filepath for the temp folder
         environment_definition_filepath = os.path.join(
             _temp_env_dir, environment_obj.definition_filename)
@@ -554,14 +554,15 @@ class EnvironmentController(BaseController):
                 __("error", "controller.environment.checkout_env",
                    environment_id))
         # Check if unstaged changes exist
-        if self._has_unstaged_changes():
+        env_hashes = self._calculate_project_environment_hashes()
+        if self._has_unstaged_changes(env_hashes=env_hashes):
             raise UnstagedChanges()
         # Check if environment has is same as current
         results = self.dal.environment.query({"id": environment_id})
         environment_obj = results[0]
         environment_hash = environment_obj.unique_hash
 
-        if self._calculate_project_environment_hash() == environment_hash:
+        if env_hashes[0] == environment_hash:
             return True
         # Remove all content from project environment directory
         for file in os.listdir(
@@ -578,11 +579,10 @@ class EnvironmentController(BaseController):
         # Add in files for that environment id
         file_collection_obj = self.dal.file_collection.\
             get_by_id(environment_obj.file_collection_id)
-        environment_definition_path = os.path.join(self.home,
-                                                   file_collection_obj.path)
         # Copy to temp folder and remove files that are datmo specific
         _temp_env_dir = get_datmo_temp_path(self.home)
-        self.file_driver.copytree(environment_definition_path, _temp_env_dir)
+        self.file_driver.transfer_collection(file_collection_obj.filehash,
+                                             _temp_env_dir)
         for filename in self.environment_driver.get_datmo_definition_filenames(
         ):
             os.remove(os.path.join(_temp_env_dir, filename))
@@ -652,6 +652,25 @@ class EnvironmentController(BaseController):
         str
             unique hash of the project environment directory
         """
+        environment_hash, environment_hash_no_hardware = \
+            self._calculate_project_environment_hashes()
+        if save_hardware_file:
+            return environment_hash
+        return environment_hash_no_hardware
+
+    def _calculate_project_environment_hashes(self):
+        """Return the environment hashes with and without the hardware info from
+        contents in project environment directory, hashing the files once. They are
+        the hashes of the environments create would make with and without saving
+        the hardware file
+
+        Returns
+        -------
+        environment_hash : str
+            unique hash of the project environment directory with the hardware info
+        environment_hash_no_hardware : str
+            unique hash of the project environment directory
+        """
         # Populate paths from the project environment directory
         paths = []
         if os.path.isdir(self.environment_driver.environment_directory_path):
@@ -662,36 +681,45 @@ class EnvironmentController(BaseController):
                         self.environment_driver.environment_directory_path)
             ])
 
-        # Create a temp dir to save any additional files necessary
-        _temp_dir = get_datmo_temp_path(self.home)
-
-        # Setup compatible environment and create add paths
-        paths = self._setup_compatible_environment(
-            {
-                "definition_filename":
-                    self.environment_driver.get_default_definition_filename()
-            },
-            paths,
-            _temp_dir,
-            save_hardware_file=save_hardware_file)
-
-        # Create new temp directory
-        _temp_dir_2 = get_datmo_temp_path(self.home)
-
-        # Hash the paths of the environment with a different temp dir
-        dirhash = self.file_driver.calculate_hash_paths(paths, _temp_dir_2)
-
-        # Remove both temporary directories
-        shutil.rmtree(_temp_dir)
-        shutil.rmtree(_temp_dir_2)
+        # Create the default definition in a temp dir if it is not present
+        definition_filename = self.environment_driver.get_default_definition_filename(
+        )
+        _temp_dir = None
+        if all(definition_filename not in path for path in paths):
+            _temp_dir = get_datmo_temp_path(self.home)
+            self.environment_driver.create_default_definition(_temp_dir)
+            paths.append(os.path.join(_temp_dir, definition_filename))
 
-        return dirhash
+        try:
+            filehashes = self.file_driver.calculate_filehashes_paths(paths)
+        finally:
+            if _temp_dir:
+                shutil.rmtree(_temp_dir)
+
+        # Hash the hardware info as it is saved to the hardware file
+        hash_algorithm = self.get_hash_algorithm()
+        hardware_filehash = get_hasher(hash_algorithm)
+        hardware_filehash.update(
+            JSONStore.dumps(
+                self.environment_driver.get_hardware_info()).encode("utf-8"))
+
+        environment_hash = get_dirhash_from_filehashes(
+            filehashes + [hardware_filehash.hexdigest()],
+            algorithm=hash_algorithm)
+        environment_hash_no_hardware = get_dirhash_from_filehashes(
+            filehashes, algorithm=hash_algorithm)
+        return environment_hash, environment_hash_no_hardware
+
+    def _has_unstaged_changes(self, env_hashes=None):
+        """Return whether there are unstaged changes
 
-    def _has_unstaged_changes(self):
-        """Return whether there are unstaged changes"""
-        env_hash = self._calculate_project_environment_hash()
-        env_hash_no_hardware = self._calculate_project_environment_hash(
-            save_hardware_file=False)
+        Parameters
+        ----------
+        env_hashes : tuple, optional
+            hashes from _calculate_project_environment_hashes, calculated if not given
+        """
+        env_hash, env_hash_no_hardware = env_hashes if env_hashes else \
+            self._calculate_project_environment_hashes()
         environment_files = list_all_filepaths(
             self.environment_driver.environment_directory_path)
         if self.exists(environment_unique_hash=env_hash) or self.exists(
@@ -1040,6 +1040,25 @@ class TestEnvironmentController():
         assert result == "1e32ff083520f792cbe4bafdc2de2a01"
         assert result == environment_obj_1.unique_hash
 
+    def test_calculate_project_environment_hashes(self):
+        # Setup
+        self.__setup()
+        # Test the hashes are those of create with and without the hardware file
+        result, result_no_hardware = self.environment_controller.\
+            _calculate_project_environment_hashes()
+        assert result != result_no_hardware
+        environment_obj = self.environment_controller.create({})
+        self.environment_ids.append(environment_obj.id)
+        assert result == environment_obj.unique_hash
+        environment_obj_no_hardware = self.environment_controller.create(
+            {}, save_hardware_file=False)
+        self.environment_ids.append(environment_obj_no_hardware.id)
+        assert result_no_hardware == environment_obj_no_hardware.unique_hash
+        assert self.environment_controller._calculate_project_environment_hash(
+        ) == result
+        assert self.environment_controller._calculate_project_environment_hash(
+            save_hardware_file=False) == result_no_hardware
+
     def test_has_unstaged_changes(self):
         # Setup
         self.__setup()
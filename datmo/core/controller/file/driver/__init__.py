@@ -20,12 +20,16 @@ class FileDriver(with_metaclass(ABCMeta, object)):
         takes a list of absolute filepaths and aggregates into collection
     get_collection_path(filehash)
         return the collection path by filehash
+    get_collection_entries(filehash)
+        return entries for the collection files without opening them
     exists_collection(filehash)
         checks if a collection exists based on filehash
     delete_collection(filehash)
         deletes collection based on filehash
     transfer_collection(filehash, dst_dirpath)
         transfers collection contents to absolute dst path
+    gc(filehashes, dry_run=False)
+        deletes the collections which are not kept and the files only they use
     """
 
     @abstractmethod
@@ -141,13 +145,15 @@ class FileDriver(with_metaclass(ABCMeta, object)):
 
     @staticmethod
     @abstractmethod
-    def get_filehash(filepath):
+    def get_filehash(filepath, algorithm):
         """Return the hash of the file path given
 
         Parameters
         ----------
         filepath : str
             path of the file
+        algorithm : str
+            name of the hash algorithm
 
         Returns
         -------
@@ -157,13 +163,15 @@ class FileDriver(with_metaclass(ABCMeta, object)):
 
     @staticmethod
     @abstractmethod
-    def get_dirhash(dirpath):
+    def get_dirhash(dirpath, algorithm):
         """Return the hash of the directory path given
 
         Parameters
         ----------
         dirpath : str
             path of the directory
+        algorithm : str
+            name of the hash algorithm
 
         Returns
         -------
@@ -189,16 +197,17 @@ class FileDriver(with_metaclass(ABCMeta, object)):
         pass
 
     @abstractmethod
-    def calculate_hash_paths(self, paths, directory):
-        """Takes a list of user given paths, copies to directory, and returns hash
+    def calculate_hash_paths(self, paths, directory=None):
+        """Takes a list of user given paths and returns the hash of the collection
+        they would create
 
         Parameters
         ----------
         paths : list
             list of absolute or relative filepaths and/or dirpaths to collect with destination names
             (e.g. "/path/to/file>hello", "/path/to/file2", "/path/to/dir>newdir")
-        directory : str
-            directory to aggregate paths
+        directory : str, optional
+            directory to aggregate paths, for drivers which need a copy of them
 
         Returns
         -------
@@ -206,6 +215,23 @@ class FileDriver(with_metaclass(ABCMeta, object)):
             hash of all of the paths in a directory
         """
 
+    @abstractmethod
+    def calculate_filehashes_paths(self, paths):
+        """Takes a list of user given paths and returns the hashes of the files
+        they would add to a collection
+
+        Parameters
+        ----------
+        paths : list
+            list of absolute or relative filepaths and/or dirpaths to collect with destination names
+            (e.g. "/path/to/file>hello", "/path/to/file2", "/path/to/dir>newdir")
+
+        Returns
+        -------
+        list
+            hashes of the files, in any order
+        """
+
     @abstractmethod
     def get_collection_path(self, filehash):
         """Return the collection path by filehash
@@ -256,6 +282,39 @@ class FileDriver(with_metaclass(ABCMeta, object)):
             file in the collection opened in mode specified
         """
 
+    @abstractmethod
+    def iter_collection_entries(self, filehash):
+        """Iterate over entries for the collection files, which are only opened
+        when they are asked to
+
+        Parameters
+        ----------
+        filehash : str
+            hash representing the files in the collection
+
+        Returns
+        -------
+        generator
+            entries with the path, size and hash of each file in the collection
+            and an open method
+        """
+
+    @abstractmethod
+    def get_collection_entries(self, filehash):
+        """Retrieve entries for the collection files without opening them
+
+        Parameters
+        ----------
+        filehash : str
+            hash representing the files in the collection
+
+        Returns
+        -------
+        list
+            entries with the path, size and hash of each file in the collection
+            and an open method
+        """
+
     @abstractmethod
     def delete_collection(self, filehash):
         """Deletes collection based on filehash
@@ -288,4 +347,26 @@ class FileDriver(with_metaclass(ABCMeta, object)):
         bool
             True if successful
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def gc(self, filehashes, dry_run=False):
+        """Deletes the collections which are not kept and the stored files which
+        are not used by any remaining collection. Recent collections, which may not
+        be recorded by an entity yet, are always kept
+
+        Parameters
+        ----------
+        filehashes : list
+            hashes of the collections to keep
+        dry_run : bool, optional
+            if True nothing is deleted, only what would be is reported
+            (default is False)
+
+        Returns
+        -------
+        dict
+            for each kind of item deleted, the "count" of items and the "bytes"
+            reclaimed by deleting them
+        """
+        pass
@@ -2,8 +2,8 @@ import os
 import stat
 import shutil
 import glob
-import hashlib
-import checksumdir
+import time
+import tempfile
 from io import open
 try:
     to_unicode = str
@@ -15,16 +15,227 @@ from datmo.core.util.exceptions import (
     PathDoesNotExist, FileIOError, FileStructureError, FileAlreadyExistsError,
     DirAlreadyExistsError)
 from datmo.core.controller.file.driver import FileDriver
-from datmo.core.util.misc_functions import get_datmo_temp_path, parse_paths
+from datmo.core.util.misc_functions import (get_datmo_temp_path, parse_paths,
+                                            clone_file)
+from datmo.core.util.hashing import (
+    get_filehash, get_filehashes, get_dirhash, get_dirhash_from_filehashes,
+    get_hasher, DEFAULT_ALGORITHM)
+from datmo.core.util.pack_store import PackStore
+
+def _is_write_mode(mode):
+    """Returns True if a file open mode allows writing to the file"""
+    return any(char in mode for char in "wax+")
+
+def _detach_file(filepath):
+    """Replace a read only file of a collection by a writable copy of it, so
+    writing to it does not change the blob it is linked to or the other
+    collections linked to the blob
+
+    Parameters
+    ----------
+    filepath : str
+        absolute path of the file
+    """
+    file_mode = stat.S_IMODE(os.stat(filepath).st_mode)
+    if file_mode & stat.S_IWUSR:
+        return
+    fd, temp_filepath = tempfile.mkstemp(dir=os.path.dirname(filepath))
+    os.close(fd)
+    try:
+        shutil.copyfile(filepath, temp_filepath)
+        os.chmod(temp_filepath, file_mode | stat.S_IWUSR)
+        os.replace(temp_filepath, filepath)
+    except (IOError, OSError):
+        if os.path.isfile(temp_filepath):
+            os.remove(temp_filepath)
+        raise
+
+class FileEntry(object):
+    """Entry for a file in a collection or directory, which is only opened or hashed
+    when it is asked to
+
+    Parameters
+    ----------
+    path : str
+        absolute path of the file
+    relative_path : str
+        path of the file relative to its collection or directory
+    hash_algorithm : str, optional
+        name of the algorithm the file is hashed with
+        (default is datmo.core.util.hashing.DEFAULT_ALGORITHM)
+
+    Attributes
+    ----------
+    path : str
+        absolute path of the file
+    name : str
+        absolute path of the file, as for the name of a python file object
+    relative_path : str
+        path of the file relative to its collection or directory
+    size : int
+        size of the file in bytes
+    filehash : str
+        hash of the contents of the file, computed on first access
+
+    Methods
+    -------
+    open(mode="r")
+        open the file
+    """
+
+    def __init__(self, path, relative_path, hash_algorithm=DEFAULT_ALGORITHM):
+        self.path = path
+        self.name = path
+        self.relative_path = relative_path
+        self.hash_algorithm = hash_algorithm
+        self._filehash = None
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    @property
+    def filehash(self):
+        if self._filehash is None:
+            self._filehash = get_filehash(
+                self.path, algorithm=self.hash_algorithm)
+        return self._filehash
+
+    def open(self, mode="r"):
+        """Open the file, the caller is responsible for closing it
+
+        Parameters
+        ----------
+        mode : str, optional
+            file object open mode
+            (default is "r" to open the file for read)
+
+        Returns
+        -------
+        file object
+            python file object for the file
+        """
+        return open(self.path, mode)
+
+    def __eq__(self, other):
+        return isinstance(other, FileEntry) and self.path == other.path
+
+    def __repr__(self):
+        return "FileEntry(%r)" % self.relative_path
+
+class CollectionEntry(FileEntry):
+    """Entry for a file in a collection directory, which is linked to the blob
+    pool, so it is replaced by a copy of its own before it is opened for write"""
+
+    def open(self, mode="r"):
+        if _is_write_mode(mode):
+            _detach_file(self.path)
+        return super(CollectionEntry, self).open(mode)
+
+    def __repr__(self):
+        return "CollectionEntry(%r)" % self.relative_path
+
+class PackEntry(FileEntry):
+    """Entry for a file in a packed collection, which is read from the pack
+
+    Parameters
+    ----------
+    pack_store : datmo.core.util.pack_store.PackStore
+        store of the collection
+    relative_path : str
+        path of the file relative to its collection
+    hash_algorithm : str, optional
+        name of the algorithm the file is hashed with
+        (default is datmo.core.util.hashing.DEFAULT_ALGORITHM)
+    """
+
+    def __init__(self, pack_store, relative_path,
+                 hash_algorithm=DEFAULT_ALGORITHM):
+        super(PackEntry, self).__init__(
+            os.path.join(pack_store.dirpath, relative_path),
+            relative_path,
+            hash_algorithm=hash_algorithm)
+        self._pack_store = pack_store
+
+    @property
+    def size(self):
+        return self._pack_store.getsize(self.relative_path)
+
+    @property
+    def filehash(self):
+        if self._filehash is None:
+            filehash = get_hasher(self.hash_algorithm)
+            with self.open("rb") as f:
+                while True:
+                    data = f.read(PackStore.CHUNK_SIZE)
+                    if not data:
+                        break
+                    filehash.update(data)
+            self._filehash = filehash.hexdigest()
+        return self._filehash
+
+    def open(self, mode="r"):
+        """Open the file for read from the pack, the caller is responsible for
+        closing it
+
+        Parameters
+        ----------
+        mode : str, optional
+            "r" to read text or "rb" to read bytes
+            (default is "r")
+
+        Returns
+        -------
+        file object
+            python file object for the file
+        """
+        return self._pack_store.open(self.relative_path, mode)
+
+    def __repr__(self):
+        return "PackEntry(%r)" % self.relative_path
 
 class LocalFileDriver(FileDriver):
     """
     This FileDriver ensures that the .datmo directory and file based components are present
+
+    Parameters
+    ----------
+    root : str
+        absolute path of the root of the project
+    datmo_directory_name : str
+        name of the datmo directory within the root
+    hash_algorithm : str, optional
+        name of the algorithm collections are hashed with
+        (default is datmo.core.util.hashing.DEFAULT_ALGORITHM)
+    pack_collections : bool, optional
+        if True new collections are compressed into a pack instead of linked to
+        the blob pool, collections of either kind are read the same way
+        (default is False)
     """
 
-    def __init__(self, root, datmo_directory_name):
+    # Blobs, and the collection files linked to them, are read only as they
+    # are shared by every collection with the same file. Hardlinks share the
+    # mode of the blob, so executable files are stored in separate blobs
+    BLOB_MODE = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+    EXECUTABLE_BLOB_MODE = BLOB_MODE | stat.S_IXUSR | stat.S_IXGRP | \
+        stat.S_IXOTH
+    # Seconds after which collections, temp files and blobs in no collection are
+    # no longer in use by a running command and are deleted by gc
+    GC_MIN_AGE = 60 * 60
+
+    def __init__(self,
+                 root,
+                 datmo_directory_name,
+                 hash_algorithm=DEFAULT_ALGORITHM,
+                 pack_collections=False):
         super(LocalFileDriver, self).__init__()
         self.root = root
+        # Fail on an unsupported algorithm before anything is hashed
+        get_hasher(hash_algorithm)
+        self.hash_algorithm = hash_algorithm
+        # Collection created on init, it is always kept
+        self.empty_collection_hash = get_dirhash_from_filehashes(
+            [], algorithm=self.hash_algorithm)
         # Check if root exists
         if not os.path.exists(self.root):
             raise PathDoesNotExist(
@@ -39,6 +250,16 @@ class LocalFileDriver(FileDriver):
         self.files_directory_name = "files"
         self.files_directory = os.path.join(
             self.root, self.datmo_directory_name, self.files_directory_name)
+        # Pool of the contents of the files in collections, by their hash
+        self.blobs_directory_name = "blobs"
+        self.blobs_directory = os.path.join(
+            self.root, self.datmo_directory_name, self.blobs_directory_name,
+            self.hash_algorithm)
+        # Compressed packs of the collections created with pack_collections
+        self.pack_collections = pack_collections
+        self.packs_directory_name = "packs"
+        self.packs_directory = os.path.join(
+            self.root, self.datmo_directory_name, self.packs_directory_name)
         self._is_initialized = self.is_initialized
         self.type = "local"
 
@@ -111,7 +332,7 @@ class LocalFileDriver(FileDriver):
         if self.exists_hidden_datmo_file_structure():
             if os.path.isdir(
                     os.path.join(self.datmo_directory, "collections",
-                                 "d41d8cd98f00b204e9800998ecf8427e")):
+                                 self.empty_collection_hash)):
                 self._is_initialized = True
                 return self._is_initialized
         self._is_initialized = False
@@ -126,10 +347,10 @@ class LocalFileDriver(FileDriver):
             # Ensure the empty collection exists
             if not os.path.isdir(
                     os.path.join(self.datmo_directory, "collections",
-                                 "d41d8cd98f00b204e9800998ecf8427e")):
+                                 self.empty_collection_hash)):
                 self.create(
                     os.path.join(self.datmo_directory, "collections",
-                                 "d41d8cd98f00b204e9800998ecf8427e"),
+                                 self.empty_collection_hash),
                     directory=True)
         except Exception as e:
             raise FileIOError(
@@ -191,6 +412,45 @@ class LocalFileDriver(FileDriver):
             filepath = os.path.join(self.root, relative_path)
             return open(filepath, mode)
 
+    def iter_entries(self, relative_path):
+        """Iterate over entries for the files in a directory without opening any
+        of them. Files are listed before subdirectories, both in sorted order
+
+        Parameters
+        ----------
+        relative_path : str
+            relative path of the directory from base filepath
+
+        Returns
+        -------
+        generator
+            FileEntry objects for the files in the directory
+
+        Raises
+        ------
+        PathDoesNotExist
+            if the directory does not exist
+        """
+        dirpath = os.path.join(self.root, relative_path)
+        if not os.path.isdir(dirpath):
+            raise PathDoesNotExist(
+                __("error", "controller.file.driver.local.get", dirpath))
+        return self._iter_entries(dirpath)
+
+    def _iter_entries(self, dirpath, entry_class=FileEntry):
+        for dirname, dirnames, filenames in os.walk(dirpath):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                absolute_filepath = os.path.join(dirname, filename)
+                yield entry_class(
+                    absolute_filepath,
+                    os.path.relpath(absolute_filepath, dirpath),
+                    hash_algorithm=self.hash_algorithm)
+
+    def get_entries(self, relative_path):
+        """Return entries for the files in a directory, see iter_entries"""
+        return list(self.iter_entries(relative_path))
+
     def ensure(self, relative_path, directory=False):
         if not self.exists(relative_path, directory=directory):
             self.create(relative_path, directory=directory)
@@ -208,101 +468,313 @@ class LocalFileDriver(FileDriver):
         return True
 
     def create_collection(self, paths):
+        """Create a collection from the paths, without copying the files to a
+        temporary directory first
+
+        The files are hashed where they are and their contents are stored once in
+        the blob pool. Files in collections are hardlinks to the blobs, or reflinks
+        or copies of them if the filesystem does not support hardlinks, so files
+        which are in several collections are only stored once. Collections are
+        immutable, so their files must not be changed in place
+
+        With pack_collections the files are compressed into a pack for the
+        collection instead, see datmo.core.util.pack_store.PackStore
+        """
         if not self.is_initialized:
             raise FileStructureError(
                 __("error",
                    "controller.file.driver.local.create_collection.structure"))
 
         self.ensure_collections_dir()
-        temp_collection_path = get_datmo_temp_path(self.root)
+        filepaths, dirpaths, files_rel, dirs_rel = self._list_paths(paths)
+        src_stats = [os.stat(src_filepath) for src_filepath, _ in filepaths]
+        filehashes = get_filehashes(
+            [src_filepath for src_filepath, _ in filepaths],
+            algorithm=self.hash_algorithm)
+        filehash = get_dirhash_from_filehashes(
+            filehashes, algorithm=self.hash_algorithm)
 
-        _, _, files_rel, dirs_rel = parse_paths(self.root, paths,
-                                                temp_collection_path)
+        if self.exists_collection(filehash):
+            return filehash, files_rel, dirs_rel
+            # raise FileStructureError("exception.file.create_collection", {
+            #     "exception": "File collection with id already exists."
+            # })
 
-        filehash = self.calculate_hash_paths(paths, temp_collection_path)
+        if self.pack_collections:
+            return self._create_pack(filepaths,
+                                     dirpaths), files_rel, dirs_rel
 
-        # Move contents to folder with filehash as name and remove temp_collection_path
+        # Hashes change if files are changed while they are stored
+        executables = [
+            bool(src_stat.st_mode & stat.S_IXUSR) for src_stat in src_stats
+        ]
+        filehashes = [
+            self._store_blob(src_filepath, src_stat, src_filehash)
+            for (src_filepath, _), src_stat, src_filehash in zip(
+                filepaths, src_stats, filehashes)
+        ]
+        filehash = get_dirhash_from_filehashes(
+            filehashes, algorithm=self.hash_algorithm)
         collection_path = os.path.join(self.datmo_directory, "collections",
                                        filehash)
-        if os.path.isdir(collection_path):
+        if self.exists_collection(filehash):
             return filehash, files_rel, dirs_rel
-            # raise FileStructureError("exception.file.create_collection", {
-            #     "exception": "File collection with id already exists."
-            # })
-        os.makedirs(collection_path)
-        self.copytree(temp_collection_path, collection_path)
 
-        # Change permissions to read only for collection_path. File collection is immutable
-        mode = stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
+        # Build the collection in a temp directory and move it in place at once
+        temp_collection_path = get_datmo_temp_path(self.root)
+        try:
+            for dirpath in dirpaths:
+                os.makedirs(
+                    os.path.join(temp_collection_path, dirpath), exist_ok=True)
+            for (_, dst_filepath), blob_filehash, executable in zip(
+                    filepaths, filehashes, executables):
+                dst_abs_filepath = os.path.join(temp_collection_path,
+                                                dst_filepath)
+                os.makedirs(
+                    os.path.dirname(dst_abs_filepath), exist_ok=True)
+                self._link_blob(blob_filehash, dst_abs_filepath, executable)
 
-        for root, dirs, files in os.walk(collection_path, topdown=False):
-            for dir in [os.path.join(root, d) for d in dirs]:
-                os.chmod(dir, mode)
-            for file in [os.path.join(root, f) for f in files]:
-                os.chmod(file, mode)
+            # Change permissions to read only for collection_path. File collection is immutable
+            mode = stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
 
-        # Removing temp collection path
-        shutil.rmtree(temp_collection_path)
+            for root, dirs, _ in os.walk(temp_collection_path):
+                for dir in [os.path.join(root, d) for d in dirs]:
+                    os.chmod(dir, mode)
+            os.chmod(temp_collection_path, mode)
+            try:
+                os.rename(temp_collection_path, collection_path)
+            except OSError:
+                # Another process created the same collection
+                if not os.path.isdir(collection_path):
+                    raise
+        finally:
+            # Removing temp collection path
+            if os.path.isdir(temp_collection_path):
+                shutil.rmtree(temp_collection_path)
         return filehash, files_rel, dirs_rel
 
-    def calculate_hash_paths(self, paths, directory):
+    def _create_pack(self, filepaths, dirpaths):
+        """Compress the files and directories of a collection into a pack and
+        return the hash of the collection, which is computed from the contents
+        written to the pack in case files changed since they were hashed"""
+        temp_pack_path = get_datmo_temp_path(self.root)
         try:
-            files, dirs, _, _ = parse_paths(self.root, paths, directory)
+            filehashes = PackStore(temp_pack_path).write(
+                filepaths, dirpaths, algorithm=self.hash_algorithm)
+            filehash = get_dirhash_from_filehashes(
+                filehashes, algorithm=self.hash_algorithm)
+            if not self.exists_collection(filehash):
+                if not os.path.isdir(self.packs_directory):
+                    os.makedirs(self.packs_directory, exist_ok=True)
+                try:
+                    os.rename(temp_pack_path, self._get_pack_path(filehash))
+                except OSError:
+                    # Another process created the same collection
+                    if not self._is_packed(filehash):
+                        raise
+        finally:
+            if os.path.isdir(temp_pack_path):
+                shutil.rmtree(temp_pack_path)
+        return filehash
+
+    def _get_pack_path(self, filehash):
+        return os.path.join(self.packs_directory, filehash)
+
+    def _is_packed(self, filehash):
+        """Return True if the collection is a pack and not a directory"""
+        return not os.path.isdir(
+            os.path.join(self.collections_directory, filehash)) and \
+            PackStore.exists(self._get_pack_path(filehash))
+
+    def _list_paths(self, paths):
+        """Return the files and directories of a collection from the user given
+        paths, as they would be after copying them to the collection
+
+        Returns
+        -------
+        filepaths : list
+            list of file tuples of the form (absolute_source_path, relative_dest_path)
+        dirpaths : list
+            relative paths of the directories in the collection, including empty ones
+        files_rel : list
+            list of file tuples from parse_paths
+        dirs_rel : list
+            list of directory tuples from parse_paths
+
+        Raises
+        ------
+        PathDoesNotExist
+            if any of the paths does not exist
+        FileAlreadyExistsError
+            if a file is collected to a destination which is already used
+        DirAlreadyExistsError
+            if a directory is collected to a destination which is already used
+        """
+        try:
+            _, _, files_rel, dirs_rel = parse_paths(self.root, paths, "")
         except PathDoesNotExist as e:
             raise PathDoesNotExist(
                 __("error",
                    "controller.file.driver.local.create_collection.filepath",
                    str(e)))
-
-        # Populate collection from left to right in lists
-        for file_tuple in files:
-            src_abs_filepath, dest_abs_filepath = file_tuple
-            if os.path.exists(dest_abs_filepath):
+        dst_paths = set()
+        filepaths, dirpaths = [], []
+        for src_abs_filepath, dst_filepath in files_rel:
+            if dst_filepath in dst_paths:
                 raise FileAlreadyExistsError(
                     __("error",
                        "controller.file.driver.create_collection.file_exists",
-                       dest_abs_filepath))
-            # File is copied over to the new destination path
-            shutil.copy2(src_abs_filepath, dest_abs_filepath)
-
-        for dir_tuple in dirs:
-            src_abs_dirpath, dest_abs_dirpath = dir_tuple
-            if os.path.exists(dest_abs_dirpath):
+                       dst_filepath))
+            dst_paths.add(dst_filepath)
+            filepaths.append((src_abs_filepath, dst_filepath))
+        for src_abs_dirpath, dst_dirpath in dirs_rel:
+            if dst_dirpath in dst_paths:
                 raise DirAlreadyExistsError(
                     __("error",
                        "controller.file.driver.create_collection.dir_exists",
-                       dest_abs_dirpath))
-            os.makedirs(dest_abs_dirpath)
-            # All contents of directory is copied over to the new directory path
-            self.copytree(src_abs_dirpath, dest_abs_dirpath)
+                       dst_dirpath))
+            dst_paths.add(dst_dirpath)
+            dirpaths.append(dst_dirpath)
+            # Links are followed, as they are when the directory is copied
+            for dirpath, dirnames, filenames in os.walk(
+                    src_abs_dirpath, followlinks=True):
+                rel_dirpath = os.path.relpath(dirpath, src_abs_dirpath)
+                dst_rel_dirpath = os.path.normpath(
+                    os.path.join(dst_dirpath, rel_dirpath))
+                dirpaths.extend(
+                    os.path.join(dst_rel_dirpath, dirname)
+                    for dirname in dirnames)
+                filepaths.extend((os.path.join(dirpath, filename),
+                                  os.path.join(dst_rel_dirpath, filename))
+                                 for filename in filenames)
+        return filepaths, dirpaths, files_rel, dirs_rel
+
+    def _get_blob_path(self, filehash, executable=False):
+        if executable:
+            return os.path.join(self.blobs_directory, filehash[:2],
+                                filehash + ".x")
+        return os.path.join(self.blobs_directory, filehash[:2], filehash)
+
+    def _store_blob(self, src_filepath, src_stat, filehash):
+        """Store the contents of a file in the blob pool unless they already are
+
+        Parameters
+        ----------
+        src_filepath : str
+            absolute path of the file to store
+        src_stat : os.stat_result
+            stat of the file when it was hashed, files executable by their owner
+            are stored in executable blobs
+        filehash : str
+            hash of the file when it was hashed
+
+        Returns
+        -------
+        str
+            hash of the stored contents, which is different from filehash if the
+            file was changed after it was hashed
+        """
+        executable = bool(src_stat.st_mode & stat.S_IXUSR)
+        if os.path.isfile(self._get_blob_path(filehash, executable)):
+            return filehash
+        blob_dirpath = os.path.dirname(self._get_blob_path(filehash))
+        if not os.path.isdir(blob_dirpath):
+            os.makedirs(blob_dirpath, exist_ok=True)
+        fd, temp_blob_path = tempfile.mkstemp(dir=blob_dirpath)
+        os.close(fd)
+        try:
+            clone_file(src_filepath, temp_blob_path)
+            # The copy keeps the modification time, so it is the same file
+            # as was hashed if its size and modification time are the same
+            temp_blob_stat = os.stat(temp_blob_path)
+            if (temp_blob_stat.st_size, temp_blob_stat.st_mtime_ns) != \
+                    (src_stat.st_size, src_stat.st_mtime_ns):
+                filehash = self.get_filehash(
+                    temp_blob_path, algorithm=self.hash_algorithm)
+                if not os.path.isdir(
+                        os.path.dirname(self._get_blob_path(filehash))):
+                    os.makedirs(
+                        os.path.dirname(self._get_blob_path(filehash)),
+                        exist_ok=True)
+            os.chmod(temp_blob_path, self.EXECUTABLE_BLOB_MODE
+                     if executable else self.BLOB_MODE)
+            os.replace(temp_blob_path,
+                       self._get_blob_path(filehash, executable))
+        except (IOError, OSError):
+            if os.path.isfile(temp_blob_path):
+                os.remove(temp_blob_path)
+            raise
+        return filehash
+
+    def _link_blob(self, filehash, dst_filepath, executable=False):
+        """Add a blob to a collection as a hardlink, or as a reflink or a copy
+        where hardlinks are not supported"""
+        blob_path = self._get_blob_path(filehash, executable)
+        try:
+            os.link(blob_path, dst_filepath)
+        except OSError:
+            clone_file(blob_path, dst_filepath)
+            os.chmod(dst_filepath, self.EXECUTABLE_BLOB_MODE
+                     if executable else self.BLOB_MODE)
+
+    def calculate_hash_paths(self, paths, directory=None):
+        """Return the hash of the collection the paths would create, computed from
+        the source files where they are, so nothing is copied or written
+
+        Parameters
+        ----------
+        paths : list
+            list of absolute or relative filepaths and/or dirpaths to collect with destination names
+            (e.g. "/path/to/file>hello", "/path/to/file2", "/path/to/dir>newdir")
+        directory : str, optional
+            not used, files used to be copied to it before they were hashed
+
+        Returns
+        -------
+        str
+            hash of all of the paths, the same as the hash of a directory they
+            are copied to
+        """
+        return get_dirhash_from_filehashes(
+            self.calculate_filehashes_paths(paths),
+            algorithm=self.hash_algorithm)
 
-        # Hash the files to find filehash
-        return self.get_dirhash(directory)
+    def calculate_filehashes_paths(self, paths):
+        """Return the hashes of the files the paths would add to a collection,
+        computed from the source files where they are
+
+        Parameters
+        ----------
+        paths : list
+            list of absolute or relative filepaths and/or dirpaths to collect with destination names
+            (e.g. "/path/to/file>hello", "/path/to/file2", "/path/to/dir>newdir")
+
+        Returns
+        -------
+        list
+            hashes of the files, which give the hash of the paths with
+            datmo.core.util.hashing.get_dirhash_from_filehashes
+        """
+        filepaths, _, _, _ = self._list_paths(paths)
+        return get_filehashes([src_filepath for src_filepath, _ in filepaths],
+                              algorithm=self.hash_algorithm)
 
     @staticmethod
-    def get_filehash(absolute_filepath):
-        if not os.path.isfile(absolute_filepath):
-            raise PathDoesNotExist(
-                __("error", "util.misc_functions.get_filehash",
-                   absolute_filepath))
-        BUFF_SIZE = 65536
-        sha1 = hashlib.md5()
-        with open(absolute_filepath, "rb") as f:
-            while True:
-                data = f.read(BUFF_SIZE)
-                if not data:
-                    break
-                sha1.update(data)
-        return sha1.hexdigest()
+    def get_filehash(absolute_filepath, algorithm=DEFAULT_ALGORITHM):
+        return get_filehash(absolute_filepath, algorithm=algorithm)
 
     @staticmethod
-    def get_dirhash(absolute_dirpath):
-        return checksumdir.dirhash(absolute_dirpath)
+    def get_dirhash(absolute_dirpath, algorithm=DEFAULT_ALGORITHM):
+        return get_dirhash(absolute_dirpath, algorithm=algorithm)
 
     def get_absolute_collection_path(self, filehash):
-        return os.path.join(self.datmo_directory, "collections", filehash)
+        return os.path.join(self.root,
+                            self.get_relative_collection_path(filehash))
 
     def get_relative_collection_path(self, filehash):
+        if self._is_packed(filehash):
+            return os.path.join(self.datmo_directory_name,
+                                self.packs_directory_name, filehash)
         return os.path.join(self.datmo_directory_name, "collections", filehash)
 
     def get_collection_path(self, filehash):
@@ -311,17 +783,51 @@ class LocalFileDriver(FileDriver):
     def exists_collection(self, filehash):
         relative_collection_path = os.path.join(self.datmo_directory_name,
                                                 "collections", filehash)
-        return self.exists(relative_collection_path, directory=True)
+        return self.exists(relative_collection_path, directory=True) or \
+            self._is_packed(filehash)
 
     def get_collection_files(self, filehash, mode="r"):
+        if self._is_packed(filehash):
+            pack_store = PackStore(self._get_pack_path(filehash))
+            return [
+                pack_store.open(path, mode) for path in pack_store.list()
+            ]
         relative_collection_path = os.path.join(self.datmo_directory_name,
                                                 "collections", filehash)
+        if _is_write_mode(mode):
+            for entry in self.iter_entries(relative_collection_path):
+                _detach_file(entry.path)
         # Call get function with the directory=True parameter
         return self.get(relative_collection_path, mode=mode, directory=True)
 
+    def iter_collection_entries(self, filehash):
+        if self._is_packed(filehash):
+            pack_store = PackStore(self._get_pack_path(filehash))
+            return (PackEntry(
+                pack_store,
+                os.path.normpath(path),
+                hash_algorithm=self.hash_algorithm)
+                    for path in pack_store.list())
+        relative_collection_path = os.path.join(self.datmo_directory_name,
+                                                "collections", filehash)
+        dirpath = os.path.join(self.root, relative_collection_path)
+        if not os.path.isdir(dirpath):
+            raise PathDoesNotExist(
+                __("error", "controller.file.driver.local.get", dirpath))
+        return self._iter_entries(dirpath, entry_class=CollectionEntry)
+
+    def get_collection_entries(self, filehash):
+        return list(self.iter_collection_entries(filehash))
+
     def delete_collection(self, filehash):
         relative_collection_path = os.path.join(self.datmo_directory_name,
                                                 "collections", filehash)
+        relative_pack_path = os.path.join(self.datmo_directory_name,
+                                          self.packs_directory_name, filehash)
+        if self.exists(relative_pack_path, directory=True):
+            self.delete(relative_pack_path, directory=True)
+            if not self.exists(relative_collection_path, directory=True):
+                return True
         return self.delete(relative_collection_path, directory=True)
 
     def transfer_collection(self, filehash, dst_dirpath):
@@ -334,9 +840,138 @@ class LocalFileDriver(FileDriver):
                 __("error",
                    "controller.file.driver.local.transfer_collection.dst",
                    dst_dirpath))
+        if self._is_packed(filehash):
+            return PackStore(self._get_pack_path(filehash)).extract(dst_dirpath)
         collection_path = os.path.join(self.datmo_directory, "collections",
                                        filehash)
-        return self.copytree(collection_path, dst_dirpath)
+        self.copytree(collection_path, dst_dirpath)
+        # Copies of the read only collection files are writable, and keep the
+        # executable bits of the executable blobs they are linked to
+        for item in os.listdir(collection_path):
+            dst_path = os.path.join(dst_dirpath, item)
+            if not os.path.isdir(dst_path):
+                os.chmod(dst_path, os.stat(dst_path).st_mode | stat.S_IWUSR)
+                continue
+            for dirpath, _, filenames in os.walk(dst_path):
+                for filename in filenames:
+                    filepath = os.path.join(dirpath, filename)
+                    os.chmod(filepath,
+                             os.stat(filepath).st_mode | stat.S_IWUSR)
+        return True
+
+    def gc(self, filehashes, dry_run=False):
+        """Delete the collections which are not kept, the blobs which are in no
+        remaining collection and the temp files left behind by interrupted commands.
+        Collections, and blobs and temp files which are not in a deleted collection,
+        are only deleted once they are GC_MIN_AGE seconds old, so those of running
+        commands, which are not recorded by an entity yet, are kept
+
+        Parameters
+        ----------
+        filehashes : list
+            hashes of the collections to keep, the empty collection is always kept
+        dry_run : bool, optional
+            if True nothing is deleted, only what would be is reported
+            (default is False)
+
+        Returns
+        -------
+        dict
+            "collections", "blobs" and "temp" each with the "count" of items and
+            the "bytes" reclaimed by deleting them
+
+        Raises
+        ------
+        FileStructureError
+            if the file structure is not initialized
+        """
+        filehashes = set(filehashes)
+        filehashes.add(self.empty_collection_hash)
+        now = time.time()
+        collections = [
+            filehash for filehash in self.list_file_collections()
+            if filehash not in filehashes and now - os.path.getmtime(
+                self.get_collection_path(filehash)) >= self.GC_MIN_AGE
+        ]
+        # Files of the deleted collections by inode as [size, links, deleted links],
+        # so hardlinks to the same blob are only counted once
+        inodes = {}
+        collection_paths = [
+            collection_path for filehash in collections
+            for collection_path in [
+                os.path.join(self.collections_directory, filehash),
+                self._get_pack_path(filehash)
+            ]
+        ]
+        for collection_path in collection_paths:
+            for dirpath, _, filenames in os.walk(collection_path):
+                for filename in filenames:
+                    file_stat = os.lstat(os.path.join(dirpath, filename))
+                    inode = inodes.setdefault(
+                        (file_stat.st_dev, file_stat.st_ino),
+                        [file_stat.st_size, file_stat.st_nlink, 0])
+                    inode[2] += 1
+        blob_paths, blob_bytes = [], 0
+        for dirpath, _, filenames in os.walk(
+                os.path.join(self.datmo_directory, self.blobs_directory_name)):
+            for filename in filenames:
+                blob_path = os.path.join(dirpath, filename)
+                blob_stat = os.lstat(blob_path)
+                _, _, deleted_links = inodes.pop(
+                    (blob_stat.st_dev, blob_stat.st_ino), [0, 0, 0])
+                if blob_stat.st_nlink - deleted_links > 1:
+                    continue
+                if not deleted_links and \
+                        now - blob_stat.st_ctime < self.GC_MIN_AGE:
+                    continue
+                blob_paths.append(blob_path)
+                blob_bytes += blob_stat.st_size
+        # Packs and files copied into collections instead of linked to a blob
+        collection_bytes = sum(size for size, links, deleted_links in inodes.
+                               values() if links == deleted_links)
+        temp_paths, temp_bytes = [], 0
+        temp_dirpath = os.path.join(self.datmo_directory, "tmp")
+        if os.path.isdir(temp_dirpath):
+            for filename in os.listdir(temp_dirpath):
+                temp_path = os.path.join(temp_dirpath, filename)
+                if now - os.lstat(temp_path).st_mtime < self.GC_MIN_AGE:
+                    continue
+                temp_paths.append(temp_path)
+                temp_bytes += self._get_tree_size(temp_path)
+        if not dry_run:
+            for filehash in collections:
+                self.delete_collection(filehash)
+            for blob_path in blob_paths:
+                os.remove(blob_path)
+            for temp_path in temp_paths:
+                if os.path.isdir(temp_path) and not os.path.islink(temp_path):
+                    shutil.rmtree(temp_path, ignore_errors=True)
+                else:
+                    os.remove(temp_path)
+        return {
+            "collections": {
+                "count": len(collections),
+                "bytes": collection_bytes
+            },
+            "blobs": {
+                "count": len(blob_paths),
+                "bytes": blob_bytes
+            },
+            "temp": {
+                "count": len(temp_paths),
+                "bytes": temp_bytes
+            }
+        }
+
+    @staticmethod
+    def _get_tree_size(path):
+        """Return the size of the files at the path, without following links"""
+        if not os.path.isdir(path) or os.path.islink(path):
+            return os.lstat(path).st_size
+        return sum(
+            os.lstat(os.path.join(dirpath, filename)).st_size
+            for dirpath, _, filenames in os.walk(path)
+            for filename in filenames)
 
     # Datmo base directory (hidden dir .datmo)
     def create_hidden_datmo_dir(self):
@@ -423,6 +1058,11 @@ class LocalFileDriver(FileDriver):
                    "controller.file.driver.local.list_file_collections"))
         collections_path = os.path.join(self.datmo_directory, "collections")
         collections_list = os.listdir(collections_path)
+        if os.path.isdir(self.packs_directory):
+            filehashes = set(collections_list)
+            collections_list.extend(
+                filehash for filehash in os.listdir(self.packs_directory)
+                if filehash not in filehashes)
         return collections_list
 
     # Overall Hidden Datmo file structure
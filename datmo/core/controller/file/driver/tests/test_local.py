@@ -3,6 +3,7 @@ Tests for local.py
 """
 
 import os
+import time
 import shutil
 import tempfile
 import platform
@@ -22,7 +23,9 @@ except TypeError:
 
 from datmo.core.util.misc_functions import get_datmo_temp_path
 from datmo.core.controller.file.driver.local import LocalFileDriver
-from datmo.core.util.exceptions import PathDoesNotExist
+from datmo.core.util.exceptions import (PathDoesNotExist,
+                                        FileAlreadyExistsError,
+                                        DirAlreadyExistsError)
 from datmo.config import Config
 
 class TestLocalFileDriver():
@@ -368,9 +371,9 @@ class TestLocalFileDriver():
                     & 0o777) == '0755')
             assert (oct(
                 os.stat(os.path.join(collection_path, "filepath1")).st_mode &
-                0o777) == '0o755' or oct(
+                0o777) == '0o444' or oct(
                     os.stat(os.path.join(collection_path, "filepath1")).st_mode
-                    & 0o777) == '0755')
+                    & 0o777) == '0444')
         # TODO: Create test for Windows platform
         # else:
         #     assert (oct(
@@ -391,6 +394,157 @@ class TestLocalFileDriver():
 
         self.local_file_driver.delete_collection(filehash)
 
+    def test_create_collection_blobs(self):
+        self.local_file_driver.init()
+        self.local_file_driver.create("dirpath1/subdir/empty", directory=True)
+        self.local_file_driver.create("dirpath2", directory=True)
+        for relative_filepath, content in [("filepath1", "test"),
+                                           ("dirpath1/filepath2", "test"),
+                                           ("dirpath1/subdir/filepath3",
+                                            "test3"), ("dirpath2/filepath4",
+                                                       "test4")]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes(content))
+        paths = ["filepath1", "dirpath1>new_dirpath1"]
+
+        # Test the hash is the same as for a copy of the paths
+        temp_dir = get_datmo_temp_path(self.local_file_driver.root)
+        self.local_file_driver.copyfile(
+            os.path.join(self.temp_dir, "filepath1"), temp_dir)
+        os.makedirs(os.path.join(temp_dir, "new_dirpath1"))
+        self.local_file_driver.copytree(
+            os.path.join(self.temp_dir, "dirpath1"),
+            os.path.join(temp_dir, "new_dirpath1"))
+        expected_filehash = self.local_file_driver.get_dirhash(temp_dir)
+        shutil.rmtree(temp_dir)
+        assert self.local_file_driver.calculate_hash_paths(paths) == \
+            expected_filehash
+        filehash, files_rel, dirs_rel = self.local_file_driver.\
+            create_collection(paths)
+        assert filehash == expected_filehash
+        assert files_rel == [(os.path.join(self.temp_dir, "filepath1"),
+                              "filepath1")]
+        assert dirs_rel == [(os.path.join(self.temp_dir, "dirpath1"),
+                             "new_dirpath1")]
+        collection_path = self.local_file_driver.get_collection_path(filehash)
+        assert self.local_file_driver.get_dirhash(collection_path) == filehash
+        assert os.path.isdir(
+            os.path.join(collection_path, "new_dirpath1", "subdir", "empty"))
+        with open(
+                os.path.join(collection_path, "new_dirpath1", "subdir",
+                             "filepath3"), "rb") as f:
+            assert f.read() == to_bytes("test3")
+
+        # Test files with the same contents are stored once in the blob pool
+        blob_filepaths = [
+            os.path.join(dirpath, filename)
+            for dirpath, _, filenames in os.walk(
+                self.local_file_driver.blobs_directory)
+            for filename in filenames
+        ]
+        assert len(blob_filepaths) == 2
+        filehash_2, _, _ = self.local_file_driver.create_collection(
+            ["dirpath2", "filepath1"])
+        collection_path_2 = self.local_file_driver.get_collection_path(
+            filehash_2)
+        assert os.path.samefile(
+            os.path.join(collection_path, "filepath1"),
+            os.path.join(collection_path_2, "filepath1"))
+        assert os.path.samefile(
+            os.path.join(collection_path, "filepath1"),
+            os.path.join(collection_path, "new_dirpath1", "filepath2"))
+
+        # Test the temp directories are removed
+        assert os.listdir(os.path.join(self.temp_dir, ".datmo", "tmp")) == []
+
+        # Test destinations which are already used
+        failed = False
+        try:
+            self.local_file_driver.create_collection(
+                ["filepath1", "dirpath1/filepath2>filepath1"])
+        except FileAlreadyExistsError:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            self.local_file_driver.create_collection(
+                ["filepath1", "dirpath2>filepath1"])
+        except DirAlreadyExistsError:
+            failed = True
+        assert failed
+
+    def test_collection_files_write(self):
+        self.local_file_driver.init()
+        for relative_filepath in ["filepath1", "filepath2"]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes("test"))
+        filehash_1, _, _ = self.local_file_driver.create_collection(
+            ["filepath1"])
+        filehash_2, _, _ = self.local_file_driver.create_collection(
+            ["filepath1", "filepath2"])
+        blob_path = self.local_file_driver._get_blob_path(
+            self.local_file_driver.get_filehash(
+                os.path.join(self.temp_dir, "filepath1")))
+        filepath_1 = os.path.join(
+            self.local_file_driver.get_collection_path(filehash_1),
+            "filepath1")
+        filepath_2 = os.path.join(
+            self.local_file_driver.get_collection_path(filehash_2),
+            "filepath1")
+        if not platform.system() == "Windows":
+            assert os.stat(blob_path).st_mode & 0o777 == 0o444
+            assert os.stat(filepath_1).st_mode & 0o777 == 0o444
+
+        # Test files opened for write are copied out of the blob pool first
+        result = self.local_file_driver.get_collection_files(
+            filehash_1, mode="a")
+        for f in result:
+            f.write("changed")
+            f.close()
+        entry = self.local_file_driver.get_collection_entries(filehash_2)[0]
+        with entry.open("w") as f:
+            f.write("other")
+        with open(filepath_1, "r") as f:
+            assert f.read() == "testchanged"
+        with open(filepath_2, "r") as f:
+            assert f.read() == "other"
+        with open(blob_path, "r") as f:
+            assert f.read() == "test"
+        assert not os.path.samefile(filepath_1, blob_path)
+        assert not os.path.samefile(filepath_2, blob_path)
+
+        # Test transferred files are writable
+        dst_dirpath = os.path.join(self.temp_dir, "new_dir")
+        os.makedirs(dst_dirpath)
+        filehash_3, _, _ = self.local_file_driver.create_collection(
+            ["filepath2"])
+        self.local_file_driver.transfer_collection(filehash_3, dst_dirpath)
+        with open(os.path.join(dst_dirpath, "filepath2"), "a") as f:
+            f.write("changed")
+        with open(blob_path, "r") as f:
+            assert f.read() == "test"
+
+    def test_store_blob_changed(self):
+        self.local_file_driver.init()
+        filepath = os.path.join(self.temp_dir, "filepath1")
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("test"))
+        src_stat = os.stat(filepath)
+        filehash = self.local_file_driver.get_filehash(filepath)
+        # Test the stored contents are hashed again if the file changed
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("changed"))
+        stored_filehash = self.local_file_driver._store_blob(
+            filepath, src_stat, filehash)
+        assert stored_filehash == self.local_file_driver.get_filehash(filepath)
+        assert stored_filehash != filehash
+        assert os.path.isfile(
+            self.local_file_driver._get_blob_path(stored_filehash))
+        assert not os.path.isfile(
+            self.local_file_driver._get_blob_path(filehash))
+
     def test_calculate_hash_paths_simple(self):
         self.local_file_driver.init()
 
@@ -440,6 +594,63 @@ class TestLocalFileDriver():
         assert result == "74be16979710d4c4e7c6647856088456"
         shutil.rmtree(temp_dir)
 
+    def test_calculate_hash_paths_no_copy(self):
+        self.local_file_driver.init()
+        self.local_file_driver.create("dirpath1/subdir", directory=True)
+        for relative_filepath, content in [("filepath1", "test"),
+                                           ("dirpath1/subdir/filepath2",
+                                            "test2")]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes(content))
+        temp_dir = get_datmo_temp_path(self.local_file_driver.root)
+        paths = ["filepath1>renamed", "dirpath1>new_dirpath1"]
+        result = self.local_file_driver.calculate_hash_paths(paths)
+        # Test the hash is the same as with a copy, and nothing is written
+        assert result == self.local_file_driver.calculate_hash_paths(
+            paths, temp_dir)
+        assert os.listdir(temp_dir) == []
+        self.local_file_driver.copyfile(
+            os.path.join(self.temp_dir, "filepath1"), temp_dir)
+        os.makedirs(os.path.join(temp_dir, "new_dirpath1"))
+        self.local_file_driver.copytree(
+            os.path.join(self.temp_dir, "dirpath1"),
+            os.path.join(temp_dir, "new_dirpath1"))
+        assert result == self.local_file_driver.get_dirhash(temp_dir)
+        shutil.rmtree(temp_dir)
+        # Test missing paths and destinations which are already used
+        failed = False
+        try:
+            self.local_file_driver.calculate_hash_paths(["dne"])
+        except PathDoesNotExist:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            self.local_file_driver.calculate_hash_paths(
+                ["filepath1", "dirpath1/subdir/filepath2>filepath1"])
+        except FileAlreadyExistsError:
+            failed = True
+        assert failed
+
+    def test_calculate_filehashes_paths(self):
+        self.local_file_driver.init()
+        self.local_file_driver.create("dirpath1", directory=True)
+        for relative_filepath, content in [("filepath1", "test"),
+                                           ("dirpath1/filepath2", "test2")]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes(content))
+        paths = ["filepath1", "dirpath1"]
+        result = self.local_file_driver.calculate_filehashes_paths(paths)
+        assert sorted(result) == sorted([
+            self.local_file_driver.get_filehash(
+                os.path.join(self.temp_dir, "filepath1")),
+            self.local_file_driver.get_filehash(
+                os.path.join(self.temp_dir, "dirpath1", "filepath2"))
+        ])
+        assert self.local_file_driver.calculate_filehashes_paths([]) == []
+
     def test_calculate_hash_paths_single_line(self):
         self.local_file_driver.init()
 
@@ -477,6 +688,32 @@ class TestLocalFileDriver():
         shutil.rmtree(temp_dir)
         assert result == "a14de65c0fc13bc50cb246cc518195af"
 
+    def test_empty_collection_hash(self):
+        blake2b_file_driver = LocalFileDriver(
+            root=self.temp_dir,
+            datmo_directory_name=".datmo",
+            hash_algorithm="blake2b")
+        blake2b_file_driver.init()
+        assert blake2b_file_driver.is_initialized
+        filehash, _, _ = blake2b_file_driver.create_collection([])
+        assert filehash == blake2b_file_driver.empty_collection_hash
+        assert filehash != self.local_file_driver.empty_collection_hash
+
+    def test_calculate_hash_paths_algorithm(self):
+        filepath1 = os.path.join(self.temp_dir, "filepath1")
+        with open(filepath1, "wb") as f:
+            f.write(to_bytes("hello\n"))
+        blake2b_local_file_driver = LocalFileDriver(
+            root=self.temp_dir,
+            datmo_directory_name=Config().datmo_directory_name,
+            hash_algorithm="blake2b")
+        blake2b_local_file_driver.init()
+        temp_dir = get_datmo_temp_path(self.temp_dir)
+        result = blake2b_local_file_driver.calculate_hash_paths([filepath1],
+                                                                temp_dir)
+        shutil.rmtree(temp_dir)
+        assert result == "3a8f470b9951df6f66aeb4b43758792a"
+
     def test_get_filehash(self):
         filepath = os.path.join(self.temp_dir, "test.txt")
         with open(filepath, "wb") as f:
@@ -484,6 +721,9 @@ class TestLocalFileDriver():
         result = self.local_file_driver.get_filehash(filepath)
         assert len(result) == 32
         assert result == "b1946ac92492d2347c6235b4d2611184"
+        result = self.local_file_driver.get_filehash(
+            filepath, algorithm="blake2b")
+        assert result == "ea41b4de6c03f13a95758b28dd75693e"
 
     def test_get_dirhash(self):
         temp_dir_1 = get_datmo_temp_path(self.temp_dir)
@@ -572,6 +812,49 @@ class TestLocalFileDriver():
         assert isinstance(result[2], TextIOWrapper) and \
                result[2].name in paths_list
 
+    def test_get_collection_entries(self):
+        self.local_file_driver.init()
+        # Test empty file collection
+        filehash_empty, _, _ = self.local_file_driver. \
+            create_collection([])
+        assert self.local_file_driver.get_collection_entries(
+            filehash_empty) == []
+
+        self.local_file_driver.create("dirpath1", directory=True)
+        with open(os.path.join(self.temp_dir, "dirpath1", "filepath1"),
+                  "wb") as f:
+            f.write(to_bytes("hello\n"))
+        self.local_file_driver.create("filepath2")
+        filehash, _, _ = self.local_file_driver. \
+            create_collection(["dirpath1", "filepath2"])
+        collection_path = self.local_file_driver.get_collection_path(filehash)
+
+        # Test the entries are in order and none is opened
+        result = list(
+            self.local_file_driver.iter_collection_entries(filehash))
+        assert result == self.local_file_driver.get_collection_entries(
+            filehash)
+        assert [entry.relative_path for entry in result] == [
+            "filepath2", os.path.join("dirpath1", "filepath1")
+        ]
+        assert [entry.name for entry in result] == [
+            os.path.join(collection_path, "filepath2"),
+            os.path.join(collection_path, "dirpath1", "filepath1")
+        ]
+        assert result[1].size == 6
+        assert result[1].filehash == "b1946ac92492d2347c6235b4d2611184"
+        with result[1].open() as f:
+            assert isinstance(f, TextIOWrapper)
+            assert f.read() == "hello\n"
+
+        # Test failure for a collection which does not exist
+        failed = False
+        try:
+            self.local_file_driver.iter_collection_entries("random")
+        except PathDoesNotExist:
+            failed = True
+        assert failed
+
     def test_delete_collection(self):
         self.local_file_driver.init()
         filehash, _, _ = self.local_file_driver.create_collection([])
@@ -592,6 +875,176 @@ class TestLocalFileDriver():
         assert filehash_1 in collection_list and \
                filehash_2 in collection_list
 
+    def test_create_collection_pack(self):
+        self.local_file_driver.init()
+        self.local_file_driver.create("dirpath1/subdir/empty", directory=True)
+        for relative_filepath, content in [("filepath1", "test"),
+                                           ("dirpath1/filepath2", "hello\n")]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes(content))
+        paths = ["filepath1", "dirpath1>new_dirpath1"]
+        expected_filehash = self.local_file_driver.calculate_hash_paths(paths)
+        pack_file_driver = LocalFileDriver(
+            root=self.temp_dir,
+            datmo_directory_name=".datmo",
+            pack_collections=True)
+
+        # Test the collection is packed with the same hash as a directory
+        filehash, _, _ = pack_file_driver.create_collection(paths)
+        assert filehash == expected_filehash
+        assert not os.path.isdir(
+            os.path.join(self.local_file_driver.collections_directory,
+                         filehash))
+        pack_path = os.path.join(pack_file_driver.packs_directory, filehash)
+        assert os.path.isfile(os.path.join(pack_path, "pack"))
+        assert pack_file_driver.get_collection_path(filehash) == pack_path
+        assert pack_file_driver.get_relative_collection_path(filehash) == \
+            os.path.join(".datmo", "packs", filehash)
+        # Test drivers which do not pack collections read them the same
+        assert self.local_file_driver.exists_collection(filehash)
+        assert filehash in self.local_file_driver.list_file_collections()
+        assert self.local_file_driver.create_collection(paths)[0] == filehash
+        assert not os.path.isdir(
+            os.path.join(self.local_file_driver.collections_directory,
+                         filehash))
+
+        # Test get collection files
+        result = self.local_file_driver.get_collection_files(filehash)
+        assert sorted(f.read() for f in result) == ["hello\n", "test"]
+        for f in result:
+            f.close()
+        result = self.local_file_driver.get_collection_files(
+            filehash, mode="rb")
+        assert sorted(f.read() for f in result) == [
+            to_bytes("hello\n"), to_bytes("test")
+        ]
+        for f in result:
+            f.close()
+
+        # Test get collection entries
+        result = self.local_file_driver.get_collection_entries(filehash)
+        assert [entry.relative_path for entry in result] == [
+            "filepath1", os.path.join("new_dirpath1", "filepath2")
+        ]
+        assert result[1].size == 6
+        assert result[1].filehash == "b1946ac92492d2347c6235b4d2611184"
+        with result[1].open() as f:
+            assert isinstance(f, TextIOWrapper)
+            assert f.read() == "hello\n"
+
+        # Test transfer collection
+        dst_dirpath = os.path.join(self.temp_dir, "new_dir")
+        self.local_file_driver.create(dst_dirpath, directory=True)
+        assert self.local_file_driver.transfer_collection(
+            filehash, dst_dirpath)
+        assert self.local_file_driver.get_dirhash(dst_dirpath) == filehash
+        assert os.path.isdir(
+            os.path.join(dst_dirpath, "new_dirpath1", "subdir", "empty"))
+
+        # Test delete collection
+        assert self.local_file_driver.delete_collection(filehash)
+        assert not self.local_file_driver.exists_collection(filehash)
+        assert not os.path.isdir(pack_path)
+
+    def test_gc_pack(self):
+        self.local_file_driver.init()
+        with open(os.path.join(self.temp_dir, "filepath1"), "wb") as f:
+            f.write(to_bytes("test"))
+        pack_file_driver = LocalFileDriver(
+            root=self.temp_dir,
+            datmo_directory_name=".datmo",
+            pack_collections=True)
+        filehash, _, _ = pack_file_driver.create_collection(["filepath1"])
+        pack_path = os.path.join(pack_file_driver.packs_directory, filehash)
+        pack_bytes = sum(
+            os.path.getsize(os.path.join(pack_path, filename))
+            for filename in os.listdir(pack_path))
+        old_time = time.time() - 2 * pack_file_driver.GC_MIN_AGE
+        os.utime(pack_path, (old_time, old_time))
+        result = pack_file_driver.gc([], dry_run=True)
+        assert result["collections"] == {"count": 1, "bytes": pack_bytes}
+        assert result["blobs"]["count"] == 0
+        pack_file_driver.gc([])
+        assert not pack_file_driver.exists_collection(filehash)
+        assert pack_file_driver.list_file_collections() == [
+            pack_file_driver.empty_collection_hash
+        ]
+
+    def test_gc(self):
+        self.local_file_driver.init()
+        for relative_filepath, content in [("filepath1", "test"),
+                                           ("filepath2", "test22")]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes(content))
+        filehash_1, _, _ = self.local_file_driver.create_collection(
+            ["filepath1"])
+        filehash_2, _, _ = self.local_file_driver.create_collection(
+            ["filepath1", "filepath2"])
+        blob_path_1 = self.local_file_driver._get_blob_path(
+            self.local_file_driver.get_filehash(
+                os.path.join(self.temp_dir, "filepath1")))
+        blob_path_2 = self.local_file_driver._get_blob_path(
+            self.local_file_driver.get_filehash(
+                os.path.join(self.temp_dir, "filepath2")))
+        temp_dirpath = get_datmo_temp_path(self.local_file_driver.root)
+        with open(os.path.join(temp_dirpath, "filepath1"), "wb") as f:
+            f.write(to_bytes("test"))
+
+        # Test a recent collection is kept
+        result = self.local_file_driver.gc([filehash_1])
+        assert result["collections"]["count"] == 0
+        assert self.local_file_driver.exists_collection(filehash_2)
+
+        # Test the dry run only reports the collection and the blob only it uses
+        old_time = time.time() - 2 * self.local_file_driver.GC_MIN_AGE
+        os.utime(
+            self.local_file_driver.get_collection_path(filehash_2),
+            (old_time, old_time))
+        result = self.local_file_driver.gc([filehash_1], dry_run=True)
+        assert result == {
+            "collections": {
+                "count": 1,
+                "bytes": 0
+            },
+            "blobs": {
+                "count": 1,
+                "bytes": 6
+            },
+            "temp": {
+                "count": 0,
+                "bytes": 0
+            }
+        }
+        assert self.local_file_driver.exists_collection(filehash_2)
+        assert os.path.isfile(blob_path_2)
+
+        result = self.local_file_driver.gc([filehash_1])
+        assert result["collections"]["count"] == 1
+        assert sorted(self.local_file_driver.list_file_collections()) == \
+            sorted([self.local_file_driver.empty_collection_hash, filehash_1])
+        assert self.local_file_driver.is_initialized
+        assert os.path.isfile(blob_path_1)
+        assert not os.path.isfile(blob_path_2)
+        assert os.path.isdir(temp_dirpath)
+        with open(
+                os.path.join(
+                    self.local_file_driver.get_collection_path(filehash_1),
+                    "filepath1"), "rb") as f:
+            assert f.read() == to_bytes("test")
+
+        # Test temp files and blobs in no collection are deleted once they
+        # are old enough
+        self.local_file_driver.delete_collection(filehash_1)
+        self.local_file_driver.GC_MIN_AGE = 0
+        result = self.local_file_driver.gc([])
+        assert result["collections"]["count"] == 0
+        assert result["blobs"] == {"count": 1, "bytes": 4}
+        assert result["temp"] == {"count": 1, "bytes": 4}
+        assert not os.path.isfile(blob_path_1)
+        assert not os.path.isdir(temp_dirpath)
+
     def test_transfer_collection(self):
         # Create test directories to move
         self.local_file_driver.create("dirpath1", directory=True)
@@ -615,3 +1068,30 @@ class TestLocalFileDriver():
                                           "dirpath2")) and \
                os.path.isfile(os.path.join(dst_dirpath,
                                            "filepath1"))
+
+    def test_transfer_collection_executable(self):
+        self.local_file_driver.init()
+        self.local_file_driver.create("run.sh")
+        self.local_file_driver.create("data.txt")
+        for relative_filepath in ["run.sh", "data.txt"]:
+            with open(os.path.join(self.temp_dir, relative_filepath),
+                      "wb") as f:
+                f.write(to_bytes("test"))
+        os.chmod(os.path.join(self.temp_dir, "run.sh"), 0o755)
+        os.chmod(os.path.join(self.temp_dir, "data.txt"), 0o644)
+        filehash, _, _ = self.local_file_driver.create_collection(
+            ["run.sh", "data.txt"])
+        collection_path = self.local_file_driver.get_collection_path(filehash)
+        # Test files with the same contents and different modes are not linked
+        assert not os.path.samefile(
+            os.path.join(collection_path, "run.sh"),
+            os.path.join(collection_path, "data.txt"))
+
+        dst_dirpath = os.path.join(self.temp_dir, "new_dir")
+        self.local_file_driver.create(dst_dirpath, directory=True)
+        self.local_file_driver.transfer_collection(filehash, dst_dirpath)
+        if not platform.system() == "Windows":
+            assert os.stat(os.path.join(dst_dirpath, "run.sh")).st_mode & \
+                0o777 == 0o755
+            assert os.stat(os.path.join(dst_dirpath, "data.txt")).st_mode & \
+                0o777 == 0o644
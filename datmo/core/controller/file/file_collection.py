@@ -3,7 +3,7 @@ import shutil
 
 from datmo.core.util.i18n import get as __
 from datmo.core.controller.base import BaseController
-from datmo.core.util.misc_functions import list_all_filepaths, get_datmo_temp_path
+from datmo.core.util.misc_functions import list_all_filepaths
 from datmo.core.entity.file_collection import FileCollection
 from datmo.core.util.exceptions import PathDoesNotExist, EnvironmentInitFailed, FileNotInitialized, UnstagedChanges
 
@@ -184,16 +184,8 @@ class FileCollectionController(BaseController):
                                  self.file_driver.files_directory)
             ])
 
-        # Create a temp dir to use for calculating the hash
-        _temp_dir = get_datmo_temp_path(self.home)
-
         # Hash the paths of the files
-        dirhash = self.file_driver.calculate_hash_paths(paths, _temp_dir)
-
-        # Remove temporary directory
-        shutil.rmtree(_temp_dir)
-
-        return dirhash
+        return self.file_driver.calculate_hash_paths(paths)
 
     def _has_unstaged_changes(self):
         """Return whether there are unstaged changes"""
@@ -270,8 +262,6 @@ class FileCollectionController(BaseController):
             except Exception as e:
                 print(e)
         # Add in files for that file collection id
-        file_collection_path = os.path.join(self.home,
-                                            file_collection_obj.path)
-        self.file_driver.copytree(file_collection_path,
-                                  self.file_driver.files_directory)
+        self.file_driver.transfer_collection(file_collection_obj.filehash,
+                                             self.file_driver.files_directory)
         return True
@@ -1,4 +1,6 @@
 import os
+import sqlite3
+from datetime import datetime, timedelta
 
 from datmo.config import Config
 from datmo.core.util.validation import validate
@@ -9,10 +11,13 @@ from datmo.core.controller.environment.environment import EnvironmentController
 from datmo.core.controller.file.file_collection import FileCollectionController
 from datmo.core.controller.snapshot import SnapshotController
 from datmo.core.entity.model import Model
+from datmo.core.storage.driver.sqlite_dal_driver import SQLiteDALDriver
 from datmo.core.util.json_store import JSONStore
-from datmo.core.util.exceptions import (ProjectNotInitialized,
-                                        EnvironmentConnectFailed, FileIOError,
-                                        UnstagedChanges, PathDoesNotExist)
+from datmo.core.util.hashing import PROJECT_ALGORITHM
+from datmo.core.util.exceptions import (
+    ProjectNotInitialized, EnvironmentConnectFailed, FileIOError,
+    UnstagedChanges, PathDoesNotExist, InvalidArgumentType, EntityNotFound,
+    DALException)
 
 class ProjectController(BaseController):
     """ProjectController inherits from BaseController and manages business logic related to the
@@ -26,8 +31,16 @@ class ProjectController(BaseController):
         Remove all datmo references from the current repository. NOTE: THIS WILL DELETE ALL DATMO WORK
     status()
         Give the user a picture of the status of the project, snapshots, and tasks
+    migrate(driver_type)
+        Copy all entities of the project from the blitzdb database to another DAL driver
+    gc(dry_run=False)
+        Delete the stored code, environment and files which are no longer used
     """
 
+    # Seconds after which code and file collections in no snapshot are no longer
+    # in use by a running command and are deleted by gc
+    GC_MIN_AGE = 60 * 60
+
     def __init__(self):
         super(ProjectController, self).__init__()
 
@@ -58,6 +71,19 @@ class ProjectController(BaseController):
                 "description": description
             })
 
+            # New projects save their hash algorithm, so projects created before
+            # it was configurable keep hashing with the default one
+            if is_new_model and not self._get_project_config_value(
+                    "hash.algorithm"):
+                JSONStore(
+                    os.path.join(self.home,
+                                 Config().datmo_directory_name,
+                                 ".config")).save("hash.algorithm",
+                                                  PROJECT_ALGORITHM)
+                # reload the drivers with the algorithm on next access
+                self._code_driver = None
+                self._file_driver = None
+
             # Initialize File Driver if needed
             if not self.file_driver.is_initialized:
                 self.file_driver.init()
@@ -175,6 +201,137 @@ class ProjectController(BaseController):
 
         return True
 
+    def migrate(self, driver_type="sqlite"):
+        """Migrates the project database from the blitzdb file backend
+
+        All entities are copied in a single transaction and the new driver type
+        is saved in the project config, so all controllers use it from then on.
+        The blitzdb files are left in place.
+
+        Parameters
+        ----------
+        driver_type : str, optional
+            type of DAL driver to migrate to (default is "sqlite")
+
+        Returns
+        -------
+        int
+            number of entities migrated
+
+        Raises
+        ------
+        ProjectNotInitialized
+            if the project has not been initialized
+        InvalidArgumentType
+            if the driver type is not supported or the project already uses it
+        DALException
+            if the entities or the driver type could not be written
+        """
+        if not self.is_initialized:
+            raise ProjectNotInitialized(
+                __("error", "controller.project.migrate"))
+        if driver_type != "sqlite" or self.dal.driver_type != "blitzdb":
+            raise InvalidArgumentType(
+                __("error", "controller.project.migrate.driver_type",
+                   driver_type))
+        try:
+            driver = SQLiteDALDriver(
+                self.dal.driver_options['connection_string'])
+            count = driver.copy_from(self.dal.driver)
+            config_store = JSONStore(
+                os.path.join(self.home,
+                             Config().datmo_directory_name, ".config"))
+            config_store.save("storage.local.driver_type", driver_type)
+        except (sqlite3.Error, IOError, OSError) as e:
+            raise DALException(
+                __("error", "controller.project.migrate.failed", str(e)))
+        # reload the dal with the new driver on next access
+        self._dal = None
+        self._model = None
+        return count
+
+    def gc(self, dry_run=False):
+        """Delete the stored code, environment and files which are no longer used
+
+        Snapshots, including those tasks were run from and produced, are marked as
+        the roots along with environments, which can be used without a snapshot,
+        and the current code of the project. The code and file collections they use
+        are kept, as are those created within the last GC_MIN_AGE seconds which may
+        not be recorded by a snapshot yet. The entities of the rest are deleted
+        first, so an interrupted gc never leaves entities without their stored
+        contents, and then the code, the file collections, the code contents and
+        blobs only they use and the temp files left behind by interrupted commands
+        are swept.
+
+        Parameters
+        ----------
+        dry_run : bool, optional
+            if True nothing is deleted, only what would be is reported
+            (default is False)
+
+        Returns
+        -------
+        dict
+            for each kind of item deleted, the "count" of items and the "bytes"
+            reclaimed by deleting them
+
+        Raises
+        ------
+        ProjectNotInitialized
+            if the project has not been initialized
+        """
+        if not self.is_initialized:
+            raise ProjectNotInitialized(__("error", "controller.project.gc"))
+        snapshots = dict((snapshot.id, snapshot)
+                         for snapshot in self.dal.snapshot.query({}))
+        for task in self.dal.task.query({}):
+            for snapshot_id in [
+                    task.before_snapshot_id, task.after_snapshot_id
+            ]:
+                if snapshot_id and snapshot_id not in snapshots:
+                    try:
+                        snapshots[snapshot_id] = self.dal.snapshot.get_by_id(
+                            snapshot_id)
+                    except EntityNotFound:
+                        pass
+        code_ids = set(snapshot.code_id for snapshot in snapshots.values())
+        file_collection_ids = set(
+            snapshot.file_collection_id for snapshot in snapshots.values())
+        file_collection_ids.update(
+            environment.file_collection_id
+            for environment in self.dal.environment.query({}))
+        head_commit_id = self.code_driver.latest_ref() \
+            if self.code_driver.list_refs() else None
+        min_created_at = datetime.utcnow() - timedelta(seconds=self.GC_MIN_AGE)
+        codes, file_collections, deleted_entities = [], [], []
+        for code in self.dal.code.query({}):
+            if code.id in code_ids or code.commit_id == head_commit_id or \
+                    code.created_at > min_created_at:
+                codes.append(code)
+            else:
+                deleted_entities.append((self.dal.code, code))
+        for file_collection in self.dal.file_collection.query({}):
+            if file_collection.id in file_collection_ids or \
+                    file_collection.created_at > min_created_at:
+                file_collections.append(file_collection)
+            else:
+                deleted_entities.append((self.dal.file_collection,
+                                         file_collection))
+        if not dry_run:
+            for dal_method, entity in deleted_entities:
+                dal_method.delete(entity.id)
+        report = self.code_driver.gc(
+            [code.commit_id for code in codes], dry_run=dry_run)
+        report.update(
+            self.file_driver.gc(
+                [
+                    file_collection.filehash
+                    for file_collection in file_collections
+                ],
+                dry_run=dry_run))
+        report["entities"] = {"count": len(deleted_entities), "bytes": 0}
+        return report
+
     def status(self):
         """Return the project status information if initialized
 
@@ -210,7 +367,10 @@ class ProjectController(BaseController):
         descending_snapshots = self.dal.snapshot.query(
             {
                 "visible": True
-            }, sort_key="created_at", sort_order="descending")
+            },
+            sort_key="created_at",
+            sort_order="descending",
+            limit=1)
         latest_snapshot_user_generated = descending_snapshots[
             0] if descending_snapshots else None
 
@@ -218,7 +378,10 @@ class ProjectController(BaseController):
         descending_snapshots = self.dal.snapshot.query(
             {
                 "visible": False
-            }, sort_key="created_at", sort_order="descending")
+            },
+            sort_key="created_at",
+            sort_order="descending",
+            limit=1)
         latest_snapshot_auto_generated = descending_snapshots[
             0] if descending_snapshots else None
 
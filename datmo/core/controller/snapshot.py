@@ -351,12 +351,18 @@ class SnapshotController(BaseController):
         return (code_checkout_success and environment_checkout_success
                 and file_checkout_success)
 
-    def list(self, visible=None, sort_key=None, sort_order=None):
+    def list(self,
+             visible=None,
+             sort_key=None,
+             sort_order=None,
+             limit=None,
+             offset=None):
         query = {}
         if visible is not None and isinstance(visible, bool):
             query['visible'] = visible
 
-        return self.dal.snapshot.query(query, sort_key, sort_order)
+        return self.dal.snapshot.query(
+            query, sort_key, sort_order, limit=limit, offset=offset)
 
     def update(self,
                snapshot_id,
@@ -444,6 +450,35 @@ class SnapshotController(BaseController):
         return self.file_driver.get_collection_files(
             file_collection_obj.filehash, mode=mode)
 
+    def get_file_entries(self, snapshot_id):
+        """Get list of file entries for snapshot id, which are only opened when
+        they are asked to
+
+        Parameters
+        ----------
+        snapshot_id : str
+            id for the snapshot you would like to get file entries for
+
+        Returns
+        -------
+        list
+            list of file entries with the path, size and hash of each file and an
+            open method
+
+        Raises
+        ------
+        DoesNotExist
+            snapshot object does not exist
+        """
+        try:
+            snapshot_obj = self.dal.snapshot.get_by_id(snapshot_id)
+        except EntityNotFound:
+            raise DoesNotExist()
+        file_collection_obj = self.dal.file_collection.get_by_id(
+            snapshot_obj.file_collection_id)
+        return self.file_driver.get_collection_entries(
+            file_collection_obj.filehash)
+
     def delete(self, snapshot_id):
         """Delete all traces of a snapshot
 
@@ -620,22 +655,19 @@ class SnapshotController(BaseController):
 
         file_collection_obj = self.file_collection_controller.dal.file_collection.\
             get_by_id(file_collection_id)
-        file_collection_path = \
-            self.file_collection_controller.file_driver.get_collection_path(
-                file_collection_obj.filehash)
-        # find all of the possible paths it could exist
-        possible_paths = [os.path.join(self.home, file_to_find)] + \
-                            [os.path.join(self.home, item[0], file_to_find)
-                            for item in os.walk(file_collection_path)]
-        existing_possible_paths = [
-            possible_path for possible_path in possible_paths
-            if os.path.isfile(possible_path)
-        ]
-        if not existing_possible_paths:
-            # TODO: Add some info / warning that no file was found
-            # create some default stats
-            return {}
-        else:
-            # If any such path exists, transform file to stats dict
-            json_file = JSONStore(existing_possible_paths[0])
-            return json_file.to_dict()
+        # If the file exists in the project, transform file to stats dict
+        filepath = os.path.join(self.home, file_to_find)
+        if os.path.isfile(filepath):
+            return JSONStore(filepath).to_dict()
+        # Otherwise look for it in any directory of the file collection, which
+        # is read through the driver so packed collections are found too
+        relative_filepath = os.path.normpath(file_to_find)
+        for entry in self.file_collection_controller.file_driver.\
+                iter_collection_entries(file_collection_obj.filehash):
+            if entry.relative_path == relative_filepath or \
+                    entry.relative_path.endswith(os.sep + relative_filepath):
+                with entry.open() as f:
+                    return JSONStore.loads(f.read())
+        # TODO: Add some info / warning that no file was found
+        # create some default stats
+        return {}
@@ -5,12 +5,14 @@ import threading
 import webbrowser
 from datetime import datetime
 
+from datmo.config import Config
 from datmo.core.controller.base import BaseController
 from datmo.core.controller.snapshot import SnapshotController
 from datmo.core.controller.environment.environment import EnvironmentController
 from datmo.core.entity.task import Task
 from datmo.core.util.validation import validate
 from datmo.core.util.spinner import Spinner
+from datmo.core.util.log_store import LogStore, LogFile
 from datmo.core.util.i18n import get as __
 from datmo.core.util.exceptions import (
     TaskRunError, RequiredArgumentMissing, ProjectNotInitialized,
@@ -38,10 +40,16 @@ class TaskController(BaseController):
         runs the task and tracks the run, logs, inputs and outputs
     list(sort_key=None, sort_order=None)
         lists all tasks within the project given filters
+    get_logs(task_id, start=0, end=None, lines=None)
+        returns a range or the last lines of the logs for the task
     delete(id)
         deletes the specified task from the project
     """
 
+    # File in the log store directory of a task the environment writes its logs
+    # to while it runs, which is appended to the store once the run is completed
+    CONTAINER_LOG_FILENAME = "container.log"
+
     def __init__(self):
         super(TaskController, self).__init__()
         self.environment = EnvironmentController()
@@ -154,7 +162,7 @@ class TaskController(BaseController):
         return result
 
     def _parse_logs_for_results(self, logs):
-        """Parse log string to extract results and return dictionary.
+        """Parse logs to extract results and return dictionary.
 
         The format of the log line must be "key:value", whitespace will not matter
         and if there are more than 2 items found when split on ":", it will not
@@ -167,8 +175,8 @@ class TaskController(BaseController):
 
         Parameters
         ----------
-        logs : str
-            raw string value of output logs
+        logs : str or iterable
+            raw string value of output logs or iterable of its lines
 
         Returns
         -------
@@ -176,7 +184,8 @@ class TaskController(BaseController):
             dictionary to represent results from task
         """
         results = {}
-        for line in logs.split("\n"):
+        lines = logs.split("\n") if isinstance(logs, str) else logs
+        for line in lines:
             split_line = line.split(":")
             if len(split_line) == 2:
                 results[split_line[0].strip()] = split_line[1].strip()
@@ -311,7 +320,8 @@ class TaskController(BaseController):
             raise TaskRunError(
                 __("error", "cli.run.run.already_running", task_obj.id))
         # Create Task directory for user during run
-        task_dirpath = os.path.join(".datmo", "tasks", task_obj.id)
+        task_dirpath = os.path.join(Config().datmo_directory_name, "tasks",
+                                    task_obj.id)
         try:
             _ = self.file_driver.create(task_dirpath, directory=True)
         except Exception:
@@ -367,7 +377,8 @@ class TaskController(BaseController):
                 task_dict.get('task_dirpath', task_dirpath),
             "log_filepath":
                 task_dict.get('log_filepath',
-                              os.path.join(task_dirpath, "task.log")),
+                              os.path.join(Config().datmo_directory_name,
+                                           "logs", "tasks", task_obj.id)),
             "start_time":
                 task_dict.get('start_time', datetime.utcnow()),
             "status":
@@ -377,11 +388,19 @@ class TaskController(BaseController):
         # Copy over files from the before_snapshot file collection to task dir
         file_collection_obj =  \
             self.dal.file_collection.get_by_id(before_snapshot_obj.file_collection_id)
-        self.file_driver.copytree(
-            os.path.join(self.home, file_collection_obj.path),
+        self.file_driver.transfer_collection(
+            file_collection_obj.filehash,
             os.path.join(self.home, task_obj.task_dirpath))
 
-        return_code, run_id, logs = 0, None, None
+        return_code, run_id, logs, error_logs = 0, None, None, None
+        # Logs are kept in the log store, the environment writes them to a file
+        # in it which is read while the task runs and appended to the store once
+        # the run is completed
+        log_store = LogStore(os.path.join(self.home, task_obj.log_filepath))
+        container_log_filepath = os.path.join(log_store.dirpath,
+                                              self.CONTAINER_LOG_FILENAME)
+        if not os.path.isdir(log_store.dirpath):
+            os.makedirs(log_store.dirpath)
 
         try:
             # Set the parameters set in the task
@@ -422,12 +441,21 @@ class TaskController(BaseController):
             return_code, run_id, logs =  \
                 self._run_helper(before_snapshot_obj.environment_id,
                                  environment_run_options,
-                                 os.path.join(self.home, task_obj.log_filepath))
+                                 container_log_filepath)
 
         except Exception as e:
             return_code = 1
-            logs += "Error running task: %" % e.message
+            error_logs = "Error running task: %s" % e
         finally:
+            if os.path.isfile(container_log_filepath):
+                log_store.append_file(container_log_filepath)
+                os.remove(container_log_filepath)
+            elif logs:
+                log_store.append(logs)
+            if error_logs:
+                log_store.append(error_logs)
+            log_store.flush()
+
             # Create the after snapshot after execution is completed with new paths
             after_snapshot_dict = snapshot_dict.copy()
             after_snapshot_dict[
@@ -454,15 +482,15 @@ class TaskController(BaseController):
             update_task_dict = {
                 "id": task_obj.id,
                 "after_snapshot_id": after_snapshot_obj.id,
-                "logs": logs,
                 "status": "SUCCESS" if return_code == 0 else "FAILED",
                 # "results": task_obj.results, # TODO: update during run
                 "end_time": end_time,
                 "duration": duration
             }
-            if logs is not None:
+            snapshot_update_dict = None
+            if log_store.size:
                 update_task_dict["results"] = self._parse_logs_for_results(
-                    logs)
+                    log_store.iter_lines())
                 if update_task_dict["results"] is not None:
                     snapshot_update_dict = dict({'id': after_snapshot_obj.id})
                     if after_snapshot_obj.stats:
@@ -472,14 +500,29 @@ class TaskController(BaseController):
                         after_snapshot_obj.stats = update_task_dict["results"]
                     snapshot_update_dict[
                         "stats"] = after_snapshot_obj.stats.copy()
-                    self.dal.snapshot.update(snapshot_update_dict)
             if run_id is not None:
                 update_task_dict["run_id"] = run_id
-            return self.dal.task.update(update_task_dict)
-
-    def list(self, sort_key=None, sort_order=None):
+            # Write the snapshot stats and the task updates with a single commit,
+            # once the files of the snapshot are written
+            with self.dal.transaction():
+                if snapshot_update_dict is not None:
+                    self.dal.snapshot.update(snapshot_update_dict)
+                return self.dal.task.update(update_task_dict)
+
+    def list(self,
+             sort_key=None,
+             sort_order=None,
+             fields=None,
+             limit=None,
+             offset=None):
         query = {}
-        return self.dal.task.query(query, sort_key, sort_order)
+        return self.dal.task.query(
+            query,
+            sort_key,
+            sort_order,
+            fields=fields,
+            limit=limit,
+            offset=offset)
 
     def get(self, task_id):
         """Get task object and return
@@ -551,6 +594,98 @@ class TaskController(BaseController):
             # Error because the task does not have any files associated with it
             raise PathDoesNotExist()
 
+    def get_file_entries(self, task_id):
+        """Get list of file entries for task id, which are only opened when they
+        are asked to. They are looked for in the same areas as get_files
+
+        Parameters
+        ----------
+        task_id : str
+            id for the task you would like to get file entries for
+
+        Returns
+        -------
+        list
+            list of file entries with the path, size and hash of each file and an
+            open method
+
+        Raises
+        ------
+        DoesNotExist
+            task object does not exist
+        PathDoesNotExist
+            no file entries exist for the task
+        """
+        try:
+            task_obj = self.dal.task.get_by_id(task_id)
+        except EntityNotFound:
+            raise DoesNotExist()
+        if task_obj.after_snapshot_id:
+            return self.snapshot.get_file_entries(task_obj.after_snapshot_id)
+        elif task_obj.task_dirpath:
+            return self.file_driver.get_entries(task_obj.task_dirpath)
+        elif task_obj.before_snapshot_id:
+            return self.snapshot.get_file_entries(task_obj.before_snapshot_id)
+        else:
+            # Error because the task does not have any files associated with it
+            raise PathDoesNotExist()
+
+    def get_logs(self, task_id, start=0, end=None, lines=None):
+        """Get a range or the last lines of the logs for task id. Only the parts
+        of the log store which are read are loaded
+
+        Parameters
+        ----------
+        task_id : str
+            id for the task you would like to get logs for
+        start : int, optional
+            offset in bytes of the start of the range, negative to count from the end
+            (default is 0, the start of the logs)
+        end : int, optional
+            offset in bytes of the end of the range, negative to count from the end
+            (default is None, the end of the logs)
+        lines : int, optional
+            number of lines to return from the end of the logs instead of a range
+            (default is None, which returns the range)
+
+        Returns
+        -------
+        str or None
+            logs for the task or None if the task has no logs
+
+        Raises
+        ------
+        DoesNotExist
+            task object does not exist
+        """
+        try:
+            task_obj = self.dal.task.get_by_id(task_id)
+        except EntityNotFound:
+            raise DoesNotExist()
+        # Tasks run before the log store was added keep their logs in the task
+        if task_obj.logs is not None:
+            if lines is not None:
+                return "".join(task_obj.logs.splitlines(True)[-lines:]) \
+                    if lines > 0 else ""
+            return task_obj.logs.encode("utf-8")[start:end].decode(
+                "utf-8", "replace")
+        if not task_obj.log_filepath:
+            return None
+        log_dirpath = os.path.join(self.home, task_obj.log_filepath)
+        container_log_filepath = os.path.join(log_dirpath,
+                                              self.CONTAINER_LOG_FILENAME)
+        # The logs of a running task are in the file it writes them to until
+        # they are all appended to the store
+        if os.path.isfile(container_log_filepath):
+            log_reader = LogFile(container_log_filepath)
+        elif LogStore.exists(log_dirpath):
+            log_reader = LogStore(log_dirpath)
+        else:
+            return None
+        if lines is not None:
+            return log_reader.tail(lines)
+        return log_reader.read(start, end)
+
     def update(self,
                task_id,
                workspace=None,
@@ -591,7 +726,11 @@ class TaskController(BaseController):
             raise RequiredArgumentMissing(
                 __("error", "controller.task.delete.arg", "id"))
         stopped_success = self.stop(task_id)
+        task_obj = self.get(task_id)
         delete_task_success = self.dal.task.delete(task_id)
+        if task_obj.log_filepath and self.file_driver.exists(
+                task_obj.log_filepath, directory=True):
+            self.file_driver.delete(task_obj.log_filepath, directory=True)
         return stopped_success and delete_task_success
 
     def stop(self, task_id=None, all=False, status="STOPPED"):
@@ -13,6 +13,7 @@ from datmo.core.controller.code.driver.file import FileCodeDriver
 from datmo.core.controller.file.driver.local import LocalFileDriver
 from datmo.core.controller.environment.driver.dockerenv import DockerEnvironmentDriver
 from datmo.core.entity.model import Model
+from datmo.core.util.json_store import JSONStore
 from datmo.core.util.exceptions import  \
     InvalidProjectPath, DALNotInitialized
 from datmo.core.util.misc_functions import pytest_docker_environment_failed_instantiation
@@ -111,3 +112,65 @@ class TestBaseController():
         model2 = self.base_controller.dal.model.get_by_id(model.id)
         assert model and model2
         assert model.id == model2.id
+
+    def test_get_hash_algorithm(self):
+        # Projects without the algorithm in their config use the default
+        assert self.base_controller.get_hash_algorithm() == "md5"
+        assert self.base_controller.code_driver.hash_algorithm == "md5"
+        assert self.base_controller.file_driver.hash_algorithm == "md5"
+        JSONStore(
+            os.path.join(self.temp_dir,
+                         Config().datmo_directory_name, ".config")).save(
+                             "hash.algorithm", "blake2b")
+        base_controller = BaseController()
+        assert base_controller.get_hash_algorithm() == "blake2b"
+        assert base_controller.code_driver.hash_algorithm == "blake2b"
+        assert base_controller.file_driver.hash_algorithm == "blake2b"
+
+    def test_get_config_defaults_project_config(self):
+        project_config = JSONStore(
+            os.path.join(self.temp_dir, Config().datmo_directory_name,
+                         ".config"))
+        project_config.save("hash.algorithm", "blake2b")
+        project_config.save("file.collection.pack", True)
+        defaults = self.base_controller.get_config_defaults()
+        code_driver_options = defaults["controller.code.driver"]["options"]
+        file_driver_options = defaults["controller.file.driver"]["options"]
+        assert code_driver_options["hash_algorithm"] == "blake2b"
+        assert file_driver_options["hash_algorithm"] == "blake2b"
+        assert file_driver_options["pack_collections"]
+        # Values are read from the project config given instead of the file
+        project_config = self.base_controller._get_project_config()
+        assert self.base_controller.get_hash_algorithm(
+            project_config) == "blake2b"
+        os.remove(project_config.filepath)
+        assert self.base_controller.get_hash_algorithm(
+            project_config) == "blake2b"
+        assert self.base_controller.get_pack_collections(project_config)
+        assert self.base_controller.get_hash_algorithm() == "md5"
+        assert self.base_controller._get_project_config() is None
+
+    def test_get_private_index(self):
+        assert self.base_controller.get_code_driver_type() == "file"
+        assert not self.base_controller.get_private_index()
+        project_config = JSONStore(
+            os.path.join(self.temp_dir, Config().datmo_directory_name,
+                         ".config"))
+        project_config.save("code.driver.type", "git")
+        project_config.save("code.git.private_index", True)
+        base_controller = BaseController()
+        assert base_controller.get_code_driver_type() == "git"
+        assert base_controller.get_private_index()
+        assert base_controller.code_driver.type == "git"
+        assert base_controller.code_driver.private_index
+
+    def test_get_pack_collections(self):
+        assert not self.base_controller.get_pack_collections()
+        assert not self.base_controller.file_driver.pack_collections
+        JSONStore(
+            os.path.join(self.temp_dir,
+                         Config().datmo_directory_name, ".config")).save(
+                             "file.collection.pack", True)
+        base_controller = BaseController()
+        assert base_controller.get_pack_collections()
+        assert base_controller.file_driver.pack_collections
@@ -31,7 +31,9 @@ from datmo.core.controller.snapshot import SnapshotController
 from datmo.core.controller.environment.environment import EnvironmentController
 from datmo.core.controller.task import TaskController
 from datmo.core.entity.snapshot import Snapshot
-from datmo.core.util.exceptions import ValidationFailed
+from datmo.core.storage.driver.sqlite_dal_driver import SQLiteDALDriver
+from datmo.core.util.exceptions import (ValidationFailed, InvalidArgumentType,
+                                        ProjectNotInitialized, DALException)
 from datmo.core.util.misc_functions import check_docker_inactive, pytest_docker_environment_failed_instantiation
 
 # provide mountable tmp directory for docker
@@ -101,6 +103,29 @@ class TestProjectController():
         assert self.project_controller.model.description == "test description"
         assert result and self.project_controller.is_initialized
 
+    def test_init_hash_algorithm(self):
+        self.project_controller.init("test1", "test description")
+        with open(os.path.join(self.temp_dir, "test.py"), "wb") as f:
+            f.write(to_bytes("import numpy\n"))
+        # New projects save the algorithm and their drivers use it
+        assert self.project_controller.get_hash_algorithm() == "blake2b"
+        assert self.project_controller.code_driver.hash_algorithm == "blake2b"
+        assert self.project_controller.file_driver.hash_algorithm == "blake2b"
+        commit_id = self.project_controller.code_driver.create_ref()
+        assert len(commit_id) == 32
+
+        # Reinitializing keeps the algorithm of the project
+        self.project_controller.config_store.save("hash.algorithm", "md5")
+        self.project_controller.init("test2", "test description")
+        assert self.project_controller.get_hash_algorithm() == "md5"
+        project_controller = ProjectController()
+        assert project_controller.code_driver.hash_algorithm == "md5"
+        # Commits hashed with the previous algorithm are still readable
+        assert project_controller.code_driver.exists_ref(commit_id)
+        md5_commit_id = project_controller.code_driver.create_ref()
+        assert md5_commit_id != commit_id
+        assert project_controller.code_driver.checkout_ref(commit_id)
+
     # TODO: Test lower level functions (DAL, JSONStore, etc for interruptions)
     # def test_init_with_interruption(self):
     #     # Reinitializing after timed interruption during init
@@ -175,6 +200,129 @@ class TestProjectController():
         # })
         assert result == True
 
+    def test_migrate(self):
+        self.project_controller.init("test_migrate", "test description")
+        model_id = self.project_controller.model.id
+        count = self.project_controller.migrate(driver_type="sqlite")
+
+        assert count == 1
+        assert self.project_controller.get_storage_driver_type() == "sqlite"
+        assert isinstance(self.project_controller.dal.driver, SQLiteDALDriver)
+        assert self.project_controller.model.id == model_id
+        # new controllers read the driver type from the project config
+        assert isinstance(ProjectController().dal.driver, SQLiteDALDriver)
+
+        failed = False
+        try:
+            self.project_controller.migrate(driver_type="sqlite")
+        except InvalidArgumentType:
+            failed = True
+        assert failed
+
+    def test_migrate_failed(self):
+        self.project_controller.init("test_migrate", "test description")
+        # A directory in place of the database file cannot be opened
+        os.makedirs(
+            os.path.join(self.project_controller.home, ".datmo", "database",
+                         "datmo.sqlite"))
+        failed = False
+        try:
+            self.project_controller.migrate(driver_type="sqlite")
+        except DALException:
+            failed = True
+        assert failed
+        assert self.project_controller.get_storage_driver_type() == "blitzdb"
+
+    @pytest_docker_environment_failed_instantiation(test_datmo_dir)
+    def test_gc(self):
+        failed = False
+        try:
+            self.project_controller.gc()
+        except ProjectNotInitialized:
+            failed = True
+        assert failed
+
+        self.project_controller.init("test_gc", "test description")
+        self.snapshot_controller = SnapshotController()
+        env_def_path = os.path.join(self.snapshot_controller.home,
+                                    "Dockerfile")
+        with open(env_def_path, "wb") as f:
+            f.write(to_bytes("FROM python:3.5-alpine"))
+        filepath1 = os.path.join(self.snapshot_controller.home, "filepath1")
+        with open(filepath1, "wb") as f:
+            f.write(to_bytes("test1"))
+        snapshot_obj = self.snapshot_controller.create({
+            "message": "my test snapshot",
+            "paths": [filepath1],
+            "environment_paths": [env_def_path]
+        })
+        filepath2 = os.path.join(self.snapshot_controller.home, "filepath2")
+        with open(filepath2, "wb") as f:
+            f.write(to_bytes("test2"))
+        snapshot_obj_2 = self.snapshot_controller.create({
+            "message": "my test snapshot 2",
+            "paths": [filepath1, filepath2],
+            "environment_paths": [env_def_path]
+        })
+        code_obj = self.project_controller.dal.code.get_by_id(
+            snapshot_obj.code_id)
+        code_obj_2 = self.project_controller.dal.code.get_by_id(
+            snapshot_obj_2.code_id)
+        file_collection_obj = self.project_controller.dal.file_collection.\
+            get_by_id(snapshot_obj.file_collection_id)
+        file_collection_obj_2 = self.project_controller.dal.file_collection.\
+            get_by_id(snapshot_obj_2.file_collection_id)
+        # Change the code, so the code of the second snapshot is not in HEAD
+        filepath3 = os.path.join(self.snapshot_controller.home, "filepath3")
+        with open(filepath3, "wb") as f:
+            f.write(to_bytes("test3"))
+        self.snapshot_controller.create({
+            "message": "my test snapshot 3",
+            "paths": [filepath1],
+            "environment_paths": [env_def_path]
+        })
+        self.snapshot_controller.delete(snapshot_obj_2.id)
+
+        # Test recent code and file collections are kept
+        report = self.project_controller.gc(dry_run=True)
+        assert report["commits"]["count"] == 0
+        assert report["collections"]["count"] == 0
+        assert report["entities"]["count"] == 0
+
+        # Test the dry run only reports what the deleted snapshot used
+        self.project_controller.GC_MIN_AGE = 0
+        self.project_controller.code_driver.GC_MIN_AGE = 0
+        self.project_controller.file_driver.GC_MIN_AGE = 0
+        report = self.project_controller.gc(dry_run=True)
+        assert report["commits"]["count"] == 1
+        assert report["collections"]["count"] == 1
+        assert report["blobs"] == {"count": 1, "bytes": 5}
+        assert report["entities"]["count"] == 2
+        assert self.project_controller.code_driver.exists_ref(
+            code_obj_2.commit_id)
+        assert self.project_controller.file_driver.exists_collection(
+            file_collection_obj_2.filehash)
+
+        assert self.project_controller.gc() == report
+        assert not self.project_controller.code_driver.exists_ref(
+            code_obj_2.commit_id)
+        assert not self.project_controller.file_driver.exists_collection(
+            file_collection_obj_2.filehash)
+        assert not self.project_controller.dal.code.query({
+            "id": code_obj_2.id
+        })
+        assert self.project_controller.code_driver.exists_ref(
+            code_obj.commit_id)
+        assert self.project_controller.file_driver.exists_collection(
+            file_collection_obj.filehash)
+        assert self.project_controller.file_driver.is_initialized
+
+        # Test nothing is left to delete
+        report = self.project_controller.gc(dry_run=True)
+        assert report["commits"]["count"] == 0
+        assert report["collections"]["count"] == 0
+        assert report["entities"]["count"] == 0
+
     def test_status_basic(self):
         self.project_controller.init("test3", "test description")
         status_dict, current_snapshot, latest_snapshot_user_generated, latest_snapshot_auto_generated, unstaged_code, unstaged_environment, unstaged_files = \
@@ -891,6 +891,31 @@ class TestSnapshotController():
                             file_collection_obj.filehash,
                             "filepath1") in file_names
 
+    def test_get_file_entries(self):
+        self.__setup()
+        # Test failure case
+        failed = False
+        try:
+            self.snapshot_controller.get_file_entries("random")
+        except DoesNotExist:
+            failed = True
+        assert failed
+
+        # Test success case, files are only opened when asked to
+        snapshot_obj = self.__default_create()
+        result = self.snapshot_controller.get_file_entries(snapshot_obj.id)
+        file_collection_obj = self.task_controller.dal.file_collection.get_by_id(
+            snapshot_obj.file_collection_id)
+
+        assert len(result) == 1
+        assert result[0].name == os.path.join(
+            self.task_controller.home, ".datmo", "collections",
+            file_collection_obj.filehash, "filepath1")
+        assert result[0].relative_path == "filepath1"
+        with result[0].open() as f:
+            assert isinstance(f, TextIOWrapper)
+            assert f.mode == "r"
+
     def test_delete(self):
         self.__setup()
         # Create snapshot in the project
@@ -28,9 +28,10 @@ from datmo.core.controller.project import ProjectController
 from datmo.core.controller.environment.environment import EnvironmentController
 from datmo.core.controller.task import TaskController
 from datmo.core.entity.task import Task
+from datmo.core.util.log_store import LogStore
 from datmo.core.util.exceptions import EntityNotFound, TaskRunError, \
     InvalidArgumentType, RequiredArgumentMissing, ProjectNotInitialized, \
-    InvalidProjectPath, TooManyArgumentsFound, DoesNotExist
+    InvalidProjectPath, TooManyArgumentsFound, DoesNotExist, PathDoesNotExist
 from datmo.core.util.misc_functions import check_docker_inactive, pytest_docker_environment_failed_instantiation
 
 # provide mountable tmp directory for docker
@@ -189,6 +190,11 @@ class TestTaskController():
         result = self.task_controller._parse_logs_for_results(test_logs)
         assert result is None
 
+        # Test logs given as lines
+        test_logs = iter(["this is a log", "accuracy : 0.94"])
+        result = self.task_controller._parse_logs_for_results(test_logs)
+        assert result == {"accuracy": "0.94"}
+
     def test_update_environment_run_options(self):
         self.__setup()
         environment_run_option = {
@@ -313,8 +319,8 @@ class TestTaskController():
 
         assert updated_task_obj.after_snapshot_id
         assert updated_task_obj.run_id
-        assert updated_task_obj.logs
-        assert "accuracy" in updated_task_obj.logs
+        assert self.task_controller.get_logs(updated_task_obj.id)
+        assert "accuracy" in self.task_controller.get_logs(updated_task_obj.id)
         assert updated_task_obj.results
         assert updated_task_obj.results == {"accuracy": "0.45"}
         assert after_snapshot_obj.stats == {"accuracy": "0.45"}
@@ -401,8 +407,8 @@ class TestTaskController():
 
         assert updated_task_obj_2.after_snapshot_id
         assert updated_task_obj_2.run_id
-        assert updated_task_obj_2.logs
-        assert "accuracy" in updated_task_obj_2.logs
+        assert self.task_controller.get_logs(updated_task_obj_2.id)
+        assert "accuracy" in self.task_controller.get_logs(updated_task_obj_2.id)
         assert updated_task_obj_2.results
         assert updated_task_obj_2.results == {"accuracy": "0.45"}
         assert updated_task_obj_2.status == "SUCCESS"
@@ -456,8 +462,8 @@ class TestTaskController():
 
         assert updated_task_obj_2.after_snapshot_id
         assert updated_task_obj_2.run_id
-        assert updated_task_obj_2.logs
-        assert "accuracy" in updated_task_obj_2.logs
+        assert self.task_controller.get_logs(updated_task_obj_2.id)
+        assert "accuracy" in self.task_controller.get_logs(updated_task_obj_2.id)
         assert updated_task_obj_2.results
         assert updated_task_obj_2.results == {"accuracy": "0.56"}
         assert updated_task_obj_2.status == "SUCCESS"
@@ -474,7 +480,8 @@ class TestTaskController():
         files_absolute_path = os.path.join(self.task_controller.home,
                                            file_collection_obj.path)
 
-        assert os.path.isfile(os.path.join(files_absolute_path, "task.log"))
+        assert not os.path.isfile(
+            os.path.join(files_absolute_path, "task.log"))
         assert os.path.isfile(
             os.path.join(files_absolute_path, "new_file.txt"))
 
@@ -535,7 +542,7 @@ class TestTaskController():
 
         assert updated_task_obj_3.after_snapshot_id
         assert updated_task_obj_3.run_id
-        assert updated_task_obj_3.logs
+        assert self.task_controller.get_logs(updated_task_obj_3.id)
         assert updated_task_obj_3.status == "SUCCESS"
         assert updated_task_obj_3.end_time
         assert updated_task_obj_3.duration
@@ -550,7 +557,8 @@ class TestTaskController():
         files_absolute_path = os.path.join(self.task_controller.home,
                                            file_collection_obj.path)
 
-        assert os.path.isfile(os.path.join(files_absolute_path, "task.log"))
+        assert not os.path.isfile(
+            os.path.join(files_absolute_path, "task.log"))
         assert os.path.isfile(
             os.path.join(self.project_controller.home, "dirpath1", "file.txt"))
         assert "my initial line" in open(
@@ -616,7 +624,7 @@ class TestTaskController():
 
         assert updated_task_obj_4.after_snapshot_id
         assert updated_task_obj_4.run_id
-        assert updated_task_obj_4.logs
+        assert self.task_controller.get_logs(updated_task_obj_4.id)
         assert updated_task_obj_4.status == "SUCCESS"
         assert updated_task_obj_4.end_time
         assert updated_task_obj_4.duration
@@ -631,7 +639,8 @@ class TestTaskController():
         files_absolute_path = os.path.join(self.task_controller.home,
                                            file_collection_obj.path)
 
-        assert os.path.isfile(os.path.join(files_absolute_path, "task.log"))
+        assert not os.path.isfile(
+            os.path.join(files_absolute_path, "task.log"))
         assert os.path.isfile(
             os.path.join(self.project_controller.home, "dirpath1", "file.txt"))
         assert "my initial line" in open(
@@ -720,6 +729,60 @@ class TestTaskController():
         task_obj_returned = self.task_controller.get(task_obj.id)
         assert task_obj == task_obj_returned
 
+    def test_get_logs(self):
+        self.__setup()
+        # Test failure for no task
+        failed = False
+        try:
+            self.task_controller.get_logs("random")
+        except DoesNotExist:
+            failed = True
+        assert failed
+
+        # Test no logs before the task is run
+        task_obj = self.task_controller.create()
+        assert self.task_controller.get_logs(task_obj.id) is None
+
+        # Test logs of a running task, which are not in the log store yet
+        log_filepath = os.path.join(".datmo", "logs", "tasks", task_obj.id)
+        container_log_filepath = os.path.join(
+            self.task_controller.home, log_filepath,
+            self.task_controller.CONTAINER_LOG_FILENAME)
+        os.makedirs(os.path.dirname(container_log_filepath))
+        with open(container_log_filepath, "wb") as f:
+            f.write(to_bytes("epoch:1\nepoch:2\n"))
+        self.task_controller.dal.task.update({
+            "id": task_obj.id,
+            "log_filepath": log_filepath
+        })
+        assert self.task_controller.get_logs(task_obj.id) == \
+               "epoch:1\nepoch:2\n"
+        assert self.task_controller.get_logs(task_obj.id, lines=1) == \
+               "epoch:2\n"
+
+        # Test logs in the log store of the task
+        os.remove(container_log_filepath)
+        with LogStore(os.path.join(self.task_controller.home,
+                                   log_filepath)) as log_store:
+            log_store.append("epoch:1\nepoch:2\naccuracy:0.45\n")
+        assert self.task_controller.get_logs(task_obj.id) == \
+               "epoch:1\nepoch:2\naccuracy:0.45\n"
+        assert self.task_controller.get_logs(task_obj.id, lines=1) == \
+               "accuracy:0.45\n"
+        assert self.task_controller.get_logs(
+            task_obj.id, start=8, end=15) == "epoch:2"
+
+        # Test logs kept in the task by earlier versions
+        task_obj_2 = self.task_controller.create()
+        self.task_controller.dal.task.update({
+            "id": task_obj_2.id,
+            "logs": "epoch:1\naccuracy:0.45\n"
+        })
+        assert self.task_controller.get_logs(task_obj_2.id, lines=1) == \
+               "accuracy:0.45\n"
+        assert self.task_controller.get_logs(task_obj_2.id, start=-14) == \
+               "accuracy:0.45\n"
+
     @pytest_docker_environment_failed_instantiation(test_datmo_dir)
     def test_get_files(self):
         self.__setup()
@@ -776,13 +839,10 @@ class TestTaskController():
 
         file_names = [item.name for item in result]
 
-        assert len(result) == 2
+        assert len(result) == 1
         for item in result:
             assert isinstance(item, TextIOWrapper)
             assert item.mode == "r"
-        assert os.path.join(self.task_controller.home, ".datmo", "collections",
-                            file_collection_obj.filehash,
-                            "task.log") in file_names
         assert os.path.join(self.task_controller.home, ".datmo", "collections",
                             file_collection_obj.filehash,
                             "filepath1") in file_names
@@ -790,19 +850,52 @@ class TestTaskController():
         # Get files for the task after run is complete for different mode
         result = self.task_controller.get_files(updated_task_obj.id, mode="a")
 
-        assert len(result) == 2
+        assert len(result) == 1
         for item in result:
             assert isinstance(item, TextIOWrapper)
             assert item.mode == "a"
-        assert os.path.join(self.task_controller.home, ".datmo", "collections",
-                            file_collection_obj.filehash,
-                            "task.log") in file_names
         assert os.path.join(self.task_controller.home, ".datmo", "collections",
                             file_collection_obj.filehash,
                             "filepath1") in file_names
 
         self.task_controller.stop(task_obj.id)
 
+    @pytest_docker_environment_failed_instantiation(test_datmo_dir)
+    def test_get_file_entries(self):
+        self.__setup()
+        # Test failure case
+        failed = False
+        try:
+            self.task_controller.get_file_entries("random")
+        except DoesNotExist:
+            failed = True
+        assert failed
+
+        # Test failure case for a task without files
+        task_obj = self.task_controller.create()
+        failed = False
+        try:
+            self.task_controller.get_file_entries(task_obj.id)
+        except PathDoesNotExist:
+            failed = True
+        assert failed
+
+        # Test the files in the task directory while it is running
+        self.project_controller.file_driver.create(
+            "task_dirpath", directory=True)
+        self.project_controller.file_driver.create(
+            os.path.join("task_dirpath", "filepath1"))
+        task_obj = self.task_controller.dal.task.update({
+            "id": task_obj.id,
+            "task_dirpath": "task_dirpath"
+        })
+        result = self.task_controller.get_file_entries(task_obj.id)
+        assert [item.name for item in result] == [
+            os.path.join(self.task_controller.home, "task_dirpath",
+                         "filepath1")
+        ]
+        assert result[0].size == 0
+
     def test_update(self):
         self.__setup()
         # Create task in the project
@@ -1,6 +1,7 @@
 import os
 
 from datmo.core.controller.snapshot import SnapshotController
+from datmo.core.controller.task import TaskController
 from datmo.core.entity.task import Task as CoreTask
 from datmo.core.util.exceptions import InvalidArgumentType
 from datmo.core.util.misc_functions import printable_object, prettify_datetime, format_table
@@ -36,7 +37,7 @@ class Run():
     duration : float or None
         delta in seconds between start and end times
     logs : str or None
-        string output of logs
+        string output of logs, read from the log store of the task
     config : dict
         dictionary containing input or output configs from the run
     results : dict
@@ -48,12 +49,26 @@ class Run():
     -------
     get_files(mode="r")
         Returns a list of file objects for the run
+    get_file_entries()
+        Returns a list of file entries for the run, without opening the files
+    get_logs(start=0, end=None, lines=None)
+        Returns a range or the last lines of the logs for the run
 
     Raises
     ------
     InvalidArgumentType
     """
 
+    # Task fields used to list runs, all of them except for the logs
+    LIST_FIELDS = [
+        "model_id", "before_snapshot_id", "after_snapshot_id", "command",
+        "command_list", "interactive", "detach", "gpu", "mem_limit",
+        "workspace", "ports", "task_dirpath", "data_file_path_map",
+        "data_directory_path_map", "log_filepath", "run_id", "status",
+        "start_time", "end_time", "duration", "results", "created_at",
+        "updated_at"
+    ]
+
     def __init__(self, task_entity):
         if not isinstance(task_entity, CoreTask):
             raise InvalidArgumentType()
@@ -80,7 +95,7 @@ class Run():
         self._duration = self._core_task.duration
 
         # Outputs
-        self._logs = self._core_task.logs
+        self._logs = None
         self._results = {}
         self._files = None
 
@@ -116,8 +131,7 @@ class Run():
 
     @property
     def logs(self):
-        self._core_task = self.__get_core_task()
-        self._logs = self._core_task.logs
+        self._logs = self.get_logs()
         return self._logs
 
     @property
@@ -221,6 +235,48 @@ class Run():
         return snapshot_controller.get_files(
             self._core_snapshot.id, mode=mode) if self._core_snapshot else None
 
+    def get_file_entries(self):
+        """Returns a list of file entries for the task, which are only opened
+        when they are asked to
+
+        Returns
+        -------
+        list or None
+            list of file entries associated with the task
+        """
+        snapshot_controller = SnapshotController()
+        self._core_snapshot = self.__get_core_snapshot()
+        return snapshot_controller.get_file_entries(
+            self._core_snapshot.id) if self._core_snapshot else None
+
+    def get_logs(self, start=0, end=None, lines=None):
+        """Returns a range or the last lines of the logs for the run, without
+        loading the rest of them
+
+        Parameters
+        ----------
+        start : int, optional
+            offset in bytes of the start of the range, negative to count from the end
+            (default is 0, the start of the logs)
+        end : int, optional
+            offset in bytes of the end of the range, negative to count from the end
+            (default is None, the end of the logs)
+        lines : int, optional
+            number of lines to return from the end of the logs instead of a range
+            (default is None, which returns the range)
+
+        Returns
+        -------
+        str or None
+            logs for the run or None if there are no logs
+        """
+        self._core_task = self.__get_core_task()
+        if self._core_task.logs is None and not self._core_task.log_filepath:
+            return None
+        task_controller = TaskController()
+        return task_controller.get_logs(
+            self.id, start=start, end=end, lines=lines)
+
     def __eq__(self, other):
         return self.id == other.id if other else False
 
@@ -239,20 +295,21 @@ class Run():
             table_data.append(
                 ["Duration", "-> " + str(self.duration) + " seconds"])
         # Outputs
-        if self.logs:
+        if self._core_task.logs or self._core_task.log_filepath:
             table_data.append(
                 ["Logs", "-> Use task log to view or download logs"])
         if self.config:
             table_data.append(["Config", "-> " + str(self.config)])
         if self.results:
             table_data.append(["Results", "-> " + str(self.results)])
-        if not self.files:
+        # Only the names of the files are shown, so they are not opened
+        file_entries = self.get_file_entries()
+        if not file_entries:
             table_data.append(["Files", "-> None"])
         else:
-            table_data.append(["Files", "-> " + self.files[0].name])
-            if len(list(self.files)) > 1:
-                for f in self.files[1:]:
-                    table_data.append(["     ", "-> " + f.name])
+            table_data.append(["Files", "-> " + file_entries[0].name])
+            for file_entry in file_entries[1:]:
+                table_data.append(["     ", "-> " + file_entry.name])
         final_str = final_str + format_table(table_data)
         final_str = final_str + os.linesep + "    " + self.command + os.linesep + os.linesep
         return final_str
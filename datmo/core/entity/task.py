@@ -51,7 +51,7 @@ class Task():
             task directory path relative to the project root
             (default is None, which means it isn't set yet)
         log_filepath : str, optional
-            log filepath relative to the project root
+            path of the log store for the task relative to the project root
             (default is None, which means it isn't set yet)
         start_time : datetime.datetime, optional
             timestamp for the beginning time of the task
@@ -63,7 +63,8 @@ class Task():
             run id for the run (different from environment id and task id)
             (default is None, which means it isn't set yet)
         logs : str, optional
-            string output of logs
+            string output of logs, only set for tasks run before logs were kept
+            in the log store at log_filepath
             (default is None, which means it isn't set yet)
         status : str, optional
             status of the current task
@@ -110,7 +111,7 @@ class Task():
     data_directory_path_map: list
         list of tuple, mapping the source absolute directory path to destination relative directory path
     log_filepath : str or None
-        log filepath relative to the project root
+        path of the log store for the task relative to the project root
     start_time : datetime.datetime or None
         timestamp for the beginning time of the task
     after_snapshot_id : str or None
@@ -118,7 +119,8 @@ class Task():
     run_id : str or None
         run id for the run (different from environment id and task id)
     logs : str or None
-        string output of logs
+        string output of logs, only set for tasks run before logs were kept
+        in the log store at log_filepath
     status : str or None
         status of the current task
     results : dict or None
@@ -183,7 +185,7 @@ class Task():
             table_data.append(
                 ["Duration", "-> " + str(self.duration) + " seconds"])
         # Outputs
-        if self.logs:
+        if self.logs or self.log_filepath:
             table_data.append(
                 ["Logs", "-> Use task log to view or download logs"])
         if self.results:
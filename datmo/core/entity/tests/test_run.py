@@ -16,4 +16,11 @@ class TestRun():
         task_obj = CoreTask(self.task_dict)
         result = Run(task_obj)
         assert result
-        assert isinstance(result, Run)
\ No newline at end of file
+        assert isinstance(result, Run)
+
+    def test_list_fields(self):
+        # Runs listed with the fields have every attribute of the task except
+        # for the logs, which are read from the log store
+        task_obj = CoreTask(self.task_dict)
+        expected_fields = set(task_obj.__dict__) - set(["id", "logs"])
+        assert set(Run.LIST_FIELDS) == expected_fields
@@ -1,6 +1,10 @@
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from future.utils import with_metaclass
 
+from datmo.core.util.exceptions import InvalidArgumentType
+
+
 class DALDriver(with_metaclass(ABCMeta, object)):
     """DALDriver is the parent of all dal drivers. Any child must implement the methods below
 
@@ -10,18 +14,75 @@ class DALDriver(with_metaclass(ABCMeta, object)):
         get entity object from collection
     set(collection, obj)
         create entity object in collection
+    set_many(collection, objs)
+        create multiple entity objects in collection with a single write
     exists(collection, entity_id)
         checks if entity exists in collection
-    query(collection, query_params)
+    query(collection, query_params, sort_key, sort_order, fields, limit, offset)
         find entities in collection matching params
+    query_iter(collection, query_params, sort_key, sort_order, fields, limit, offset)
+        find entities in collection matching params, loading them lazily
     delete(collection, entity_id)
         delete entity from collection
+    transaction()
+        context manager to commit all writes within it at once
+
+    Attributes
+    ----------
+    COLLECTIONS : tuple
+        names of the collections of entities stored by the drivers
+    INDEXED_FIELDS : dict
+        fields for each collection which are queried on by the controllers. drivers
+        should maintain a persistent index for each of them
     """
 
+    COLLECTIONS = ('model', 'code', 'environment', 'file_collection', 'task',
+                   'snapshot', 'user')
+
+    INDEXED_FIELDS = {
+        'code': ('model_id', 'commit_id'),
+        'environment': ('model_id', 'unique_hash'),
+        'file_collection': ('model_id', 'filehash'),
+        'task': ('model_id', 'created_at'),
+        'snapshot': ('model_id', 'code_id', 'environment_id',
+                     'file_collection_id', 'visible', 'created_at'),
+    }
+
     @abstractmethod
     def __init__(self):
         pass
 
+    @staticmethod
+    def get_page_bounds(limit, offset):
+        """
+        returns the bounds of the page of query results for the limit and offset
+
+        Parameters
+        ----------
+        limit : int or None
+            maximum number of results, None for no limit
+        offset : int or None
+            number of results to skip, None to skip none
+
+        Returns
+        -------
+        tuple
+            start and stop indexes of the page, stop is None for no limit
+
+        Raises
+        ------
+        InvalidArgumentType
+            if limit or offset is not a non-negative integer
+        """
+        for value in (limit, offset):
+            if value is not None and (isinstance(value, bool) or
+                                      not isinstance(value, int) or
+                                      value < 0):
+                raise InvalidArgumentType()
+        start = offset or 0
+        stop = start + limit if limit is not None else None
+        return start, stop
+
     @abstractmethod
     def get(self, collection, entity_id):
         """
@@ -60,6 +121,26 @@ class DALDriver(with_metaclass(ABCMeta, object)):
         """
         pass
 
+    def set_many(self, collection, objs):
+        """
+        create multiple entity objects in collection. drivers should override this
+        to write all of the entities at once
+
+        Parameters
+        ----------
+        collection : str
+            name of the collection
+        objs : list
+            normalized python representations of entities to save
+
+        Returns
+        -------
+        list
+            list of dictionaries of normalized python
+            representations of the entities
+        """
+        return [self.set(collection, obj) for obj in objs]
+
     @abstractmethod
     def exists(self, collection, entity_id):
         """
@@ -80,7 +161,14 @@ class DALDriver(with_metaclass(ABCMeta, object)):
         pass
 
     @abstractmethod
-    def query(self, collection, query_params):
+    def query(self,
+              collection,
+              query_params,
+              sort_key=None,
+              sort_order=None,
+              fields=None,
+              limit=None,
+              offset=None):
         """
         find entities in collection matching params
 
@@ -90,6 +178,19 @@ class DALDriver(with_metaclass(ABCMeta, object)):
             name of the collection
         query_params : dict
             query dictionary for driver
+        sort_key : str, optional
+            key to sort the entities on
+        sort_order : str, optional
+            either "ascending" or "descending", required with sort_key
+        fields : list, optional
+            names of the fields to return for each entity along with its id
+            (default is None, which returns all of the fields)
+        limit : int, optional
+            maximum number of entities to return
+            (default is None, which returns all of the entities)
+        offset : int, optional
+            number of entities to skip, used with sort_key to page through them
+            (default is None, which skips none)
 
         Returns
         -------
@@ -99,6 +200,48 @@ class DALDriver(with_metaclass(ABCMeta, object)):
         """
         pass
 
+    def query_iter(self,
+                   collection,
+                   query_params,
+                   sort_key=None,
+                   sort_order=None,
+                   fields=None,
+                   limit=None,
+                   offset=None):
+        """
+        find entities in collection matching params, loading them one at a time
+        while iterating. drivers should override this to stream the entities
+
+        Parameters
+        ----------
+        collection : str
+            name of the collection
+        query_params : dict
+            query dictionary for driver
+        sort_key : str, optional
+            key to sort the entities on
+        sort_order : str, optional
+            either "ascending" or "descending", required with sort_key
+        fields : list, optional
+            names of the fields to return for each entity along with its id
+            (default is None, which returns all of the fields)
+        limit : int, optional
+            maximum number of entities to return
+            (default is None, which returns all of the entities)
+        offset : int, optional
+            number of entities to skip, used with sort_key to page through them
+            (default is None, which skips none)
+
+        Returns
+        -------
+        iterator
+            iterator of dictionaries of normalized python
+            representations of the entities
+        """
+        return iter(
+            self.query(collection, query_params, sort_key, sort_order, fields,
+                       limit, offset))
+
     @abstractmethod
     def delete(self, collection, entity_id):
         """
@@ -117,3 +260,16 @@ class DALDriver(with_metaclass(ABCMeta, object)):
             True if successful delete
         """
         pass
+
+    @contextmanager
+    def transaction(self):
+        """
+        context manager to commit all writes within it at once, or none of them
+        if an exception is raised. drivers should override this, by default each
+        write is committed immediately
+
+        Yields
+        ------
+        None
+        """
+        yield
@@ -1,20 +1,54 @@
+import os
+import re
+import uuid
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
 from blitzdb import Document, queryset
-from datetime import datetime
+from blitzdb.backends.file.index import Index
 
 from datmo.core.util.exceptions import (
-    EntityNotFound, EntityCollectionNotFound, IncorrectType,
-    InvalidArgumentType, RequiredArgumentMissing, MoreThanOneEntityFound)
+    EntityNotFound, EntityCollectionNotFound, InvalidArgumentType,
+    RequiredArgumentMissing, MoreThanOneEntityFound)
 from datmo.core.storage.driver import DALDriver
+from datmo.core.storage.driver.codec import (
+    normalize_entity, denormalize_entity, project_document)
 
 class BlitzDBDALDriver(DALDriver):
+    """BlitzDB based DAL driver
+
+    For the file backend each collection has a generation file within the
+    database directory which is rewritten on every commit. Collections are only
+    reloaded from disk if their generation file changed since the last time this
+    driver read them, so in memory indexes are kept between calls.
+
+    Within a transaction, writes are buffered in memory and overlaid on reads of
+    this driver. They are saved with a single commit when the transaction ends.
+    """
+
     def __init__(self, driver_type, connection_string):
         super(BlitzDBDALDriver, self).__init__()
         self.database_name = 'datmo_db'
         self.driver_type = driver_type
         self.connection_string = connection_string
+        # signature of each collection generation file at the last (re)load
+        self._generation_signatures = {}
+        # documents written within the current transaction by collection and pk
+        # (None for deleted documents), None outside of a transaction
+        self._pending = None
         if self.driver_type == "file":
             from blitzdb import FileBackend
+            self._generation_dirpath = os.path.join(self.connection_string,
+                                                    "generation")
+            if not os.path.isdir(self._generation_dirpath):
+                os.makedirs(self._generation_dirpath)
+            # Signatures are read before the backend loads so a concurrent
+            # write results in an extra reload instead of a missed one
+            for collection in self.COLLECTIONS:
+                self._generation_signatures[collection] = \
+                    self._get_generation_signature(collection)
             self.backend = FileBackend(self.connection_string)
+            self._ensure_indexes()
         elif self.driver_type == "mongo":
             from pymongo import MongoClient
             from blitzdb.backends.mongo import Backend as MongoBackend
@@ -50,17 +84,94 @@ class BlitzDBDALDriver(DALDriver):
         class Meta(Document.Meta):
             collection = 'user'
 
-    def __reload(self):
-        if hasattr(self.backend, "indexes"):
-            for _, nested_index in self.backend.indexes.items():
-                for index, _ in nested_index.items():
-                    # Only load from store if storage exists
-                    if nested_index[index]._store:
-                        nested_index[index].load_from_store()
-            self.__init__(self.driver_type, self.connection_string)
+    def _get_generation_filepath(self, collection):
+        return os.path.join(self._generation_dirpath, collection)
+
+    def _get_generation_signature(self, collection):
+        """Returns the stat signature of the collection generation file or None"""
+        try:
+            stat_result = os.stat(self._get_generation_filepath(collection))
+        except OSError:
+            return None
+        return (stat_result.st_ino, stat_result.st_mtime_ns,
+                stat_result.st_size)
+
+    def _get_generation(self, collection):
+        try:
+            with open(self._get_generation_filepath(collection), "r") as f:
+                return int(f.read().strip() or 0)
+        except (IOError, OSError, ValueError):
+            return 0
+
+    def _bump_generation(self, collection):
+        """Increment the generation counter of the collection after a commit"""
+        if not hasattr(self.backend, "indexes"):
+            return
+        generation = self._get_generation(collection) + 1
+        # Write to a temp file and replace so readers never see partial writes
+        # and every commit yields a new file signature
+        fd, temp_filepath = tempfile.mkstemp(dir=self._generation_dirpath)
+        with os.fdopen(fd, "w") as f:
+            f.write(str(generation))
+        os.replace(temp_filepath, self._get_generation_filepath(collection))
+        self._generation_signatures[collection] = \
+            self._get_generation_signature(collection)
+
+    def _ensure_indexes(self):
+        """Create the declared persistent indexes missing from the database
+
+        blitzdb keeps persistent indexes up to date on every save and delete and
+        loads them from disk, so queries on these fields do not scan documents
+        """
+        configured_indexes = self.backend.config['indexes']
+        for collection, fields in self.INDEXED_FIELDS.items():
+            for field in fields:
+                if field not in configured_indexes.get(collection, {}):
+                    self.backend.create_index(collection, {'key': field})
+
+    def _discard_index_entries(self, collection, entity_id):
+        """Remove the indexed values of an existing entity before it is saved again
+
+        The transactional index of blitzdb cancels the removal of the old values
+        when a key is added back, so updated entities would otherwise still be
+        found by their previous values in indexes kept between calls
+        """
+        if not hasattr(self.backend, "indexes") or entity_id is None:
+            return
+        cls = self.backend.get_cls_for_collection(collection)
+        pk_name = cls.get_pk_name()
+        store_keys = self.backend.get_pk_index(collection).get_keys_for(
+            entity_id)
+        for key, index in self.backend.get_collection_indexes(
+                collection).items():
+            if key == pk_name:
+                continue
+            for store_key in store_keys:
+                Index.remove_key(index, store_key)
+
+    def __reload(self, collection):
+        """Reload the collection from disk if it changed since the last read"""
+        if not hasattr(self.backend, "indexes"):
+            return
+        signature = self._get_generation_signature(collection)
+        if self._generation_signatures.get(collection) == signature:
+            return
+        # Pick up persistent indexes created by other instances
+        self.backend.load_config()
+        self.backend.stores.pop(collection, None)
+        self.backend.index_stores.pop(collection, None)
+        self.backend.indexes.pop(collection, None)
+        if collection in self.backend.collections:
+            self.backend.init_indexes(collection)
+        self._generation_signatures[collection] = signature
 
     def get(self, collection, entity_id):
-        self.__reload()
+        pending = self._get_pending(collection)
+        if entity_id in pending:
+            if pending[entity_id] is None:
+                raise EntityNotFound()
+            return normalize_entity(pending[entity_id])
+        self.__reload(collection)
         try:
             results = self.backend.filter(collection, {'pk': entity_id})
             if len(results) == 1:
@@ -72,25 +183,118 @@ class BlitzDBDALDriver(DALDriver):
             raise EntityCollectionNotFound(err.message)
 
     def get_by_shortened_id(self, collection, shortened_entity_id):
-        self.__reload()
+        self.__reload(collection)
         try:
-            results = self.backend.filter(
-                collection, {'pk': {
-                    '$regex': '^%s' % shortened_entity_id
-                }})
-            if len(results) == 1:
-                item_dict = results[0].attributes
-                return normalize_entity(item_dict)
-            elif len(results) > 1:
-                raise MoreThanOneEntityFound()
-            else:
-                raise EntityNotFound()
+            results = [
+                item.attributes
+                for item in self.backend.filter(
+                    collection, {'pk': {
+                        '$regex': '^%s' % shortened_entity_id
+                    }})
+            ]
         except AttributeError as err:
             raise EntityCollectionNotFound(err.message)
+        pending = self._get_pending(collection)
+        if pending:
+            results = [
+                item_dict for item_dict in results
+                if item_dict['pk'] not in pending
+            ] + [
+                document for pk, document in pending.items()
+                if document is not None and pk.startswith(shortened_entity_id)
+            ]
+        if len(results) == 1:
+            return normalize_entity(results[0])
+        elif len(results) > 1:
+            raise MoreThanOneEntityFound()
+        else:
+            raise EntityNotFound()
 
     def set(self, collection, obj):
-        self.__reload()
-        compatible_obj = denormalize_entity(obj)
+        if self._pending is not None:
+            return normalize_entity(
+                self._buffer(collection, denormalize_entity(obj)))
+        self.__reload(collection)
+        item = self._save(collection, denormalize_entity(obj))
+        self.backend.commit()
+        self._bump_generation(collection)
+        return normalize_entity(item.attributes.copy())
+
+    def set_many(self, collection, objs):
+        if self._pending is not None:
+            return [self.set(collection, obj) for obj in objs]
+        self.__reload(collection)
+        items = [
+            self._save(collection, denormalize_entity(obj)) for obj in objs
+        ]
+        self.backend.commit()
+        self._bump_generation(collection)
+        return [normalize_entity(item.attributes.copy()) for item in items]
+
+    @contextmanager
+    def transaction(self):
+        if self._pending is not None:
+            # nested transactions are part of the outermost one
+            yield
+            return
+        self._pending = OrderedDict()
+        try:
+            yield
+        except BaseException:
+            self._pending = None
+            raise
+        pending, self._pending = self._pending, None
+        self._commit_pending(pending)
+
+    def _get_pending(self, collection):
+        if self._pending is None:
+            return {}
+        return self._pending.get(collection, {})
+
+    def _buffer(self, collection, compatible_obj):
+        """Buffers a document written within a transaction and returns it"""
+        if collection not in self.COLLECTIONS:
+            raise EntityCollectionNotFound(collection)
+        document = compatible_obj.copy()
+        if document.get('pk') is None:
+            document['pk'] = uuid.uuid4().hex
+        self._pending.setdefault(collection,
+                                 OrderedDict())[document['pk']] = document
+        return document
+
+    def _commit_pending(self, pending):
+        """Saves and deletes the documents of a transaction with a single commit"""
+        if not pending:
+            return
+        for collection in pending:
+            self.__reload(collection)
+        for collection, documents in pending.items():
+            for pk, document in documents.items():
+                if document is not None:
+                    self._save(collection, document)
+                    continue
+                results = self.backend.filter(collection, {'pk': pk})
+                if len(results) == 1:
+                    self.backend.delete(results[0])
+        self.backend.commit()
+        for collection in pending:
+            self._bump_generation(collection)
+
+    def _save(self, collection, compatible_obj):
+        """Saves the entity to the backend without committing
+
+        Parameters
+        ----------
+        collection : str
+            name of the collection to save the entity in
+        compatible_obj : dict
+            BlitzDB Document-compatible dictionary of the entity to save
+
+        Returns
+        -------
+        blitzdb.Document
+            saved document, with the primary key generated if not given
+        """
         if collection == 'model':
             item = self.ModelDocument(compatible_obj)
         elif collection == 'code':
@@ -107,49 +311,103 @@ class BlitzDBDALDriver(DALDriver):
             item = self.UserDocument(compatible_obj)
         else:
             raise EntityCollectionNotFound(collection)
+        self._discard_index_entries(collection, item.pk)
         self.backend.save(item)
-        self.backend.commit()
-        return self.get(collection, item.pk)
+        return item
 
     def exists(self, collection, entity_id):
-        self.__reload()
+        pending = self._get_pending(collection)
+        if entity_id in pending:
+            return pending[entity_id] is not None
+        self.__reload(collection)
         results = self.backend.filter(collection, {'pk': entity_id})
         return len(results) == 1
 
-    def query(self, collection, query_params, sort_key=None, sort_order=None):
-        self.__reload()
+    def query(self,
+              collection,
+              query_params,
+              sort_key=None,
+              sort_order=None,
+              fields=None,
+              limit=None,
+              offset=None):
+        return list(
+            self.query_iter(collection, query_params, sort_key, sort_order,
+                            fields, limit, offset))
+
+    def query_iter(self,
+                   collection,
+                   query_params,
+                   sort_key=None,
+                   sort_order=None,
+                   fields=None,
+                   limit=None,
+                   offset=None):
+        start, stop = self.get_page_bounds(limit, offset)
+        self.__reload(collection)
         if query_params.get('id', None) is not None:
-            query_params['pk'] = query_params['id']
-            del query_params['id']
+            query_params = query_params.copy()
+            query_params['pk'] = query_params.pop('id')
         if sort_key is not None and sort_order is not None:
             if sort_order == 'ascending':
-                return list(
-                    map(normalize_entity, [
-                        item.attributes.copy() for item in self.backend.filter(
-                            collection, query_params).sort(
-                                sort_key, queryset.QuerySet.ASCENDING)
-                    ]))
+                results = self.backend.filter(collection, query_params).sort(
+                    sort_key, queryset.QuerySet.ASCENDING)
             elif sort_order == 'descending':
-                return list(
-                    map(normalize_entity, [
-                        item.attributes.copy() for item in self.backend.filter(
-                            collection, query_params).sort(
-                                sort_key, queryset.QuerySet.DESCENDING)
-                    ]))
+                results = self.backend.filter(collection, query_params).sort(
+                    sort_key, queryset.QuerySet.DESCENDING)
             else:
                 raise InvalidArgumentType()
         else:
             if sort_key is not None and sort_order is None or \
                 sort_key is None and sort_order is not None:
                 raise RequiredArgumentMissing()
-            return list(
-                map(normalize_entity, [
-                    item.attributes.copy()
-                    for item in self.backend.filter(collection, query_params)
-                ]))
+            results = self.backend.filter(collection, query_params)
+        pending = self._get_pending(collection)
+        if pending:
+            return iter(
+                self._merge_pending(pending, results, query_params, sort_key,
+                                    sort_order, fields)[start:stop])
+        # Only the documents within the page are loaded
+        return self._iter_documents(results[start:stop], fields)
+
+    def _iter_documents(self, results, fields):
+        """Yields the normalized documents of the results, loading one at a time"""
+        if not hasattr(self.backend, "indexes"):
+            for item in results:
+                yield normalize_entity(
+                    project_document(item.attributes, fields))
+            return
+        # The queryset caches every document it loads, so load them directly
+        for store_key in results.keys:
+            item = self.backend.get_object(results.cls, store_key)
+            yield normalize_entity(project_document(item.attributes, fields))
+
+    def _merge_pending(self, pending, results, query_params, sort_key,
+                       sort_order, fields):
+        """Returns the query results with the writes of the transaction applied"""
+        merged = [
+            item.attributes for item in results
+            if item.attributes['pk'] not in pending
+        ]
+        merged.extend(
+            document for document in pending.values()
+            if document is not None and match_query(document, query_params))
+        merged = [normalize_entity(document) for document in merged]
+        if sort_key is not None:
+            merged.sort(
+                key=lambda item: (item.get(sort_key) is not None,
+                                  item.get(sort_key)),
+                reverse=sort_order == 'descending')
+        return [project_document(item, fields) for item in merged]
 
     def delete(self, collection, entity_id):
-        self.__reload()
+        if self._pending is not None:
+            if not self.exists(collection, entity_id):
+                raise EntityNotFound()
+            self._pending.setdefault(collection,
+                                     OrderedDict())[entity_id] = None
+            return True
+        self.__reload(collection)
         results = self.backend.filter(collection, {'pk': entity_id})
         if len(results) == 1:
             document = results[0]
@@ -157,84 +415,52 @@ class BlitzDBDALDriver(DALDriver):
             raise EntityNotFound()
         self.backend.delete(document)
         self.backend.commit()
+        self._bump_generation(collection)
         return True
 
-def normalize_entity(in_dict):
-    """Converts BlitzDB Document to standard dictionary
+def match_query(document, query_params):
+    """Checks if a BlitzDB Document-compatible dictionary matches the query
 
     Parameters
     ----------
-    in_dict : dict
+    document : dict
         BlitzDB Document-compatible dictionary of values
+    query_params : dict
+        query dictionary with the same operators as the BlitzDB file backend
 
     Returns
     -------
-    dict
-        normal dictionary of values, output of to_dictionary function
-    """
-    out_dict = in_dict.copy()
-    if 'pk' in list(in_dict):
-        out_dict['id'] = in_dict['pk']
-        del out_dict['pk']
-    if 'start_time' in list(in_dict):
-        out_dict['start_time'] = \
-            datetime.strptime(in_dict['start_time'], '%Y-%m-%dT%H:%M:%S.%fZ') \
-                if out_dict['start_time'] else None
-    if 'end_time' in list(in_dict):
-        out_dict['end_time'] = \
-            datetime.strptime(in_dict['end_time'], '%Y-%m-%dT%H:%M:%S.%fZ') \
-                if out_dict['end_time'] else None
-    if 'created_at' in list(in_dict):
-        out_dict['created_at'] = datetime.strptime(in_dict['created_at'],
-                                                   '%Y-%m-%dT%H:%M:%S.%fZ')
-    if 'updated_at' in list(in_dict):
-        out_dict['updated_at'] = datetime.strptime(in_dict['updated_at'],
-                                                   '%Y-%m-%dT%H:%M:%S.%fZ')
-    return out_dict
-
-def denormalize_entity(in_dict):
-    """Converts standard dictionary to BlitzDB Document-compatible dictionary
-
-    Parameters
-    ----------
-    in_dict : dict
-        normal dictionary of values, output of to_dictionary function
-
-    Returns
-    -------
-    dict
-        BlitzDB Document-compatible dictionary of values
+    bool
+        True if the document matches all of the query params
     """
-    out_dict = in_dict.copy()
-    if 'id' in list(in_dict):
-        out_dict['pk'] = in_dict['id']
-        del out_dict['id']
-    if 'start_time' in list(in_dict):
-        # if not a datetime object, throw error
-        if in_dict['start_time'] and not isinstance(in_dict['start_time'],
-                                                    datetime):
-            raise IncorrectType()
-        out_dict['start_time'] = \
-            in_dict['start_time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ') \
-                if in_dict['start_time'] else None
-    if 'end_time' in list(in_dict):
-        # if not a datetime object, throw error
-        if in_dict['end_time'] and not isinstance(in_dict['end_time'],
-                                                  datetime):
-            raise IncorrectType()
-        out_dict['end_time'] = \
-            in_dict['end_time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ') \
-                if in_dict['end_time'] else None
-    if 'created_at' in list(in_dict):
-        # if not a datetime object, throw error
-        if not isinstance(in_dict['created_at'], datetime):
-            raise IncorrectType()
-        out_dict['created_at'] = in_dict['created_at'].strftime(
-            '%Y-%m-%dT%H:%M:%S.%fZ')
-    if 'updated_at' in list(in_dict):
-        # if not a datetime object, throw error
-        if not isinstance(in_dict['updated_at'], datetime):
-            raise IncorrectType()
-        out_dict['updated_at'] = in_dict['updated_at'].strftime(
-            '%Y-%m-%dT%H:%M:%S.%fZ')
-    return out_dict
+    for key, expression in query_params.items():
+        value = document
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(expression, dict) and expression and \
+                all(operator.startswith("$") for operator in expression):
+            for operator, operand in expression.items():
+                if operator == '$in':
+                    matched = value in operand
+                elif operator == '$regex':
+                    matched = isinstance(value, str) and \
+                              re.match(operand, value) is not None
+                elif operator == '$exists':
+                    matched = (value is not None) == bool(operand)
+                elif operator == '$ne':
+                    matched = value != operand
+                elif operator == '$gt':
+                    matched = value is not None and value > operand
+                elif operator == '$gte':
+                    matched = value is not None and value >= operand
+                elif operator == '$lt':
+                    matched = value is not None and value < operand
+                elif operator == '$lte':
+                    matched = value is not None and value <= operand
+                else:
+                    raise InvalidArgumentType()
+                if not matched:
+                    return False
+        elif value != expression:
+            return False
+    return True
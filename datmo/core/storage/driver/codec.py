@@ -0,0 +1,140 @@
+"""Conversion of entities between their python and stored representations
+
+Datetimes are stored as strings with DATETIME_FORMAT, which sort in the same
+order as the datetimes they represent.
+"""
+
+from datetime import datetime
+
+from datmo.core.util.exceptions import IncorrectType
+
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Entity fields holding datetimes, the optional ones may be None
+DATETIME_FIELDS = ('created_at', 'updated_at')
+OPTIONAL_DATETIME_FIELDS = ('start_time', 'end_time')
+
+try:
+    datetime.fromisoformat
+    _has_fromisoformat = True
+except AttributeError:
+    _has_fromisoformat = False
+
+def encode_datetime(value):
+    """Converts a datetime to its string representation with DATETIME_FORMAT
+
+    Parameters
+    ----------
+    value : datetime.datetime
+
+    Returns
+    -------
+    str
+    """
+    # Formatting the fields directly is much faster than strftime
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%06dZ" % (
+        value.year, value.month, value.day, value.hour, value.minute,
+        value.second, value.microsecond)
+
+def decode_datetime(value):
+    """Converts a string with DATETIME_FORMAT to a datetime
+
+    Parameters
+    ----------
+    value : str
+
+    Returns
+    -------
+    datetime.datetime
+    """
+    if _has_fromisoformat and value.endswith('Z'):
+        # fromisoformat is implemented in C unlike strptime
+        return datetime.fromisoformat(value[:-1])
+    return datetime.strptime(value, DATETIME_FORMAT)
+
+def normalize_entity(in_dict):
+    """Converts BlitzDB Document to standard dictionary
+
+    Parameters
+    ----------
+    in_dict : dict
+        BlitzDB Document-compatible dictionary of values
+
+    Returns
+    -------
+    dict
+        normal dictionary of values, output of to_dictionary function
+    """
+    out_dict = in_dict.copy()
+    if 'pk' in out_dict:
+        out_dict['id'] = out_dict.pop('pk')
+    for key in OPTIONAL_DATETIME_FIELDS:
+        if key in out_dict:
+            out_dict[key] = decode_datetime(out_dict[key]) \
+                if out_dict[key] else None
+    for key in DATETIME_FIELDS:
+        if key in out_dict:
+            out_dict[key] = decode_datetime(out_dict[key])
+    return out_dict
+
+def denormalize_entity(in_dict):
+    """Converts standard dictionary to BlitzDB Document-compatible dictionary
+
+    Parameters
+    ----------
+    in_dict : dict
+        normal dictionary of values, output of to_dictionary function
+
+    Returns
+    -------
+    dict
+        BlitzDB Document-compatible dictionary of values
+
+    Raises
+    ------
+    IncorrectType
+        if a datetime field does not hold a datetime
+    """
+    out_dict = in_dict.copy()
+    if 'id' in out_dict:
+        out_dict['pk'] = out_dict.pop('id')
+    for key in OPTIONAL_DATETIME_FIELDS:
+        if key in out_dict:
+            # if not a datetime object, throw error
+            if out_dict[key] and not isinstance(out_dict[key], datetime):
+                raise IncorrectType()
+            out_dict[key] = encode_datetime(out_dict[key]) \
+                if out_dict[key] else None
+    for key in DATETIME_FIELDS:
+        if key in out_dict:
+            # if not a datetime object, throw error
+            if not isinstance(out_dict[key], datetime):
+                raise IncorrectType()
+            out_dict[key] = encode_datetime(out_dict[key])
+    return out_dict
+
+def project_document(document, fields):
+    """Returns the document with only its id and the given fields
+
+    Parameters
+    ----------
+    document : dict
+        BlitzDB Document-compatible or normal dictionary of values
+    fields : list or None
+        names of the fields to keep, None to keep all of them
+
+    Returns
+    -------
+    dict
+        dictionary with the id and the fields of the document which are not None
+    """
+    if fields is None:
+        return document
+    projected = {}
+    for key in ('pk', 'id'):
+        if key in document:
+            projected[key] = document[key]
+    for key in fields:
+        if document.get(key) is not None:
+            projected[key] = document[key]
+    return projected
@@ -0,0 +1,432 @@
+import os
+import re
+import json
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+from datmo.core.util.exceptions import (
+    EntityNotFound, EntityCollectionNotFound, InvalidArgumentType,
+    RequiredArgumentMissing, MoreThanOneEntityFound)
+from datmo.core.storage.driver import DALDriver
+from datmo.core.storage.driver.codec import (
+    normalize_entity, denormalize_entity, encode_datetime, project_document)
+
+# One connection per database file for each process
+_connections = {}
+_connections_lock = threading.Lock()
+
+COMPARISON_OPERATORS = {
+    '$gt': '>',
+    '$gte': '>=',
+    '$lt': '<',
+    '$lte': '<=',
+}
+
+def _regexp(pattern, value):
+    # Same semantics as the $regex operator of blitzdb (match from the start)
+    return isinstance(value, str) and re.match(pattern, value) is not None
+
+def _to_json_default(value):
+    if isinstance(value, datetime):
+        return encode_datetime(value)
+    raise TypeError("%r is not JSON serializable" % value)
+
+def _to_json(value):
+    return json.dumps(
+        value,
+        sort_keys=True,
+        separators=(',', ':'),
+        default=_to_json_default)
+
+def _create_schema(connection):
+    """Create the tables and indexes for all collections and add any missing indexed columns"""
+    for collection in DALDriver.COLLECTIONS:
+        fields = DALDriver.INDEXED_FIELDS.get(collection, ())
+        columns = "".join(', "%s"' % field for field in fields)
+        # Columns are declared without a type to keep the python types of values
+        connection.execute('CREATE TABLE IF NOT EXISTS "%s" '
+                           '(id PRIMARY KEY, document TEXT NOT NULL%s)' %
+                           (collection, columns))
+        existing_columns = [
+            row[1] for row in connection.execute(
+                'PRAGMA table_info("%s")' % collection)
+        ]
+        for field in fields:
+            if field not in existing_columns:
+                connection.execute('ALTER TABLE "%s" ADD COLUMN "%s"' %
+                                   (collection, field))
+                connection.execute(
+                    'UPDATE "%s" SET "%s" = json_extract(document, \'$."%s"\')'
+                    % (collection, field, field))
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS "%s_%s" ON "%s" ("%s")' %
+                (collection, field, collection, field))
+
+class SharedConnection(object):
+    """Connection to a database file shared by all drivers of a process
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        connection to the database in WAL mode
+    lock : threading.RLock
+        lock to hold while using the connection
+    inode : int
+        inode of the database file when it was opened
+    transaction_depth : int
+        number of nested transactions in progress
+    """
+
+    def __init__(self, connection, inode):
+        self.connection = connection
+        self.lock = threading.RLock()
+        self.inode = inode
+        self.transaction_depth = 0
+
+def get_connection(database_filepath):
+    """Returns the shared connection of this process to the database file
+
+    A new connection is opened if there is none yet or if the database file has
+    been removed or replaced since the connection was opened
+
+    Parameters
+    ----------
+    database_filepath : str
+        absolute filepath of the sqlite database
+
+    Returns
+    -------
+    SharedConnection
+        connection to the database in WAL mode
+    """
+    key = (os.getpid(), database_filepath)
+    with _connections_lock:
+        inode = os.stat(database_filepath).st_ino if os.path.isfile(
+            database_filepath) else None
+        if key in _connections:
+            shared_connection = _connections[key]
+            if inode is not None and inode == shared_connection.inode:
+                return shared_connection
+            shared_connection.connection.close()
+        connection = sqlite3.connect(
+            database_filepath, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.create_function("REGEXP", 2, _regexp)
+        with connection:
+            _create_schema(connection)
+        _connections[key] = SharedConnection(
+            connection,
+            os.stat(database_filepath).st_ino)
+        return _connections[key]
+
+class SQLiteDALDriver(DALDriver):
+    """SQLite based DAL driver using the sqlite3 module from the standard library
+
+    Each collection is a table with the entity id as primary key, the entity as a
+    JSON document and an indexed column for each of the INDEXED_FIELDS of the
+    collection. The database is opened in WAL mode and a single connection is
+    shared by all drivers of the process, so a transaction includes the writes of
+    all drivers of the thread which opened it.
+
+    Parameters
+    ----------
+    connection_string : str
+        absolute path of the directory containing the database file
+    """
+
+    DATABASE_FILENAME = "datmo.sqlite"
+    FETCH_SIZE = 100
+
+    def __init__(self, connection_string):
+        super(SQLiteDALDriver, self).__init__()
+        self.connection_string = connection_string
+        if not os.path.isdir(self.connection_string):
+            os.makedirs(self.connection_string)
+        self.database_filepath = os.path.join(self.connection_string,
+                                              self.DATABASE_FILENAME)
+        self._shared_connection = get_connection(self.database_filepath)
+        self.connection = self._shared_connection.connection
+        self._lock = self._shared_connection.lock
+
+    @contextmanager
+    def _write(self):
+        """Holds the lock and commits on exit unless within a transaction"""
+        with self._lock:
+            if self._shared_connection.transaction_depth:
+                yield
+            else:
+                with self.connection:
+                    yield
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            self._shared_connection.transaction_depth += 1
+            try:
+                if self._shared_connection.transaction_depth > 1:
+                    # nested transactions are part of the outermost one
+                    yield
+                else:
+                    with self.connection:
+                        yield
+            finally:
+                self._shared_connection.transaction_depth -= 1
+
+    def _check_collection(self, collection):
+        if collection not in self.COLLECTIONS:
+            raise EntityCollectionNotFound(collection)
+
+    def _get_column(self, collection, key):
+        """Returns the SQL expression for the key of a document"""
+        if key in ['id', 'pk']:
+            return "id"
+        if key in self.INDEXED_FIELDS.get(collection, ()):
+            return '"%s"' % key
+        return self._get_document_value(key)
+
+    @staticmethod
+    def _get_json_path(key):
+        """Returns the JSON path of the key within the document"""
+        if '"' in key or "'" in key:
+            raise InvalidArgumentType()
+        return "$" + "".join('."%s"' % part for part in key.split("."))
+
+    def _get_document_value(self, key):
+        """Returns the SQL expression extracting the key from the JSON document"""
+        return "json_extract(document, '%s')" % self._get_json_path(key)
+
+    @staticmethod
+    def _to_sql_value(value):
+        if isinstance(value, datetime):
+            # Dates are stored as strings which sort in the same order
+            return encode_datetime(value)
+        if isinstance(value, (dict, list, tuple)):
+            return _to_json(value)
+        return value
+
+    def _compile_condition(self, collection, key, expression, params):
+        column = self._get_column(collection, key)
+        if isinstance(expression, dict) and expression and \
+                all(operator.startswith("$") for operator in expression):
+            clauses = []
+            for operator, value in expression.items():
+                if operator in COMPARISON_OPERATORS:
+                    clauses.append("%s %s ?" %
+                                   (column, COMPARISON_OPERATORS[operator]))
+                    params.append(self._to_sql_value(value))
+                elif operator == '$ne':
+                    clauses.append("(%s IS NULL OR %s != ?)" % (column,
+                                                                column))
+                    params.append(self._to_sql_value(value))
+                elif operator == '$in':
+                    if not value:
+                        clauses.append("0")
+                        continue
+                    clauses.append("%s IN (%s)" % (column, ", ".join(
+                        "?" * len(value))))
+                    params.extend(self._to_sql_value(item) for item in value)
+                elif operator == '$regex':
+                    clauses.append("%s REGEXP ?" % column)
+                    params.append(value)
+                elif operator == '$exists':
+                    clauses.append("%s IS %sNULL" % (column, "NOT "
+                                                     if value else ""))
+                else:
+                    raise InvalidArgumentType()
+            return " AND ".join(clauses)
+        if expression is None:
+            return "%s IS NULL" % column
+        if isinstance(expression, (dict, list, tuple)):
+            params.append(self._to_sql_value(expression))
+            return "%s = json(?)" % column
+        params.append(self._to_sql_value(expression))
+        return "%s = ?" % column
+
+    def _compile_query(self, collection, query_params, sort_key, sort_order,
+                       fields, limit, offset):
+        start, stop = self.get_page_bounds(limit, offset)
+        params = []
+        clauses = [
+            self._compile_condition(collection, key, expression, params)
+            for key, expression in query_params.items()
+        ]
+        if not fields:
+            sql = 'SELECT id, document FROM "%s"' % collection
+        else:
+            # Only the projected values are read out of the documents. With
+            # several paths json_extract returns a JSON array of the values,
+            # which keeps their JSON types
+            paths = [self._get_json_path(field) for field in fields]
+            if len(paths) == 1:
+                paths.append(paths[0])
+            sql = 'SELECT id, json_extract(document, %s) FROM "%s"' % (
+                ", ".join("'%s'" % path for path in paths), collection)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if sort_key is not None and sort_order is not None:
+            if sort_order == 'ascending':
+                sql += " ORDER BY %s ASC" % self._get_column(
+                    collection, sort_key)
+            elif sort_order == 'descending':
+                sql += " ORDER BY %s DESC" % self._get_column(
+                    collection, sort_key)
+            else:
+                raise InvalidArgumentType()
+        elif sort_key is not None or sort_order is not None:
+            raise RequiredArgumentMissing()
+        if stop is not None or start:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([stop - start if stop is not None else -1, start])
+        return sql, params
+
+    @staticmethod
+    def _to_entity(entity_id, document, fields=None):
+        if fields:
+            # projected values are selected as a JSON array
+            item_dict = project_document(
+                dict(zip(fields, json.loads(document))), fields)
+        else:
+            item_dict = project_document(json.loads(document), fields)
+        item_dict['pk'] = entity_id
+        return normalize_entity(item_dict)
+
+    def _save(self, collection, obj):
+        """Writes the entity without committing and returns its id and document"""
+        document_dict = denormalize_entity(obj)
+        entity_id = document_dict.pop('pk', None)
+        if entity_id is None:
+            entity_id = uuid.uuid4().hex
+        document = _to_json(document_dict)
+        fields = self.INDEXED_FIELDS.get(collection, ())
+        columns = "".join(', "%s"' % field for field in fields)
+        self.connection.execute(
+            'INSERT OR REPLACE INTO "%s" (id, document%s) VALUES (?, ?%s)' %
+            (collection, columns, ", ?" * len(fields)),
+            [entity_id, document] + [
+                self._to_sql_value(document_dict.get(field))
+                for field in fields
+            ])
+        return entity_id, document
+
+    def get(self, collection, entity_id):
+        self._check_collection(collection)
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT id, document FROM "%s" WHERE id = ?' % collection,
+                (entity_id, )).fetchone()
+        if row is None:
+            raise EntityNotFound()
+        return self._to_entity(*row)
+
+    def get_by_shortened_id(self, collection, shortened_entity_id):
+        self._check_collection(collection)
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT id, document FROM "%s" WHERE substr(id, 1, ?) = ? '
+                'LIMIT 2' % collection,
+                (len(shortened_entity_id), shortened_entity_id)).fetchall()
+        if len(rows) > 1:
+            raise MoreThanOneEntityFound()
+        if not rows:
+            raise EntityNotFound()
+        return self._to_entity(*rows[0])
+
+    def set(self, collection, obj):
+        self._check_collection(collection)
+        with self._write():
+            entity_id, document = self._save(collection, obj)
+        return self._to_entity(entity_id, document)
+
+    def set_many(self, collection, objs):
+        self._check_collection(collection)
+        with self._write():
+            saved = [self._save(collection, obj) for obj in objs]
+        return [
+            self._to_entity(entity_id, document)
+            for entity_id, document in saved
+        ]
+
+    def exists(self, collection, entity_id):
+        self._check_collection(collection)
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT 1 FROM "%s" WHERE id = ?' % collection,
+                (entity_id, )).fetchone()
+        return row is not None
+
+    def query(self,
+              collection,
+              query_params,
+              sort_key=None,
+              sort_order=None,
+              fields=None,
+              limit=None,
+              offset=None):
+        self._check_collection(collection)
+        sql, params = self._compile_query(collection, query_params, sort_key,
+                                          sort_order, fields, limit, offset)
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [
+            self._to_entity(entity_id, document, fields)
+            for entity_id, document in rows
+        ]
+
+    def query_iter(self,
+                   collection,
+                   query_params,
+                   sort_key=None,
+                   sort_order=None,
+                   fields=None,
+                   limit=None,
+                   offset=None):
+        self._check_collection(collection)
+        sql, params = self._compile_query(collection, query_params, sort_key,
+                                          sort_order, fields, limit, offset)
+        with self._lock:
+            cursor = self.connection.execute(sql, params)
+        return self._iter_rows(cursor, fields)
+
+    def _iter_rows(self, cursor, fields):
+        """Yields the entities of the cursor, fetching FETCH_SIZE rows at a time"""
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                return
+            for entity_id, document in rows:
+                yield self._to_entity(entity_id, document, fields)
+
+    def delete(self, collection, entity_id):
+        self._check_collection(collection)
+        with self._write():
+            cursor = self.connection.execute(
+                'DELETE FROM "%s" WHERE id = ?' % collection, (entity_id, ))
+        if cursor.rowcount == 0:
+            raise EntityNotFound()
+        return True
+
+    def copy_from(self, driver):
+        """Copies all entities from another DALDriver in a single transaction
+
+        Parameters
+        ----------
+        driver : datmo.core.storage.driver.DALDriver
+            driver to read all of the entities from
+
+        Returns
+        -------
+        int
+            number of entities copied
+        """
+        count = 0
+        with self._write():
+            for collection in self.COLLECTIONS:
+                for item in driver.query(collection, {}):
+                    self._save(collection, item)
+                    count += 1
+        return count
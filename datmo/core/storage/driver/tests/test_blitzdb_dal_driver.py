@@ -3,6 +3,7 @@ Tests for blitzdb_dal_driver.py
 """
 
 import os
+import shutil
 import tempfile
 import datetime
 import platform
@@ -107,6 +108,23 @@ class TestBlitzDBDALDriver():
         assert result.get('id') == result2.get('id')
         assert result2.get('foo') == "bar_3"
 
+    def test_db_set_returns_written_document(self):
+        collection = 'code'
+        test_obj = {"foo": "bar_4", "nested": {"a": [1, 2]}}
+        result = self.database.set(collection, test_obj)
+        assert result == self.database.get(collection, result.get('id'))
+
+    def test_db_set_many(self):
+        collection = 'task'
+        results = self.database.set_many(collection, [{
+            "set_many": 1
+        }, {
+            "set_many": 2
+        }])
+        assert [result['set_many'] for result in results] == [1, 2]
+        for result in results:
+            assert result == self.database.get(collection, result['id'])
+
     def test_db_query(self):
         test_obj = {"foo": "bar"}
         results = self.database.query(self.collection, test_obj)
@@ -612,3 +630,268 @@ class TestBlitzDBDALDriver():
         items = self.database.query("snapshot", {"key": "there"})
         assert len(items) == 1
         assert items[0] == current_item
+
+class TestBlitzDBDALDriverReload():
+    """
+    Checks BlitzDBDALDriver only reloads collections changed on disk
+    """
+
+    def setup_class(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.collection = 'snapshot'
+        self.database = BlitzDBDALDriver("file", self.temp_dir)
+
+    def teardown_class(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_no_reload_with_unchanged_generation(self):
+        target_id = self.database.set(self.collection, {
+            "model_id": "target"
+        })['id']
+        # Count the reloads of the collection from disk
+        reloads = []
+        load_config = self.database.backend.load_config
+
+        def count_load_config(*args, **kwargs):
+            reloads.append(True)
+            return load_config(*args, **kwargs)
+
+        self.database.backend.load_config = count_load_config
+        try:
+            for _ in range(5):
+                self.database.query(self.collection, {"model_id": "target"})
+                self.database.exists(self.collection, target_id)
+            assert reloads == []
+            # Writes of the driver itself do not change the generation it read
+            self.database.set(self.collection, {"model_id": "model_0"})
+            self.database.query(self.collection, {"model_id": "target"})
+            assert reloads == []
+            # Writes of another driver do, once
+            database_2 = BlitzDBDALDriver("file", self.temp_dir)
+            database_2.set(self.collection, {"model_id": "model_0"})
+            self.database.query(self.collection, {"model_id": "target"})
+            self.database.exists(self.collection, target_id)
+            assert len(reloads) == 1
+        finally:
+            self.database.backend.load_config = load_config
+
+    def test_reload_after_write_from_other_driver(self):
+        database_2 = BlitzDBDALDriver("file", self.temp_dir)
+        before = len(self.database.query(self.collection, {}))
+        result = database_2.set(self.collection, {"model_id": "model_0"})
+        assert self.database.exists(self.collection, result['id'])
+        assert len(self.database.query(self.collection, {})) == before + 1
+        # Deletes from other drivers are picked up as well
+        database_2.delete(self.collection, result['id'])
+        assert not self.database.exists(self.collection, result['id'])
+
+class TestBlitzDBDALDriverIndexes():
+    """
+    Checks the declared persistent indexes of BlitzDBDALDriver
+    """
+
+    def setup_class(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.database = BlitzDBDALDriver("file", self.temp_dir)
+
+    def teardown_class(self):
+        pass
+
+    def test_indexes_created(self):
+        for collection, fields in BlitzDBDALDriver.INDEXED_FIELDS.items():
+            indexes = self.database.backend.get_collection_indexes(collection)
+            for field in fields:
+                assert field in indexes
+                assert not indexes[field].ephemeral
+
+    def test_indexes_persisted(self):
+        result = self.database.set("file_collection", {"filehash": "hash_1"})
+        database_2 = BlitzDBDALDriver("file", self.temp_dir)
+        index = database_2.backend.get_collection_indexes(
+            "file_collection")["filehash"]
+        assert index.loaded
+        assert index.get_keys_for("hash_1")
+        results = database_2.query("file_collection", {"filehash": "hash_1"})
+        assert len(results) == 1
+        assert results[0]['id'] == result['id']
+
+    def test_indexes_maintained_on_update_and_delete(self):
+        result = self.database.set("environment", {"unique_hash": "hash_2"})
+        result['unique_hash'] = "hash_3"
+        self.database.set("environment", result)
+        assert not self.database.query("environment",
+                                       {"unique_hash": "hash_2"})
+        assert len(
+            self.database.query("environment", {"unique_hash": "hash_3"})) == 1
+        self.database.delete("environment", result['id'])
+        assert not self.database.query("environment",
+                                       {"unique_hash": "hash_3"})
+        # Ensure the persisted index reflects the delete as well
+        database_2 = BlitzDBDALDriver("file", self.temp_dir)
+        assert not database_2.query("environment", {"unique_hash": "hash_3"})
+
+class TestBlitzDBDALDriverTransaction():
+    """
+    Checks transactions of BlitzDBDALDriver
+    """
+
+    def setup_method(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.database = BlitzDBDALDriver("file", self.temp_dir)
+
+    def test_transaction_commit(self):
+        existing = self.database.set("snapshot", {"model_id": "model"})
+        with self.database.transaction():
+            task = self.database.set("task", {"model_id": "model"})
+            snapshot = self.database.set("snapshot", {
+                "model_id": "model",
+                "task_id": task['id']
+            })
+            self.database.delete("snapshot", existing['id'])
+            # writes are visible to reads within the transaction
+            assert self.database.get("task", task['id']) == task
+            assert self.database.exists("snapshot", snapshot['id'])
+            assert not self.database.exists("snapshot", existing['id'])
+            assert self.database.query("snapshot",
+                                       {"model_id": "model"}) == [snapshot]
+            assert self.database.get_by_shortened_id(
+                "task", task['id'][:10]) == task
+            # writes are not committed until the transaction exits
+            database_2 = BlitzDBDALDriver("file", self.temp_dir)
+            assert not database_2.exists("task", task['id'])
+        database_2 = BlitzDBDALDriver("file", self.temp_dir)
+        assert database_2.get("task", task['id']) == task
+        assert database_2.query("snapshot",
+                                {"model_id": "model"}) == [snapshot]
+
+    def test_transaction_rollback(self):
+        existing = self.database.set("snapshot", {"model_id": "model"})
+        failed = False
+        try:
+            with self.database.transaction():
+                self.database.set("task", {"model_id": "model"})
+                self.database.delete("snapshot", existing['id'])
+                raise ValueError()
+        except ValueError:
+            failed = True
+        assert failed
+        assert self.database.query("task", {}) == []
+        assert self.database.exists("snapshot", existing['id'])
+        database_2 = BlitzDBDALDriver("file", self.temp_dir)
+        assert database_2.query("task", {}) == []
+
+    def test_transaction_query_sort(self):
+        self.database.set("task", {"model_id": "model", "sort": 2})
+        with self.database.transaction():
+            self.database.set("task", {"model_id": "model", "sort": 1})
+            self.database.set("task", {"model_id": "model", "sort": 3})
+            self.database.set("task", {"model_id": "other", "sort": 4})
+            items = self.database.query(
+                "task", {"model_id": "model"},
+                sort_key="sort",
+                sort_order="descending")
+            assert [item['sort'] for item in items] == [3, 2, 1]
+            items = self.database.query("task", {"sort": {"$gte": 2}})
+            assert sorted(item['sort'] for item in items) == [2, 3, 4]
+
+class TestBlitzDBDALDriverProjection():
+    """
+    Checks projected and streamed queries of BlitzDBDALDriver
+    """
+
+    def setup_class(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.database = BlitzDBDALDriver("file", self.temp_dir)
+        for i in range(3):
+            self.database.set(
+                "task", {
+                    "model_id": "model",
+                    "command": "python test.py",
+                    "logs": "log line\n" * 100,
+                    "results": None,
+                    "created_at": datetime.datetime(2017, 1, i + 1)
+                })
+
+    def test_query_fields(self):
+        items = self.database.query(
+            "task", {"model_id": "model"},
+            sort_key="created_at",
+            sort_order="ascending",
+            fields=["model_id", "created_at", "results"])
+        assert len(items) == 3
+        for i, item in enumerate(items):
+            assert set(item) == set(["id", "model_id", "created_at"])
+            assert item['created_at'] == datetime.datetime(2017, 1, i + 1)
+
+    def test_query_iter(self):
+        items = self.database.query_iter(
+            "task", {"model_id": "model"},
+            sort_key="created_at",
+            sort_order="descending",
+            fields=["command"])
+        assert not isinstance(items, list)
+        items = list(items)
+        assert items == [
+            item for item in self.database.query(
+                "task", {"model_id": "model"},
+                sort_key="created_at",
+                sort_order="descending",
+                fields=["command"])
+        ]
+        assert [set(item) for item in items] == [set(["id", "command"])] * 3
+        # errors are raised before iterating
+        failed = False
+        try:
+            self.database.query_iter("task", {}, sort_key="created_at")
+        except RequiredArgumentMissing:
+            failed = True
+        assert failed
+
+    def test_query_limit_offset(self):
+        items = self.database.query(
+            "task", {"model_id": "model"},
+            sort_key="created_at",
+            sort_order="descending",
+            limit=1)
+        assert len(items) == 1
+        assert items[0]['created_at'] == datetime.datetime(2017, 1, 3)
+        items = list(
+            self.database.query_iter(
+                "task", {"model_id": "model"},
+                sort_key="created_at",
+                sort_order="ascending",
+                fields=["created_at"],
+                limit=5,
+                offset=1))
+        assert [item['created_at'] for item in items] == [
+            datetime.datetime(2017, 1, 2),
+            datetime.datetime(2017, 1, 3)
+        ]
+        assert self.database.query(
+            "task", {"model_id": "model"}, offset=3) == []
+        failed = False
+        try:
+            self.database.query("task", {}, limit=-1)
+        except InvalidArgumentType:
+            failed = True
+        assert failed
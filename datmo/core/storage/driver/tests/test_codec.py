@@ -0,0 +1,99 @@
+"""
+Tests for codec.py
+"""
+
+import time
+from datetime import datetime
+
+from datmo.core.storage.driver.codec import (
+    DATETIME_FORMAT, encode_datetime, decode_datetime, normalize_entity,
+    denormalize_entity)
+from datmo.core.util.exceptions import IncorrectType
+
+class TestCodec():
+    def test_encode_decode_datetime(self):
+        for value in [
+                datetime(2017, 1, 1),
+                datetime(2018, 12, 31, 23, 59, 59, 999999),
+                datetime(2018, 6, 5, 4, 3, 2, 10)
+        ]:
+            encoded = encode_datetime(value)
+            assert encoded == value.strftime(DATETIME_FORMAT)
+            assert decode_datetime(encoded) == value
+            assert datetime.strptime(encoded, DATETIME_FORMAT) == value
+
+    def test_encoded_datetimes_sort(self):
+        values = [
+            datetime(2017, 1, 1, 0, 0, 0, 10),
+            datetime(2017, 1, 1, 0, 0, 0, 9),
+            datetime(2016, 12, 31)
+        ]
+        assert sorted(encode_datetime(value) for value in values) == \
+               [encode_datetime(value) for value in sorted(values)]
+
+    def test_normalize_denormalize_entity(self):
+        entity = {
+            "id": "entity_id",
+            "created_at": datetime(2017, 1, 1, 10, 5, 1, 10),
+            "updated_at": datetime(2017, 1, 2),
+            "start_time": datetime(2017, 1, 3),
+            "end_time": None,
+            "config": {
+                "a": 1
+            }
+        }
+        document = denormalize_entity(entity)
+        assert document == {
+            "pk": "entity_id",
+            "created_at": "2017-01-01T10:05:01.000010Z",
+            "updated_at": "2017-01-02T00:00:00.000000Z",
+            "start_time": "2017-01-03T00:00:00.000000Z",
+            "end_time": None,
+            "config": {
+                "a": 1
+            }
+        }
+        assert normalize_entity(document) == entity
+        # inputs are not modified
+        assert "id" in entity and "pk" in document
+
+    def test_denormalize_entity_incorrect_type(self):
+        for key in ["created_at", "start_time"]:
+            failed = False
+            try:
+                denormalize_entity({key: "2017-01-01T00:00:00.000000Z"})
+            except IncorrectType:
+                failed = True
+            assert failed
+
+    def test_decode_datetime_throughput(self):
+        values = [
+            encode_datetime(datetime(2017, 1, 1, 0, 0, i % 60, i))
+            for i in range(20000)
+        ]
+        start = time.time()
+        for value in values:
+            datetime.strptime(value, DATETIME_FORMAT)
+        strptime_duration = time.time() - start
+        start = time.time()
+        for value in values:
+            decode_datetime(value)
+        decode_duration = time.time() - start
+        assert decode_duration < strptime_duration
+
+    def test_normalize_entity_throughput(self):
+        documents = [
+            denormalize_entity({
+                "id": str(i),
+                "created_at": datetime(2017, 1, 1, 0, 0, 0, i),
+                "updated_at": datetime(2017, 1, 1, 0, 0, 0, i),
+                "start_time": datetime(2017, 1, 1, 0, 0, 0, i),
+                "end_time": None
+            }) for i in range(5000)
+        ]
+        start = time.time()
+        for document in documents:
+            normalize_entity(document)
+        duration = time.time() - start
+        # 5k snapshots listed in well under a second
+        assert duration < 0.5
@@ -0,0 +1,416 @@
+"""
+Tests for sqlite_dal_driver.py
+"""
+
+import os
+import tempfile
+import datetime
+import platform
+
+from datmo.core.storage.driver.blitzdb_dal_driver import BlitzDBDALDriver
+from datmo.core.storage.driver.sqlite_dal_driver import SQLiteDALDriver
+from datmo.core.util.exceptions import EntityNotFound, EntityCollectionNotFound, \
+    InvalidArgumentType, RequiredArgumentMissing, MoreThanOneEntityFound
+from datmo.core.util.misc_functions import create_unique_hash
+
+class TestSQLiteDALDriver():
+    """
+    Checks all functions of SQLiteDALDriver
+    """
+
+    def setup_class(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.collection = 'model'
+        self.database = SQLiteDALDriver(self.temp_dir)
+
+    def teardown_class(self):
+        pass
+
+    def test_init(self):
+        assert self.database != None
+        assert os.path.isfile(
+            os.path.join(self.temp_dir, SQLiteDALDriver.DATABASE_FILENAME))
+        journal_mode = self.database.connection.execute(
+            "PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode == "wal"
+
+    def test_connection_shared(self):
+        database_2 = SQLiteDALDriver(self.temp_dir)
+        assert database_2.connection is self.database.connection
+
+    def test_indexes_created(self):
+        for collection, fields in SQLiteDALDriver.INDEXED_FIELDS.items():
+            index_names = [
+                row[1] for row in self.database.connection.execute(
+                    'PRAGMA index_list("%s")' % collection)
+            ]
+            for field in fields:
+                assert "%s_%s" % (collection, field) in index_names
+
+    def test_db_set_get_update(self):
+        result = self.database.set(self.collection, {"foo": "bar_0"})
+        assert result.get('id') != None
+        assert result.get('foo') == "bar_0"
+        result_1 = self.database.get(self.collection, result.get('id'))
+        assert result_1 == result
+        result_2 = self.database.set(self.collection, {
+            "id": result.get('id'),
+            "foo": "bar_1"
+        })
+        assert result_2.get('id') == result.get('id')
+        assert self.database.get(self.collection,
+                                 result.get('id'))['foo'] == "bar_1"
+
+    def test_db_set_many(self):
+        results = self.database.set_many('task', [{
+            "set_many": 1
+        }, {
+            "set_many": 2
+        }])
+        assert [result['set_many'] for result in results] == [1, 2]
+        for result in results:
+            assert result == self.database.get('task', result['id'])
+
+    def test_db_set_datetime(self):
+        created_at = datetime.datetime(2017, 1, 1, 10, 5, 1, 10)
+        result = self.database.set('task', {
+            "model_id": "model_datetime",
+            "created_at": created_at
+        })
+        assert result['created_at'] == created_at
+        result = self.database.get('task', result['id'])
+        assert result['created_at'] == created_at
+        items = self.database.query('task', {"model_id": "model_datetime"})
+        assert len(items) == 1
+
+    def test_db_get_by_shortened_id(self):
+        result = self.database.set(self.collection, {"foo": "bar_2"})
+        result_2 = self.database.get_by_shortened_id(self.collection,
+                                                     result.get('id')[:10])
+        assert result_2.get('id') == result.get('id')
+        self.database.set(self.collection, {"id": "shortened_1"})
+        self.database.set(self.collection, {"id": "shortened_2"})
+        failed = False
+        try:
+            self.database.get_by_shortened_id(self.collection, "shortened")
+        except MoreThanOneEntityFound:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            self.database.get_by_shortened_id(self.collection, "not_found")
+        except EntityNotFound:
+            failed = True
+        assert failed
+
+    def test_db_exists_and_delete(self):
+        result = self.database.set(self.collection, {"name": "delete_me"})
+        assert self.database.exists(self.collection, result.get('id'))
+        assert not self.database.exists(self.collection, 'not_found')
+        assert self.database.delete(self.collection, result.get('id'))
+        assert not self.database.exists(self.collection, result.get('id'))
+        failed = False
+        try:
+            self.database.get(self.collection, result.get('id'))
+        except EntityNotFound:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            self.database.delete(self.collection, result.get('id'))
+        except EntityNotFound:
+            failed = True
+        assert failed
+
+    def test_unknown_collection(self):
+        failed = False
+        try:
+            self.database.set(self.collection + '_2', {"car": "baz"})
+        except EntityCollectionNotFound:
+            failed = True
+        assert failed
+
+    def test_db_query(self):
+        collection = 'snapshot'
+        self.database.set(collection, {
+            "model_id": "model_query",
+            "visible": True,
+            "config": {
+                "a": 1,
+                "b": [1, 2]
+            },
+            "random_id": create_unique_hash(),
+            "range_query": 1
+        })
+        self.database.set(collection, {
+            "model_id": "model_query",
+            "visible": False,
+            "config": {
+                "a": 2
+            },
+            "range_query": 2
+        })
+        # indexed columns and json document fields
+        assert len(
+            self.database.query(collection, {"model_id": "model_query"})) == 2
+        assert len(
+            self.database.query(collection, {
+                "model_id": "model_query",
+                "visible": True
+            })) == 1
+        assert len(
+            self.database.query(collection, {"config": {
+                "b": [1, 2],
+                "a": 1
+            }})) == 1
+        assert len(self.database.query(collection, {"config.a": 2})) == 1
+        # operators
+        assert len(
+            self.database.query(collection, {"range_query": {
+                "$gte": 1
+            }})) == 2
+        assert len(
+            self.database.query(collection, {"range_query": {
+                "$gt": 1
+            }})) == 1
+        assert len(
+            self.database.query(collection, {"range_query": {
+                "$in": [2, 3]
+            }})) == 1
+        items = self.database.query(collection, {"random_id": {"$exists": True}})
+        assert len(items) == 1
+        assert len(
+            self.database.query(collection, {
+                "random_id": {
+                    "$regex": items[0]['random_id'][:10]
+                }
+            })) == 1
+
+    def test_db_query_datetime(self):
+        collection = 'task'
+        for month in [1, 2, 3]:
+            self.database.set(collection, {
+                "model_id": "model_query_datetime",
+                "created_at": datetime.datetime(2017, month, 1),
+                "start_time": datetime.datetime(2017, month, 1, 10)
+            })
+        # Datetimes are compared as they are stored, for indexed fields and
+        # fields in the document
+        items = self.database.query(collection, {
+            "model_id": "model_query_datetime",
+            "created_at": {
+                "$gte": datetime.datetime(2017, 2, 1)
+            }
+        })
+        assert sorted(item['created_at'].month
+                      for item in items) == [2, 3]
+        items = self.database.query(collection, {
+            "model_id": "model_query_datetime",
+            "start_time": {
+                "$lt": datetime.datetime(2017, 2, 1, 10)
+            }
+        })
+        assert [item['start_time'].month for item in items] == [1]
+        items = self.database.query(collection, {
+            "model_id": "model_query_datetime",
+            "created_at": datetime.datetime(2017, 3, 1)
+        })
+        assert [item['created_at'].month for item in items] == [3]
+        items = self.database.query(collection, {
+            "model_id": "model_query_datetime",
+            "created_at": {
+                "$in": [
+                    datetime.datetime(2017, 1, 1),
+                    datetime.datetime(2017, 2, 1)
+                ]
+            }
+        })
+        assert sorted(item['created_at'].month
+                      for item in items) == [1, 2]
+
+    def test_db_query_sort(self):
+        collection = 'task'
+        for created_at in [2, 3, 1]:
+            self.database.set(collection, {
+                "model_id": "model_sort",
+                "created_at": datetime.datetime(2017, created_at, 1)
+            })
+        items = self.database.query(
+            collection, {"model_id": "model_sort"},
+            sort_key="created_at",
+            sort_order="ascending")
+        assert [item['created_at'].month for item in items] == [1, 2, 3]
+        items = self.database.query(
+            collection, {"model_id": "model_sort"},
+            sort_key="created_at",
+            sort_order="descending")
+        assert [item['created_at'].month for item in items] == [3, 2, 1]
+
+        failed = False
+        try:
+            self.database.query(
+                collection, {"model_id": "model_sort"},
+                sort_key="created_at")
+        except RequiredArgumentMissing:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            self.database.query(
+                collection, {"model_id": "model_sort"},
+                sort_key="created_at",
+                sort_order="wrong_order")
+        except InvalidArgumentType:
+            failed = True
+        assert failed
+
+    def test_set_update_key_to_same_value(self):
+        self.database.set("snapshot", {"id": 1, "key": "hello"})
+        self.database.set("snapshot", {"id": 2, "key": "there"})
+        next_item = self.database.query("snapshot", {"key": "there"})[0]
+        current_item = self.database.query("snapshot", {"key": "hello"})[0]
+        current_item['key'] = next_item['key']
+        self.database.set("snapshot", current_item)
+        next_item['key'] = "hello"
+        self.database.set("snapshot", next_item)
+
+        items = self.database.query("snapshot", {"key": "hello"})
+        assert len(items) == 1
+        assert items[0] == next_item
+        items = self.database.query("snapshot", {"key": "there"})
+        assert len(items) == 1
+        assert items[0] == current_item
+
+    def test_reconnect_after_database_removed(self):
+        temp_dir = tempfile.mkdtemp(dir=self.temp_dir)
+        database = SQLiteDALDriver(temp_dir)
+        database.set(self.collection, {"foo": "bar"})
+        for filename in os.listdir(temp_dir):
+            os.remove(os.path.join(temp_dir, filename))
+        database_2 = SQLiteDALDriver(temp_dir)
+        assert database_2.query(self.collection, {}) == []
+
+    def test_copy_from(self):
+        blitzdb_dir = tempfile.mkdtemp(dir=self.temp_dir)
+        blitzdb_database = BlitzDBDALDriver("file", blitzdb_dir)
+        model = blitzdb_database.set('model', {"name": "copied"})
+        snapshot = blitzdb_database.set(
+            'snapshot', {
+                "model_id": model['id'],
+                "created_at": datetime.datetime.utcnow(),
+                "config": {
+                    "a": 1
+                }
+            })
+
+        database = SQLiteDALDriver(tempfile.mkdtemp(dir=self.temp_dir))
+        assert database.copy_from(blitzdb_database) == 2
+        assert database.get('model', model['id']) == model
+        assert database.get('snapshot', snapshot['id']) == snapshot
+        assert database.query('snapshot', {"model_id": model['id']}) == \
+               [snapshot]
+
+    def test_transaction(self):
+        database = SQLiteDALDriver(tempfile.mkdtemp(dir=self.temp_dir))
+        existing = database.set('snapshot', {"model_id": "model"})
+        with database.transaction():
+            task = database.set('task', {"model_id": "model"})
+            database.delete('snapshot', existing['id'])
+            # writes of other drivers of the process are part of the transaction
+            with SQLiteDALDriver(database.connection_string).transaction():
+                database.set('task', {"model_id": "model"})
+            assert database.get('task', task['id']) == task
+            assert database.connection.in_transaction
+        assert not database.connection.in_transaction
+        assert len(database.query('task', {"model_id": "model"})) == 2
+        assert not database.exists('snapshot', existing['id'])
+
+        failed = False
+        try:
+            with database.transaction():
+                database.set('task', {"model_id": "rollback"})
+                database.delete('task', task['id'])
+                raise ValueError()
+        except ValueError:
+            failed = True
+        assert failed
+        assert database.query('task', {"model_id": "rollback"}) == []
+        assert database.exists('task', task['id'])
+
+    def test_query_fields_and_iter(self):
+        database = SQLiteDALDriver(tempfile.mkdtemp(dir=self.temp_dir))
+        for i in range(3):
+            database.set(
+                'snapshot', {
+                    "model_id": "model",
+                    "visible": True,
+                    "config": {
+                        "i": i
+                    },
+                    "message": None,
+                    "stats": "x" * 100,
+                    "created_at": datetime.datetime(2017, 1, i + 1)
+                })
+        items = database.query(
+            'snapshot', {"model_id": "model"},
+            sort_key="created_at",
+            sort_order="ascending",
+            fields=["visible", "config", "message", "created_at"])
+        assert [item['config'] for item in items] == [{
+            "i": 0
+        }, {
+            "i": 1
+        }, {
+            "i": 2
+        }]
+        for i, item in enumerate(items):
+            assert set(item) == set(["id", "visible", "config", "created_at"])
+            assert item['visible'] is True
+            assert item['created_at'] == datetime.datetime(2017, 1, i + 1)
+
+        items = database.query_iter(
+            'snapshot', {"model_id": "model"},
+            sort_key="created_at",
+            sort_order="descending",
+            fields=["config"])
+        assert not isinstance(items, list)
+        assert [item['config']['i'] for item in items] == [2, 1, 0]
+        assert list(database.query_iter('snapshot', {})) == \
+               database.query('snapshot', {})
+
+    def test_query_limit_offset(self):
+        database = SQLiteDALDriver(tempfile.mkdtemp(dir=self.temp_dir))
+        for i in range(3):
+            database.set('task', {
+                "model_id": "model",
+                "created_at": datetime.datetime(2017, 1, i + 1)
+            })
+        items = database.query(
+            'task', {"model_id": "model"},
+            sort_key="created_at",
+            sort_order="descending",
+            limit=1)
+        assert [item['created_at'] for item in items] == \
+               [datetime.datetime(2017, 1, 3)]
+        items = database.query_iter(
+            'task', {},
+            sort_key="created_at",
+            sort_order="ascending",
+            fields=["created_at"],
+            offset=1)
+        assert [item['created_at'] for item in items] == [
+            datetime.datetime(2017, 1, 2),
+            datetime.datetime(2017, 1, 3)
+        ]
+        assert database.query('task', {}, limit=0) == []
+        failed = False
+        try:
+            database.query('task', {}, offset="1")
+        except InvalidArgumentType:
+            failed = True
+        assert failed
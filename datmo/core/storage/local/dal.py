@@ -1,6 +1,7 @@
 import os
 from kids.cache import cache
 from datetime import datetime
+from contextlib import contextmanager
 
 from datmo.core.util.i18n import get as __
 from datmo.core.entity.model import Model
@@ -13,6 +14,41 @@ from datmo.core.entity.user import User
 from datmo.core.util.exceptions import InputError, EntityNotFound, MoreThanOneEntityFound, DALNotInitialized
 from datmo.core.util.misc_functions import create_unique_hash
 from datmo.core.storage.driver.blitzdb_dal_driver import BlitzDBDALDriver
+from datmo.core.storage.driver.sqlite_dal_driver import SQLiteDALDriver
+
+# Drivers shared by all LocalDAL objects of the process with the same options, so
+# controllers see the writes of each other and share transactions
+_drivers = {}
+
+def get_driver(driver_type, driver_options):
+    """Returns the driver of the process for the given options, creating it if needed
+
+    Parameters
+    ----------
+    driver_type : str
+        type of driver to pull from
+    driver_options : dict
+        options for the DALdriver class
+
+    Returns
+    -------
+    datmo.core.storage.driver.DALDriver or None
+        shared driver, None if the driver type is not supported
+    """
+    key = (driver_type, tuple(sorted(driver_options.items())))
+    if key not in _drivers:
+        if driver_type == "blitzdb":
+            _drivers[key] = BlitzDBDALDriver(**driver_options)
+        elif driver_type == "sqlite":
+            _drivers[key] = SQLiteDALDriver(**driver_options)
+        else:
+            return None
+    return _drivers[key]
+
+def discard_driver(driver_type, driver_options):
+    """Discards the shared driver for the given options if any, e.g. once its
+    database has been removed"""
+    _drivers.pop((driver_type, tuple(sorted(driver_options.items()))), None)
 
 class LocalDAL():
     """
@@ -47,6 +83,8 @@ class LocalDAL():
     -------
     init()
         initialize the dal
+    transaction()
+        context manager to commit all writes within it at once
 
     """
 
@@ -62,9 +100,10 @@ class LocalDAL():
             self._is_initialized = True
             # set the driver so it is available
             if not self.driver:
-                if self.driver_type == "blitzdb":
-                    self.driver = BlitzDBDALDriver(**self.driver_options)
+                self.driver = get_driver(self.driver_type,
+                                         self.driver_options)
             return self._is_initialized
+        discard_driver(self.driver_type, self.driver_options)
         self._is_initialized = False
         return self._is_initialized
 
@@ -192,8 +231,31 @@ class LocalDAL():
 
     def init(self):
         if not self.driver:
-            if self.driver_type == "blitzdb":
-                self.driver = BlitzDBDALDriver(**self.driver_options)
+            self.driver = get_driver(self.driver_type, self.driver_options)
+
+    @contextmanager
+    def transaction(self):
+        """Commits all writes of the entity methods within the context at once
+
+        Writes are committed when the outermost transaction exits and discarded
+        if an exception is raised within it. Reads within the transaction see
+        its writes. Other threads wait for the shared connection of the sqlite
+        driver until the transaction exits, so it only wraps the writes and not
+        the file system work they record
+
+        Yields
+        ------
+        LocalDAL
+            this dal
+
+        Raises
+        ------
+        DALNotInitialized
+        """
+        if not self.is_initialized:
+            raise DALNotInitialized()
+        with self.driver.transaction():
+            yield self
 
 class EntityMethodsCRUD(object):
     def __init__(self, collection, entity_class, driver):
@@ -211,6 +273,94 @@ class EntityMethodsCRUD(object):
         return self.entity_class(obj)
 
     def create(self, datmo_entity):
+        dict_obj = self._to_create_dictionary(datmo_entity)
+        response = self.driver.set(self.collection, dict_obj)
+        entity_instance = self.entity_class(response)
+        return entity_instance
+
+    def set_many(self, datmo_entities):
+        """Creates or overwrites multiple entities with a single write to the driver
+
+        Parameters
+        ----------
+        datmo_entities : list
+            entities or dictionaries of the entities to store
+
+        Returns
+        -------
+        list
+            list of the stored entities
+        """
+        dict_objs = [
+            self._to_create_dictionary(datmo_entity)
+            for datmo_entity in datmo_entities
+        ]
+        return [
+            self.entity_class(response)
+            for response in self.driver.set_many(self.collection, dict_objs)
+        ]
+
+    def update(self, datmo_entity):
+        dict_obj = self._to_update_dictionary(datmo_entity)
+        response = self.driver.set(self.collection, dict_obj)
+        entity_instance = self.entity_class(response)
+        return entity_instance
+
+    def update_many(self, datmo_entities):
+        """Updates multiple entities with a single write to the driver
+
+        Partial dictionaries are merged with the stored entities, which are all
+        fetched with one query
+
+        Parameters
+        ----------
+        datmo_entities : list
+            entities or partial dictionaries of the entities with their ids
+
+        Returns
+        -------
+        list
+            list of the updated entities
+
+        Raises
+        ------
+        InputError
+            if a dictionary does not have an id
+        EntityNotFound
+            if an entity to update does not exist
+        """
+        partial_ids = []
+        for datmo_entity in datmo_entities:
+            if not hasattr(datmo_entity, 'to_dictionary'):
+                if 'id' not in list(datmo_entity) or not datmo_entity['id']:
+                    raise InputError(__("error", "storage.local.dal.update"))
+                partial_ids.append(datmo_entity['id'])
+        original_entities = {}
+        if partial_ids:
+            original_entities = {
+                entity.id: entity
+                for entity in self.query({
+                    "id": {
+                        "$in": partial_ids
+                    }
+                })
+            }
+        dict_objs = []
+        for datmo_entity in datmo_entities:
+            original_datmo_entity = None
+            if not hasattr(datmo_entity, 'to_dictionary'):
+                if datmo_entity['id'] not in original_entities:
+                    raise EntityNotFound()
+                original_datmo_entity = original_entities[datmo_entity['id']]
+            dict_objs.append(
+                self._to_update_dictionary(datmo_entity,
+                                           original_datmo_entity))
+        return [
+            self.entity_class(response)
+            for response in self.driver.set_many(self.collection, dict_objs)
+        ]
+
+    def _to_create_dictionary(self, datmo_entity):
         # translate datmo_entity to a standard dictionary (document) to be stored
         if hasattr(datmo_entity, 'to_dictionary'):
             dict_obj = datmo_entity.to_dictionary()
@@ -222,11 +372,9 @@ class EntityMethodsCRUD(object):
         # dict_obj['id'] = create_unique_hash(base_hash=latest_entity['id'])
         dict_obj['id'] = dict_obj['id'] if 'id' in dict_obj.keys() and dict_obj['id'] else \
             create_unique_hash()
-        response = self.driver.set(self.collection, dict_obj)
-        entity_instance = self.entity_class(response)
-        return entity_instance
+        return dict_obj
 
-    def update(self, datmo_entity):
+    def _to_update_dictionary(self, datmo_entity, original_datmo_entity=None):
         # translate datmo_entity to a standard dictionary (document) to be stored
         if hasattr(datmo_entity, 'to_dictionary'):
             dict_obj = datmo_entity.to_dictionary()
@@ -235,7 +383,8 @@ class EntityMethodsCRUD(object):
                 raise InputError(__("error", "storage.local.dal.update"))
             # Aggregate original object and new object into dict_obj var
             new_dict_obj = datmo_entity
-            original_datmo_entity = self.get_by_id(datmo_entity['id'])
+            if original_datmo_entity is None:
+                original_datmo_entity = self.get_by_id(datmo_entity['id'])
             dict_obj = {}
             for key, value in original_datmo_entity.to_dictionary().items():
                 if key in list(new_dict_obj):
@@ -245,19 +394,79 @@ class EntityMethodsCRUD(object):
 
         # set updated_at always
         dict_obj['updated_at'] = datetime.utcnow()
-        response = self.driver.set(self.collection, dict_obj)
-        entity_instance = self.entity_class(response)
-        return entity_instance
+        return dict_obj
 
     def delete(self, entity_id):
         return self.driver.delete(self.collection, entity_id)
 
-    def query(self, query_params, sort_key=None, sort_order=None):
+    def query(self,
+              query_params,
+              sort_key=None,
+              sort_order=None,
+              fields=None,
+              limit=None,
+              offset=None):
+        """Returns the entities matching the query params
+
+        Parameters
+        ----------
+        query_params : dict
+            query dictionary for the driver
+        sort_key : str, optional
+            key to sort the entities on
+        sort_order : str, optional
+            either "ascending" or "descending", required with sort_key
+        fields : list, optional
+            names of the fields to load for each entity along with its id. the
+            other attributes of the entities take their default values, so the
+            required fields of the entity must be included
+            (default is None, which loads all of the fields)
+        limit : int, optional
+            maximum number of entities to return
+            (default is None, which returns all of the entities)
+        offset : int, optional
+            number of entities to skip, used with sort_key to page through them
+            (default is None, which skips none)
+
+        Returns
+        -------
+        list
+            list of entities
+        """
         return [
             self.entity_class(item) for item in self.driver.query(
-                self.collection, query_params, sort_key, sort_order)
+                self.collection,
+                query_params,
+                sort_key,
+                sort_order,
+                fields=fields,
+                limit=limit,
+                offset=offset)
         ]
 
+    def query_iter(self,
+                   query_params,
+                   sort_key=None,
+                   sort_order=None,
+                   fields=None,
+                   limit=None,
+                   offset=None):
+        """Same as query, but the entities are loaded one at a time while iterating
+
+        Returns
+        -------
+        iterator
+            iterator of entities
+        """
+        return (self.entity_class(item) for item in self.driver.query_iter(
+            self.collection,
+            query_params,
+            sort_key,
+            sort_order,
+            fields=fields,
+            limit=limit,
+            offset=offset))
+
     def findOne(self, query_params):
         results = self.query(query_params)
         if len(results) == 0:
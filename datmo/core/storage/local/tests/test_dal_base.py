@@ -7,6 +7,7 @@ import tempfile
 import platform
 
 from datmo.core.storage.driver.blitzdb_dal_driver import BlitzDBDALDriver
+from datmo.core.storage.driver.sqlite_dal_driver import SQLiteDALDriver
 from datmo.core.storage.local.dal import LocalDAL
 from datmo.core.util.exceptions import EntityNotFound, EntityCollectionNotFound
 
@@ -41,3 +42,38 @@ class TestLocalDAL():
         except EntityCollectionNotFound:
             exp_thrown = True
         assert exp_thrown
+
+    def test_init_sqlite(self):
+        dal = LocalDAL("sqlite", {"connection_string": self.temp_dir})
+        dal.init()
+        assert isinstance(dal.driver, SQLiteDALDriver)
+        model = dal.model.create({"name": "sqlite_model"})
+        assert dal.model.get_by_id(model.id).name == "sqlite_model"
+
+    def test_transaction(self):
+        dal = LocalDAL(self.driver_type, self.driver_options)
+        dal_2 = LocalDAL(self.driver_type, self.driver_options)
+        with dal.transaction():
+            model = dal.model.create({"name": "transaction_model"})
+            # all dals of the process share the driver and its transaction
+            snapshot = dal_2.snapshot.create({
+                "model_id": model.id,
+                "message": "transaction snapshot",
+                "code_id": "code_id",
+                "environment_id": "environment_id",
+                "file_collection_id": "file_collection_id",
+                "config": {},
+                "stats": {}
+            })
+            dal.snapshot.update({"id": snapshot.id, "label": "updated"})
+        assert dal.snapshot.get_by_id(snapshot.id).label == "updated"
+
+        failed = False
+        try:
+            with dal.transaction():
+                dal.snapshot.delete(snapshot.id)
+                raise ValueError()
+        except ValueError:
+            failed = True
+        assert failed
+        assert dal_2.snapshot.get_by_id(snapshot.id).label == "updated"
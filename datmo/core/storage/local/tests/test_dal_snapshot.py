@@ -116,6 +116,49 @@ class TestLocalDAL():
             'message']
         assert updated_snapshot.label == updated_snapshot_input_dict['label']
 
+    def test_set_many_snapshots(self):
+        snapshots = self.dal.snapshot.set_many([
+            Snapshot(self.snapshot_input_dict),
+            Snapshot(self.snapshot_input_dict)
+        ])
+
+        assert len(snapshots) == 2
+        assert snapshots[0].id != snapshots[1].id
+        for snapshot in snapshots:
+            assert self.dal.snapshot.get_by_id(snapshot.id) == snapshot
+
+    def test_update_many_snapshots(self):
+        snapshot_1 = self.dal.snapshot.create(
+            Snapshot(self.snapshot_input_dict))
+        snapshot_2 = self.dal.snapshot.create(
+            Snapshot(self.snapshot_input_dict))
+
+        # Update with a partial dictionary and a full entity
+        snapshot_2.label = "full"
+        updated_snapshots = self.dal.snapshot.update_many([{
+            "id": snapshot_1.id,
+            "label": "partial"
+        }, snapshot_2])
+
+        assert [snapshot.id for snapshot in updated_snapshots] == \
+               [snapshot_1.id, snapshot_2.id]
+        assert self.dal.snapshot.get_by_id(snapshot_1.id).label == "partial"
+        assert self.dal.snapshot.get_by_id(
+            snapshot_1.id).message == self.snapshot_input_dict['message']
+        assert self.dal.snapshot.get_by_id(snapshot_2.id).label == "full"
+        assert updated_snapshots[0].updated_at > snapshot_1.updated_at
+
+        # Updating an entity which does not exist fails
+        failed = False
+        try:
+            self.dal.snapshot.update_many([{
+                "id": "not_found",
+                "label": "partial"
+            }])
+        except EntityNotFound:
+            failed = True
+        assert failed
+
     def test_delete_snapshot(self):
         snapshot = self.dal.snapshot.create(Snapshot(self.snapshot_input_dict))
 
@@ -237,3 +237,36 @@ class TestLocalDAL():
         expected_ids = [item.id for item in expected_items]
         ids = [item.id for item in items]
         assert set(expected_ids) == set(ids)
+
+    def test_query_tasks_fields(self):
+        task_input_dict = self.task_input_dict.copy()
+        task_input_dict['logs'] = "log line\n" * 100
+        task = self.dal.task.create(Task(task_input_dict))
+
+        tasks = self.dal.task.query(
+            {
+                "id": task.id
+            }, fields=["model_id", "command"])
+        assert len(tasks) == 1
+        assert isinstance(tasks[0], Task)
+        assert tasks[0].id == task.id
+        assert tasks[0].command == task.command
+        assert tasks[0].logs is None
+
+        tasks = self.dal.task.query_iter(
+            {
+                "model_id": task.model_id
+            }, fields=["model_id", "duration"])
+        assert [task_obj.duration for task_obj in tasks] == [task.duration]
+
+    def test_query_tasks_limit_offset(self):
+        tasks = [
+            self.dal.task.create(Task(self.task_input_dict))
+            for _ in range(3)
+        ]
+        result = self.dal.task.query(
+            {}, sort_key="created_at", sort_order="descending", limit=1)
+        assert [task.id for task in result] == [tasks[-1].id]
+        result = self.dal.task.query_iter(
+            {}, sort_key="created_at", sort_order="ascending", offset=1)
+        assert [task.id for task in result] == [task.id for task in tasks[1:]]
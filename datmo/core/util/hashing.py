@@ -0,0 +1,226 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from datmo.core.util.i18n import get as __
+from datmo.core.util.exceptions import PathDoesNotExist, InvalidArgumentType
+
+# Size of the reads when hashing a file. hashlib releases the GIL while hashing
+# buffers this large, so files are hashed in parallel across threads
+BUFFER_SIZE = 1024 * 1024
+# Environment variable to set the number of threads used to hash files
+WORKERS_ENVIRONMENT_VARIABLE = "DATMO_HASH_WORKERS"
+# Hash algorithms for file contents, blake2b digests are 16 bytes so its ids are
+# as long as the md5 ids of projects created before algorithms were configurable
+ALGORITHMS = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "blake2b": lambda: hashlib.blake2b(digest_size=16)
+}
+# Algorithm for projects which do not set one in their config
+DEFAULT_ALGORITHM = "md5"
+# Algorithm saved in the config of new projects
+PROJECT_ALGORITHM = "blake2b"
+
+def get_hasher(algorithm=DEFAULT_ALGORITHM):
+    """Returns a new hash object for the algorithm
+
+    Parameters
+    ----------
+    algorithm : str, optional
+        name of the hash algorithm, one of ALGORITHMS
+        (default is DEFAULT_ALGORITHM)
+
+    Returns
+    -------
+    hash object
+        hashlib hash object with update and hexdigest methods
+
+    Raises
+    ------
+    InvalidArgumentType
+        if the algorithm is not supported
+    """
+    if algorithm not in ALGORITHMS:
+        raise InvalidArgumentType(
+            __("error", "util.hashing.get_hasher", algorithm))
+    return ALGORITHMS[algorithm]()
+
+def get_workers(workers=None):
+    """Returns the number of threads to hash files with
+
+    Parameters
+    ----------
+    workers : int, optional
+        number of threads, if not given it is read from the DATMO_HASH_WORKERS
+        environment variable and defaults to the number of cpus
+
+    Returns
+    -------
+    int
+        number of threads to hash files with
+
+    Raises
+    ------
+    InvalidArgumentType
+        if the number of threads is not a positive integer
+    """
+    if workers is None:
+        workers = os.environ.get(WORKERS_ENVIRONMENT_VARIABLE, None)
+    if workers is None:
+        return os.cpu_count() or 1
+    try:
+        workers = int(workers)
+    except (TypeError, ValueError):
+        raise InvalidArgumentType()
+    if workers < 1:
+        raise InvalidArgumentType()
+    return workers
+
+def get_filehash(absolute_filepath, algorithm=DEFAULT_ALGORITHM):
+    """Returns the hash of the contents of a file
+
+    Parameters
+    ----------
+    absolute_filepath : str
+        absolute path of the file to hash
+    algorithm : str, optional
+        name of the hash algorithm
+        (default is DEFAULT_ALGORITHM)
+
+    Returns
+    -------
+    str
+        hex digest of the file contents
+
+    Raises
+    ------
+    PathDoesNotExist
+        if the path is not a file
+    """
+    if not os.path.isfile(absolute_filepath):
+        raise PathDoesNotExist(
+            __("error", "util.misc_functions.get_filehash", absolute_filepath))
+    filehash = get_hasher(algorithm)
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(absolute_filepath, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            filehash.update(view[:size])
+    return filehash.hexdigest()
+
+def get_filehashes(absolute_filepaths,
+                   workers=None,
+                   algorithm=DEFAULT_ALGORITHM):
+    """Returns the hashes of the contents of files, hashing them in parallel
+
+    Parameters
+    ----------
+    absolute_filepaths : list
+        absolute paths of the files to hash
+    workers : int, optional
+        number of threads to hash the files with
+        (default is None, which uses get_workers)
+    algorithm : str, optional
+        name of the hash algorithm
+        (default is DEFAULT_ALGORITHM)
+
+    Returns
+    -------
+    list
+        hex digests of the file contents, in the same order as the filepaths
+
+    Raises
+    ------
+    PathDoesNotExist
+        if any of the paths is not a file
+    """
+    absolute_filepaths = list(absolute_filepaths)
+    # Fail on an unsupported algorithm before starting any threads
+    get_hasher(algorithm)
+    workers = min(get_workers(workers), len(absolute_filepaths))
+    if workers <= 1:
+        return [
+            get_filehash(filepath, algorithm=algorithm)
+            for filepath in absolute_filepaths
+        ]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(lambda filepath: get_filehash(filepath, algorithm),
+                         absolute_filepaths))
+
+def get_dirhash(absolute_dirpath, workers=None, algorithm=DEFAULT_ALGORITHM):
+    """Returns the hash of the contents of all of the files in a directory, hashing
+    them in parallel. It is the hash of the sorted hashes of the files, so it only
+    depends on the file contents and not on the filenames. With md5 it is the same
+    as checksumdir.dirhash
+
+    Parameters
+    ----------
+    absolute_dirpath : str
+        absolute path of the directory to hash
+    workers : int, optional
+        number of threads to hash the files with
+        (default is None, which uses get_workers)
+    algorithm : str, optional
+        name of the hash algorithm
+        (default is DEFAULT_ALGORITHM)
+
+    Returns
+    -------
+    str
+        hex digest for the directory
+
+    Raises
+    ------
+    PathDoesNotExist
+        if the path is not a directory
+    """
+    if not os.path.isdir(absolute_dirpath):
+        raise PathDoesNotExist(
+            __("error", "util.hashing.get_dirhash", absolute_dirpath))
+    absolute_filepaths = [
+        os.path.join(dirpath, filename)
+        for dirpath, _, filenames in os.walk(absolute_dirpath)
+        for filename in filenames
+    ]
+    # Broken links are hashed as empty files
+    empty_filehash = get_hasher(algorithm).hexdigest()
+    filehashes = [empty_filehash] * len(absolute_filepaths)
+    existing_idxs = [
+        idx for idx, filepath in enumerate(absolute_filepaths)
+        if os.path.isfile(filepath)
+    ]
+    existing_filehashes = get_filehashes(
+        [absolute_filepaths[idx] for idx in existing_idxs],
+        workers=workers,
+        algorithm=algorithm)
+    for idx, filehash in zip(existing_idxs, existing_filehashes):
+        filehashes[idx] = filehash
+    return get_dirhash_from_filehashes(filehashes, algorithm=algorithm)
+
+def get_dirhash_from_filehashes(filehashes, algorithm=DEFAULT_ALGORITHM):
+    """Returns the hash of a directory from the hashes of its files, as computed
+    by get_dirhash, without reading the directory
+
+    Parameters
+    ----------
+    filehashes : list
+        hex digests of the files in the directory, in any order
+    algorithm : str, optional
+        name of the hash algorithm the files were hashed with
+        (default is DEFAULT_ALGORITHM)
+
+    Returns
+    -------
+    str
+        hex digest for the directory
+    """
+    dirhash = get_hasher(algorithm)
+    for filehash in sorted(filehashes):
+        dirhash.update(filehash.encode("utf-8"))
+    return dirhash.hexdigest()
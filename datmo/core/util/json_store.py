@@ -38,15 +38,36 @@ class JSONStore():
         # keep file in memory until a write occurs
         self.in_memory_settings = False
 
+    @staticmethod
+    def dumps(dictionary):
+        """Return the contents of a file for the dictionary, as they are written"""
+        return json.dumps(
+            dictionary,
+            indent=4,
+            sort_keys=True,
+            separators=(',', ': '),
+            ensure_ascii=False)
+
+    @staticmethod
+    def loads(meta_data_string):
+        """Return the dictionary for the contents of a file, as they are read
+
+        Raises
+        ------
+        FileIOError
+            if the contents are not valid json
+        """
+        if not meta_data_string:
+            return {}
+        try:
+            output_dict = json.loads(meta_data_string)
+            return yaml.safe_load(json.dumps(output_dict))
+        except Exception as err:
+            raise FileIOError(err)
+
     def to_file(self, dictionary):
         with open(self.filepath, "wb") as outfile:
-            str_ = json.dumps(
-                dictionary,
-                indent=4,
-                sort_keys=True,
-                separators=(',', ': '),
-                ensure_ascii=False)
-            outfile.write(to_bytes(str_))
+            outfile.write(to_bytes(self.dumps(dictionary)))
         return
 
     def save(self, key, value):
@@ -58,13 +79,7 @@ class JSONStore():
             settings_dict = json.load(open(self.filepath, 'r'))
         settings_dict[key] = value
         with open(self.filepath, "wb") as outfile:
-            str_ = json.dumps(
-                settings_dict,
-                indent=4,
-                sort_keys=True,
-                separators=(',', ': '),
-                ensure_ascii=False)
-            outfile.write(to_bytes(str_))
+            outfile.write(to_bytes(self.dumps(settings_dict)))
         return
 
     def get(self, name):
@@ -93,13 +108,7 @@ class JSONStore():
             settings_dict = json.load(open(self.filepath, 'r'))
         settings_dict.pop(name, None)
         with open(self.filepath, "wb") as outfile:
-            str_ = json.dumps(
-                settings_dict,
-                indent=4,
-                sort_keys=True,
-                separators=(',', ': '),
-                ensure_ascii=False)
-            outfile.write(to_bytes(str_))
+            outfile.write(to_bytes(self.dumps(settings_dict)))
         return
 
     def to_dict(self):
@@ -107,12 +116,5 @@ class JSONStore():
         # reading json file
         if os.path.exists(self.filepath):
             with open(self.filepath) as data_file:
-                meta_data_string = data_file.read()
-            if not meta_data_string:
-                return {}
-            try:
-                output_dict = json.loads(meta_data_string)
-                output_dict = yaml.safe_load(json.dumps(output_dict))
-            except Exception as err:
-                raise FileIOError(err)
+                output_dict = self.loads(data_file.read())
         return output_dict
@@ -39,6 +39,24 @@ MESSAGES = {
             "Removed project {name} @ ({path}) ",
         "cli.project.cleanup.failure":
             "Failed to remove project {name} @ ({path}) ",
+        "cli.project.migrate":
+            "Migrating project database to {driver_type} @ ({path}) ",
+        "cli.project.migrate.success":
+            "Migrated {count} entities to the {driver_type} database",
+        "cli.project.migrate.failure":
+            "Failed to migrate project database to {driver_type}",
+        "cli.project.gc":
+            "Collecting garbage in project {name} @ ({path}) ",
+        "cli.project.gc.kind.dry_run":
+            "Would delete {count} {kind} ({size})",
+        "cli.project.gc.kind":
+            "Deleted {count} {kind} ({size})",
+        "cli.project.gc.dry_run":
+            "Would reclaim {size} in total",
+        "cli.project.gc.success":
+            "Reclaimed {size} in total",
+        "cli.project.gc.failure":
+            "Failed to collect garbage in project {name} @ ({path}) ",
         "cli.general.abort":
             u'\u274c' + "  Your changes have been aborted!",
         "cli.general.success":
@@ -96,6 +114,8 @@ MESSAGES = {
             "Deleting a run: %s",
         "cli.run.delete.success":
             "Deleted run: %s",
+        "cli.run.logs.none":
+            "No logs for the run: %s",
     },
     "warn": {
         "cli.general.internet":
@@ -166,12 +186,26 @@ MESSAGES = {
             "Error while stopping all runs",
         "cli.run.delete":
             "Error while deleting the run: %s",
+        "cli.run.logs":
+            "Error while reading the logs of the run: %s",
         "cli.snapshot.create.run.args":
             "Error due to passing excluded args while creating snapshot from run: %s",
         "cli.snapshot.checkout.failure":
             "Error while checking out to a snapshot due to unstaged changes",
         "util.misc_functions.get_filehash":
             "Filepath does not point to a valid file: %s",
+        "util.hashing.get_dirhash":
+            "Dirpath does not point to a valid directory: %s",
+        "util.hashing.get_hasher":
+            "Hash algorithm is not supported: %s",
+        "util.pack_store.get":
+            "Path %s does not exist in the pack store at %s",
+        "util.pack_store.open.mode":
+            "Files in a pack store can only be opened for read, not with mode: %s",
+        "util.pack_store.extract":
+            "Dirpath does not point to a valid directory: %s",
+        "util.pack_store.read":
+            "Pack store data is truncated for file: %s",
         "util.misc_functions.mutually_exclusive":
             "Mutually exclusive arguments passed: %s",
         "controller.code.driver.file.create_ref.no_commit":
@@ -200,6 +234,8 @@ MESSAGES = {
             "Remote access not configured for https or ssh: %s",
         "controller.code.driver.git.clone":
             "Error in git clone with url %s: %s",
+        "controller.code.driver.git.run":
+            "Error in git %s: %s",
         "controller.code.driver.git.add":
             "Error in git add for filepath %s: %s",
         "controller.code.driver.git.commit":
@@ -207,7 +243,7 @@ MESSAGES = {
         "controller.code.driver.git.branch":
             "Error in git branch with name %s: %s",
         "controller.code.driver.git.status":
-            "Error in git status",
+            "Error in git status: %s",
         "controller.code.driver.git.checkout":
             "Error in git checkout with name %s: %s",
         "controller.code.driver.git.stash_save":
@@ -352,6 +388,14 @@ MESSAGES = {
             "Required argument %s not present in input",
         "controller.project.status":
             "Project has not been initialized",
+        "controller.project.migrate":
+            "Project has not been initialized",
+        "controller.project.migrate.driver_type":
+            "Cannot migrate project database to driver type: %s",
+        "controller.project.migrate.failed":
+            "Failed to write the migrated project database: %s",
+        "controller.project.gc":
+            "Project has not been initialized",
         "controller.snapshot.__init__":
             "Project has not been initialized",
         "controller.snapshot.create.arg":
@@ -0,0 +1,322 @@
+import os
+import zlib
+import struct
+from bisect import bisect_right
+from itertools import chain
+from io import open
+
+from datmo.core.util.exceptions import FileIOError
+
+class LogStore():
+    """LogStore is an append-only store for the output logs of a task
+
+    Logs are split into chunks of at most CHUNK_SIZE bytes, which are compressed and
+    appended to the data file. The index file holds a fixed size record for each chunk
+    with its offset in the logs and in the data file, so the tail or any range of the
+    logs is read by decompressing only the chunks it spans. A chunk is only part of the
+    logs once its index record is written, so a chunk left partially written by an
+    interrupted write is ignored and overwritten by the next one.
+
+    Parameters
+    ----------
+    dirpath : str
+        path of the directory for the store, created on the first write
+
+    Attributes
+    ----------
+    dirpath : str
+        path of the directory for the store
+    size : int
+        number of bytes of logs in the store, including those not flushed yet
+
+    Methods
+    -------
+    append(data)
+        append logs to the store
+    append_file(filepath)
+        append the contents of a file to the store
+    flush()
+        write the logs buffered in memory to the store
+    read(start=0, end=None)
+        read a range of the logs
+    tail(lines=10)
+        read the last lines of the logs
+    iter_lines()
+        iterate over the lines of the logs
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    DATA_FILENAME = "chunks"
+    INDEX_FILENAME = "index"
+    # offset in the logs, offset in the data file, compressed length, length
+    INDEX_RECORD = struct.Struct("<QQII")
+
+    def __init__(self, dirpath):
+        self.dirpath = dirpath
+        self._data_filepath = os.path.join(dirpath, self.DATA_FILENAME)
+        self._index_filepath = os.path.join(dirpath, self.INDEX_FILENAME)
+        self._index = []
+        self._offsets = []
+        self._buffer = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    @staticmethod
+    def exists(dirpath):
+        """Returns True if there is a store at the directory path"""
+        return os.path.isfile(os.path.join(dirpath, LogStore.INDEX_FILENAME))
+
+    @property
+    def size(self):
+        self._load_index()
+        return self._flushed_size() + len(self._buffer)
+
+    def append(self, data):
+        """Append logs to the store. Logs are written in full chunks, call flush
+        to write the rest of them
+
+        Parameters
+        ----------
+        data : str or bytes
+            logs to append, strings are encoded as utf-8
+        """
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.CHUNK_SIZE:
+            self._write_chunk(bytes(self._buffer[:self.CHUNK_SIZE]))
+            del self._buffer[:self.CHUNK_SIZE]
+
+    def append_file(self, filepath):
+        """Append the contents of a file to the store, reading it one chunk
+        at a time
+
+        Parameters
+        ----------
+        filepath : str
+            path of the file to append
+
+        Raises
+        ------
+        FileIOError
+            if the file cannot be read
+        """
+        try:
+            with open(filepath, "rb") as f:
+                while True:
+                    data = f.read(self.CHUNK_SIZE)
+                    if not data:
+                        break
+                    self.append(data)
+        except (IOError, OSError) as e:
+            raise FileIOError(str(e))
+        self.flush()
+
+    def flush(self):
+        """Write the logs buffered in memory to the store as a chunk"""
+        if self._buffer:
+            self._write_chunk(bytes(self._buffer))
+            del self._buffer[:]
+
+    def read(self, start=0, end=None):
+        """Read a range of the logs
+
+        Parameters
+        ----------
+        start : int, optional
+            offset in bytes of the start of the range, negative to count from the end
+            (default is 0, the start of the logs)
+        end : int, optional
+            offset in bytes of the end of the range, negative to count from the end
+            (default is None, the end of the logs)
+
+        Returns
+        -------
+        str
+            logs in the range, bytes which are not valid utf-8 are replaced
+        """
+        size = self.size
+        start, end, _ = slice(start, end).indices(size)
+        if start >= end:
+            return ""
+        return self._read_bytes(start, end).decode("utf-8", "replace")
+
+    def tail(self, lines=10):
+        """Read the last lines of the logs, only decompressing the chunks at
+        the end of them
+
+        Parameters
+        ----------
+        lines : int, optional
+            number of lines to read
+            (default is 10)
+
+        Returns
+        -------
+        str
+            last lines of the logs
+        """
+        if lines <= 0:
+            return ""
+        self._load_index()
+        data = bytes(self._buffer)
+        chunk_idx = len(self._index)
+        # one more newline than lines is needed unless the logs start first
+        while data[:-1].count(b"\n") < lines and chunk_idx > 0:
+            chunk_idx -= 1
+            data = self._read_chunk(self._index[chunk_idx]) + data
+        return _get_last_lines(data, lines)
+
+    def iter_lines(self):
+        """Iterate over the lines of the logs, decompressing one chunk at a time
+
+        Yields
+        ------
+        str
+            line of the logs without the trailing newline
+        """
+        self._load_index()
+        partial_line = b""
+        chunks = (self._read_chunk(record) for record in list(self._index))
+        for data in chain(chunks, [bytes(self._buffer)]):
+            split_data = (partial_line + data).split(b"\n")
+            partial_line = split_data.pop()
+            for line in split_data:
+                yield line.decode("utf-8", "replace")
+        if partial_line:
+            yield partial_line.decode("utf-8", "replace")
+
+    def _flushed_size(self):
+        if not self._index:
+            return 0
+        offset, _, _, length = self._index[-1]
+        return offset + length
+
+    def _load_index(self):
+        """Read the index records written since the last time it was loaded"""
+        if not os.path.isfile(self._index_filepath):
+            return
+        record_size = self.INDEX_RECORD.size
+        with open(self._index_filepath, "rb") as f:
+            f.seek(len(self._index) * record_size)
+            data = f.read()
+        # a record left partially written by an interrupted write is dropped
+        for pos in range(0, len(data) - record_size + 1, record_size):
+            record = self.INDEX_RECORD.unpack_from(data, pos)
+            self._index.append(record)
+            self._offsets.append(record[0])
+
+    def _write_chunk(self, data):
+        self._load_index()
+        if not os.path.isdir(self.dirpath):
+            os.makedirs(self.dirpath)
+        compressed_data = zlib.compress(data)
+        if self._index:
+            _, data_offset, compressed_length, _ = self._index[-1]
+            data_offset += compressed_length
+        else:
+            data_offset = 0
+        record = (self._flushed_size(), data_offset, len(compressed_data),
+                  len(data))
+        mode = "r+b" if os.path.isfile(self._data_filepath) else "wb"
+        with open(self._data_filepath, mode) as f:
+            f.seek(data_offset)
+            f.write(compressed_data)
+            f.truncate()
+        with open(self._index_filepath, "ab") as f:
+            f.truncate(len(self._index) * self.INDEX_RECORD.size)
+            f.write(self.INDEX_RECORD.pack(*record))
+        self._index.append(record)
+        self._offsets.append(record[0])
+
+    def _read_chunk(self, record):
+        _, data_offset, compressed_length, _ = record
+        with open(self._data_filepath, "rb") as f:
+            f.seek(data_offset)
+            return zlib.decompress(f.read(compressed_length))
+
+    def _read_bytes(self, start, end):
+        flushed_size = self._flushed_size()
+        data = []
+        chunk_idx = max(bisect_right(self._offsets, start) - 1, 0)
+        while chunk_idx < len(self._index) and \
+                self._index[chunk_idx][0] < end:
+            offset = self._index[chunk_idx][0]
+            chunk = self._read_chunk(self._index[chunk_idx])
+            data.append(chunk[max(start - offset, 0):end - offset])
+            chunk_idx += 1
+        if end > flushed_size:
+            data.append(
+                bytes(self._buffer[max(start - flushed_size, 0):end -
+                                   flushed_size]))
+        return b"".join(data)
+
+class LogFile():
+    """LogFile reads the logs a running task writes to a plain file, with the same
+    read and tail methods as a LogStore, until they are appended to the store
+
+    Parameters
+    ----------
+    filepath : str
+        path of the file the logs are written to
+
+    Attributes
+    ----------
+    filepath : str
+        path of the file the logs are written to
+    size : int
+        number of bytes of logs in the file
+
+    Methods
+    -------
+    read(start=0, end=None)
+        read a range of the logs
+    tail(lines=10)
+        read the last lines of the logs
+    """
+
+    BLOCK_SIZE = LogStore.CHUNK_SIZE
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+    @property
+    def size(self):
+        return os.path.getsize(self.filepath)
+
+    def read(self, start=0, end=None):
+        """Read a range of the logs, see LogStore.read"""
+        with open(self.filepath, "rb") as f:
+            start, end, _ = slice(start, end).indices(
+                os.fstat(f.fileno()).st_size)
+            if start >= end:
+                return ""
+            f.seek(start)
+            return f.read(end - start).decode("utf-8", "replace")
+
+    def tail(self, lines=10):
+        """Read the last lines of the logs, only reading the blocks at the end of
+        the file, see LogStore.tail"""
+        if lines <= 0:
+            return ""
+        data = b""
+        with open(self.filepath, "rb") as f:
+            pos = os.fstat(f.fileno()).st_size
+            while data[:-1].count(b"\n") < lines and pos > 0:
+                block_size = min(self.BLOCK_SIZE, pos)
+                pos -= block_size
+                f.seek(pos)
+                data = f.read(block_size) + data
+        return _get_last_lines(data, lines)
+
+def _get_last_lines(data, lines):
+    """Return the last lines of the data, decoded as utf-8"""
+    split_data = data.split(b"\n")
+    if data.endswith(b"\n"):
+        split_data = split_data[:-1]
+        split_data[-1] += b"\n"
+    return b"\n".join(split_data[-lines:]).decode("utf-8", "replace")
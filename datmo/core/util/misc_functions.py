@@ -42,6 +42,10 @@ try:
     str
 except NameError:
     str = str
+try:
+    import fcntl
+except ImportError:  # not available on windows
+    fcntl = None
 
 from glob import glob
 
@@ -52,6 +56,9 @@ from datmo.core.util.exceptions import (
     EnvironmentConnectFailed, EnvironmentExecutionError,
     InvalidDestinationName, TooManyArgumentsFound)
 
+# ioctl request to share the data blocks of another file (linux btrfs and xfs)
+FICLONE = 0x40049409
+
 def bytes2human(n):
     # http://code.activestate.com/recipes/578019
     # >>> bytes2human(10000)
@@ -281,13 +288,92 @@ def format_table(data, padding=2):
             word.ljust(col_widths[idx]) for idx, word in enumerate(row)) + "\n"
     return table_str
 
-def list_all_filepaths(absolute_dirpath):
-    """Returns all filepaths within dir relative to dir root"""
-    return [
-        os.path.relpath(os.path.join(dirpath, file), absolute_dirpath)
-        for (dirpath, dirnames, filenames) in os.walk(absolute_dirpath)
-        for file in filenames
-    ]
+def list_all_filepaths(absolute_dirpath, ignore_specs=None):
+    """Returns all filepaths within dir relative to dir root
+
+    Parameters
+    ----------
+    absolute_dirpath : str
+        absolute path of the directory to list
+    ignore_specs : list, optional
+        pathspec.PathSpec objects for the paths to leave out. As with git, the
+        directories they match are not walked, so files within them are left
+        out even if a negated pattern matches them
+        (default is None, which lists all files)
+
+    Returns
+    -------
+    list
+        filepaths relative to the directory, symlinks to directories are
+        not followed
+    """
+    ignore_specs = ignore_specs or []
+    filepaths = []
+    relative_dirpaths = [""]
+    while relative_dirpaths:
+        relative_dirpath = relative_dirpaths.pop()
+        try:
+            entries = os.scandir(
+                os.path.join(absolute_dirpath, relative_dirpath))
+        except OSError:
+            # unreadable directories are skipped, the same as os.walk
+            continue
+        with entries:
+            for entry in entries:
+                relative_path = os.path.join(relative_dirpath, entry.name) \
+                    if relative_dirpath else entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if entry.is_symlink() or any(
+                            spec.match_file(relative_path + "/")
+                            for spec in ignore_specs):
+                        continue
+                    relative_dirpaths.append(relative_path)
+                elif not any(
+                        spec.match_file(relative_path)
+                        for spec in ignore_specs):
+                    filepaths.append(relative_path)
+    return filepaths
+
+def get_mtime_ns(stat):
+    """Returns the modification time in nanoseconds from the result of os.stat"""
+    mtime_ns = getattr(stat, "st_mtime_ns", None)
+    if mtime_ns is None:  # python 2 only has the float mtime
+        mtime_ns = int(stat.st_mtime * 1e9)
+    return mtime_ns
+
+def clone_file(src_filepath, dst_filepath):
+    """Copies a file with its metadata, as a reflink sharing the data of the source
+    file until either is changed if the filesystem supports it, else as a copy
+
+    Parameters
+    ----------
+    src_filepath : str
+        path of the file to copy
+    dst_filepath : str
+        path to copy the file to, replaced if it exists
+
+    Returns
+    -------
+    bool
+        True if the file was reflinked, False if it was copied
+    """
+    if fcntl is not None:
+        with open(src_filepath, "rb") as src_file, \
+                open(dst_filepath, "wb") as dst_file:
+            try:
+                fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+                reflinked = True
+            except (IOError, OSError):
+                reflinked = False
+        if reflinked:
+            shutil.copystat(src_filepath, dst_filepath)
+            return True
+    shutil.copy2(src_filepath, dst_filepath)
+    return False
 
 def get_datmo_temp_path(filepath):
     # Create temp directory within .datmo/tmp
@@ -0,0 +1,348 @@
+import io
+import os
+import stat
+import zlib
+import shutil
+import struct
+from io import open
+
+from datmo.core.util.i18n import get as __
+from datmo.core.util.exceptions import FileIOError, PathDoesNotExist
+from datmo.core.util.hashing import get_hasher, DEFAULT_ALGORITHM
+
+class PackStore():
+    """PackStore is a compressed archive of the files and directories of a collection
+
+    Each file is compressed on its own and appended to the data file. The index file
+    holds a record for each file and directory with its mode, length, path and the
+    offset and length of its compressed contents in the data file, so one file is
+    read by decompressing only its own contents, one chunk at a time. The store is
+    written once and never changed, so it should be written to a temp directory
+    which is moved in place once it is complete.
+
+    Parameters
+    ----------
+    dirpath : str
+        path of the directory for the store, created when it is written
+
+    Attributes
+    ----------
+    dirpath : str
+        path of the directory for the store
+
+    Methods
+    -------
+    write(filepaths, dirpaths, algorithm=DEFAULT_ALGORITHM)
+        write files and directories to the store
+    list()
+        list the paths of the files in the store
+    list_dirs()
+        list the paths of the directories in the store
+    getsize(path)
+        return the length of a file in the store
+    open(path, mode="rb")
+        open a file in the store for read
+    extract(dst_dirpath)
+        write the files and directories in the store to a directory
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    DATA_FILENAME = "pack"
+    INDEX_FILENAME = "index"
+    # offset in the data file, compressed length, length, mode, path length
+    INDEX_RECORD = struct.Struct("<QQQII")
+
+    def __init__(self, dirpath):
+        self.dirpath = dirpath
+        self._data_filepath = os.path.join(dirpath, self.DATA_FILENAME)
+        self._index_filepath = os.path.join(dirpath, self.INDEX_FILENAME)
+        self._index = None
+
+    @staticmethod
+    def exists(dirpath):
+        """Returns True if there is a store at the directory path"""
+        return os.path.isfile(os.path.join(dirpath, PackStore.INDEX_FILENAME))
+
+    def write(self, filepaths, dirpaths, algorithm=DEFAULT_ALGORITHM):
+        """Write files and directories to the store, hashing the files as they are
+        compressed. Files are stored in the order entries of a directory are listed,
+        with the files of a directory before its subdirectories
+
+        Parameters
+        ----------
+        filepaths : list
+            list of file tuples of the form (absolute_source_path, relative_dest_path)
+        dirpaths : list
+            relative paths of the directories in the store, including empty ones
+        algorithm : str, optional
+            name of the hash algorithm for the files
+            (default is DEFAULT_ALGORITHM)
+
+        Returns
+        -------
+        list
+            hex digests of the contents written for each of the files, in the same
+            order as the filepaths
+
+        Raises
+        ------
+        FileIOError
+            if a file cannot be read or the store cannot be written
+        """
+        order = sorted(
+            range(len(filepaths)),
+            key=lambda idx: self._get_sort_key(filepaths[idx][1]))
+        filehashes = [None] * len(filepaths)
+        records = []
+        try:
+            if not os.path.isdir(self.dirpath):
+                os.makedirs(self.dirpath)
+            with open(self._data_filepath, "wb") as data_file:
+                for idx in order:
+                    src_filepath, dst_filepath = filepaths[idx]
+                    offset = data_file.tell()
+                    filehash = get_hasher(algorithm)
+                    compressor = zlib.compressobj()
+                    length = 0
+                    with open(src_filepath, "rb") as f:
+                        mode = stat.S_IMODE(os.fstat(f.fileno()).st_mode)
+                        while True:
+                            data = f.read(self.CHUNK_SIZE)
+                            if not data:
+                                break
+                            length += len(data)
+                            filehash.update(data)
+                            data_file.write(compressor.compress(data))
+                    data_file.write(compressor.flush())
+                    filehashes[idx] = filehash.hexdigest()
+                    records.append((offset, data_file.tell() - offset, length,
+                                    stat.S_IFREG | mode, dst_filepath))
+            for dst_dirpath in sorted(
+                    set(self._normalize_path(path) for path in dirpaths)):
+                if dst_dirpath == ".":
+                    continue
+                records.append((0, 0, 0, stat.S_IFDIR | 0o755, dst_dirpath))
+            with open(self._index_filepath, "wb") as f:
+                for offset, compressed_length, length, mode, path in records:
+                    path = self._normalize_path(path).encode("utf-8")
+                    f.write(
+                        self.INDEX_RECORD.pack(offset, compressed_length,
+                                               length, mode, len(path)))
+                    f.write(path)
+        except (IOError, OSError) as e:
+            raise FileIOError(str(e))
+        self._index = None
+        return filehashes
+
+    def list(self):
+        """List the paths of the files in the store, in the order they are stored
+
+        Returns
+        -------
+        list
+            paths of the files relative to the root of the store
+        """
+        return [
+            path for path, (_, _, _, mode) in self._load_index().items()
+            if not stat.S_ISDIR(mode)
+        ]
+
+    def list_dirs(self):
+        """List the paths of the directories in the store
+
+        Returns
+        -------
+        list
+            paths of the directories relative to the root of the store
+        """
+        return [
+            path for path, (_, _, _, mode) in self._load_index().items()
+            if stat.S_ISDIR(mode)
+        ]
+
+    def getsize(self, path):
+        """Return the length of a file in the store
+
+        Raises
+        ------
+        PathDoesNotExist
+            if there is no file at the path in the store
+        """
+        return self._get_record(path)[2]
+
+    def open(self, path, mode="rb"):
+        """Open a file in the store for read, its contents are decompressed as
+        they are read. The caller is responsible for closing it
+
+        Parameters
+        ----------
+        path : str
+            path of the file relative to the root of the store
+        mode : str, optional
+            "rb" to read bytes or "r" to read text
+            (default is "rb")
+
+        Returns
+        -------
+        file object
+            python file object for the file
+
+        Raises
+        ------
+        PathDoesNotExist
+            if there is no file at the path in the store
+        FileIOError
+            if the mode is not a read mode
+        """
+        if mode not in ["r", "rt", "rb"]:
+            raise FileIOError(__("error", "util.pack_store.open.mode", mode))
+        offset, compressed_length, _, _ = self._get_record(path)
+        raw_file = _PackFileReader(self._data_filepath, offset,
+                                   compressed_length, self.CHUNK_SIZE)
+        raw_file.name = os.path.join(self.dirpath, self._normalize_path(path))
+        buffered_file = io.BufferedReader(raw_file)
+        if "b" in mode:
+            return buffered_file
+        return io.TextIOWrapper(buffered_file)
+
+    def extract(self, dst_dirpath):
+        """Write the files and directories in the store to a directory. Files and
+        directories in the directory at the same paths as the top level ones in
+        the store are replaced
+
+        Parameters
+        ----------
+        dst_dirpath : str
+            path of the directory to write to
+
+        Raises
+        ------
+        PathDoesNotExist
+            if the directory does not exist
+        FileIOError
+            if the files cannot be written
+        """
+        if not os.path.isdir(dst_dirpath):
+            raise PathDoesNotExist(
+                __("error", "util.pack_store.extract", dst_dirpath))
+        index = self._load_index()
+        try:
+            for path in set(path.split("/")[0] for path in index):
+                if path in [".", ".."]:
+                    continue
+                dst_path = os.path.join(dst_dirpath, path)
+                if os.path.isdir(dst_path) and not os.path.islink(dst_path):
+                    shutil.rmtree(dst_path)
+                elif os.path.lexists(dst_path):
+                    os.remove(dst_path)
+            for path in self.list_dirs():
+                dst_path = os.path.join(dst_dirpath, *path.split("/"))
+                if not os.path.isdir(dst_path):
+                    os.makedirs(dst_path)
+            for path in self.list():
+                dst_path = os.path.join(dst_dirpath, *path.split("/"))
+                if not os.path.isdir(os.path.dirname(dst_path)):
+                    os.makedirs(os.path.dirname(dst_path))
+                with self.open(path) as src_file, open(dst_path,
+                                                       "wb") as dst_file:
+                    shutil.copyfileobj(src_file, dst_file, self.CHUNK_SIZE)
+                os.chmod(dst_path, stat.S_IMODE(index[path][3]))
+        except (IOError, OSError) as e:
+            raise FileIOError(str(e))
+        return True
+
+    @staticmethod
+    def _normalize_path(path):
+        """Paths are stored with forward slashes on every platform"""
+        return os.path.normpath(path).replace(os.sep, "/")
+
+    @staticmethod
+    def _get_sort_key(path):
+        """Sort the files of a directory before its subdirectories"""
+        parts = PackStore._normalize_path(path).split("/")
+        return [(1, part) for part in parts[:-1]] + [(0, parts[-1])]
+
+    def _get_record(self, path):
+        record = self._load_index().get(self._normalize_path(path))
+        if record is None or stat.S_ISDIR(record[3]):
+            raise PathDoesNotExist(
+                __("error", "util.pack_store.get", (path, self.dirpath)))
+        return record
+
+    def _load_index(self):
+        """Read the index, a dictionary of the paths in the store to a tuple of the
+        offset and compressed length of their contents, their length and mode"""
+        if self._index is not None:
+            return self._index
+        if not self.exists(self.dirpath):
+            raise PathDoesNotExist(
+                __("error", "util.pack_store.get", ("", self.dirpath)))
+        with open(self._index_filepath, "rb") as f:
+            data = f.read()
+        index = {}
+        pos = 0
+        while pos + self.INDEX_RECORD.size <= len(data):
+            offset, compressed_length, length, mode, path_length = \
+                self.INDEX_RECORD.unpack_from(data, pos)
+            pos += self.INDEX_RECORD.size
+            path = data[pos:pos + path_length].decode("utf-8")
+            pos += path_length
+            index[path] = (offset, compressed_length, length, mode)
+        self._index = index
+        return self._index
+
+class _PackFileReader(io.RawIOBase):
+    """Raw reader for the contents of a file in a PackStore, which decompresses
+    at most one chunk at a time. The data file is only opened once the file is
+    read and is closed as soon as all of its compressed contents are read, so
+    files which are opened together do not each hold a file descriptor"""
+
+    def __init__(self, data_filepath, offset, compressed_length, chunk_size):
+        super(_PackFileReader, self).__init__()
+        self._data_filepath = data_filepath
+        self._offset = offset
+        self._file = None
+        self.name = data_filepath
+        self._remaining = compressed_length
+        self._chunk_size = chunk_size
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b""
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self._pos >= len(self._buffer):
+            if self._decompressor.unconsumed_tail:
+                data = self._decompressor.unconsumed_tail
+            elif self._remaining:
+                if self._file is None:
+                    self._file = open(self._data_filepath, "rb")
+                    self._file.seek(self._offset)
+                data = self._file.read(
+                    min(self._chunk_size, self._remaining))
+                if not data:
+                    raise FileIOError(
+                        __("error", "util.pack_store.read", self.name))
+                self._remaining -= len(data)
+                if not self._remaining:
+                    self._close_file()
+            else:
+                return 0
+            self._buffer = self._decompressor.decompress(
+                data, self._chunk_size)
+            self._pos = 0
+        size = min(len(b), len(self._buffer) - self._pos)
+        b[:size] = self._buffer[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_file()
+        super(_PackFileReader, self).close()
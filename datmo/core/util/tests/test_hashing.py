@@ -0,0 +1,162 @@
+"""
+Tests for hashing.py
+"""
+
+import os
+import time
+import hashlib
+import tempfile
+import platform
+import checksumdir
+
+from datmo.core.util import hashing
+from datmo.core.util.hashing import get_workers, get_hasher, get_filehash, \
+    get_filehashes, get_dirhash, get_dirhash_from_filehashes
+from datmo.core.util.exceptions import PathDoesNotExist, InvalidArgumentType
+
+class TestHashing():
+    def setup_method(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.filepaths = []
+        self.contents = []
+        for i in range(20):
+            dirpath = os.path.join(self.temp_dir, "dir_%d" % (i % 3))
+            if not os.path.isdir(dirpath):
+                os.makedirs(dirpath)
+            filepath = os.path.join(dirpath, "file_%d.txt" % i)
+            content = os.urandom(i * 100000)
+            with open(filepath, "wb") as f:
+                f.write(content)
+            self.filepaths.append(filepath)
+            self.contents.append(content)
+
+    def teardown_method(self):
+        os.environ.pop(hashing.WORKERS_ENVIRONMENT_VARIABLE, None)
+
+    def test_get_workers(self):
+        assert get_workers() == (os.cpu_count() or 1)
+        assert get_workers(3) == 3
+        os.environ[hashing.WORKERS_ENVIRONMENT_VARIABLE] = "2"
+        assert get_workers() == 2
+        assert get_workers(4) == 4
+        for workers in [0, "many"]:
+            failed = False
+            try:
+                get_workers(workers)
+            except InvalidArgumentType:
+                failed = True
+            assert failed
+
+    def test_get_hasher(self):
+        assert get_hasher().hexdigest() == hashlib.md5().hexdigest()
+        assert get_hasher("blake2b").hexdigest() == \
+               hashlib.blake2b(digest_size=16).hexdigest()
+        for algorithm in hashing.ALGORITHMS:
+            assert get_hasher(algorithm).hexdigest()
+        failed = False
+        try:
+            get_hasher("crc32")
+        except InvalidArgumentType:
+            failed = True
+        assert failed
+
+    def test_get_filehash(self):
+        for filepath, content in zip(self.filepaths, self.contents):
+            assert get_filehash(filepath) == hashlib.md5(content).hexdigest()
+            assert get_filehash(filepath, algorithm="blake2b") == \
+                   hashlib.blake2b(content, digest_size=16).hexdigest()
+        failed = False
+        try:
+            get_filehash(self.temp_dir)
+        except PathDoesNotExist:
+            failed = True
+        assert failed
+
+    def test_get_filehashes(self):
+        expected_filehashes = [
+            hashlib.md5(content).hexdigest() for content in self.contents
+        ]
+        assert get_filehashes(self.filepaths) == expected_filehashes
+        assert get_filehashes(self.filepaths, workers=1) == \
+               expected_filehashes
+        assert get_filehashes(self.filepaths, workers=8) == \
+               expected_filehashes
+        assert get_filehashes([]) == []
+        assert get_filehashes(self.filepaths, algorithm="sha256") == [
+            hashlib.sha256(content).hexdigest() for content in self.contents
+        ]
+        failed = False
+        try:
+            get_filehashes(self.filepaths, algorithm="crc32")
+        except InvalidArgumentType:
+            failed = True
+        assert failed
+        failed = False
+        try:
+            get_filehashes(
+                self.filepaths + [os.path.join(self.temp_dir, "dne")],
+                workers=4)
+        except PathDoesNotExist:
+            failed = True
+        assert failed
+
+    def test_get_dirhash(self):
+        # Hashes are the same as checksumdir, including for broken links
+        if platform.system() != "Windows":
+            os.symlink(
+                os.path.join(self.temp_dir, "dne"),
+                os.path.join(self.temp_dir, "broken_link"))
+        assert get_dirhash(self.temp_dir) == \
+               checksumdir.dirhash(self.temp_dir)
+        assert get_dirhash(self.temp_dir, workers=1) == \
+               checksumdir.dirhash(self.temp_dir)
+        empty_dirpath = tempfile.mkdtemp(dir=self.temp_dir)
+        assert get_dirhash(empty_dirpath) == \
+               checksumdir.dirhash(empty_dirpath)
+        failed = False
+        try:
+            get_dirhash(self.filepaths[0])
+        except PathDoesNotExist:
+            failed = True
+        assert failed
+
+    def test_get_dirhash_algorithm(self):
+        filehashes = sorted(
+            hashlib.blake2b(content, digest_size=16).hexdigest()
+            for content in self.contents)
+        dirhash = hashlib.blake2b(digest_size=16)
+        for filehash in filehashes:
+            dirhash.update(filehash.encode("utf-8"))
+        assert get_dirhash(self.temp_dir, algorithm="blake2b") == \
+               dirhash.hexdigest()
+        assert get_dirhash(self.temp_dir, algorithm="blake2b") != \
+               get_dirhash(self.temp_dir)
+
+    def test_get_dirhash_from_filehashes(self):
+        for algorithm in ["md5", "blake2b"]:
+            filehashes = get_filehashes(self.filepaths, algorithm=algorithm)
+            assert get_dirhash_from_filehashes(
+                list(reversed(filehashes)), algorithm=algorithm) == \
+                   get_dirhash(self.temp_dir, algorithm=algorithm)
+        assert get_dirhash_from_filehashes([]) == hashlib.md5().hexdigest()
+
+    def test_get_filehash_throughput(self):
+        filepath = os.path.join(self.temp_dir, "large_file")
+        with open(filepath, "wb") as f:
+            for _ in range(64):
+                f.write(os.urandom(1024 * 1024))
+        durations = {}
+        for algorithm in ["md5", "blake2b"]:
+            # best of a few runs so the comparison is not skewed by the page cache
+            durations[algorithm] = []
+            for _ in range(3):
+                start = time.time()
+                get_filehash(filepath, algorithm=algorithm)
+                durations[algorithm].append(time.time() - start)
+        # blake2b is faster than md5 on 64 bit cpus, with margin for noisy runs
+        assert min(durations["blake2b"]) < 1.5 * min(durations["md5"])
@@ -43,6 +43,28 @@ class TestJSONStore():
         storage = JSONStore(self.storage_file)
         assert storage.filepath == self.storage_file
 
+    def test_dumps(self):
+        storage = JSONStore(self.storage_file, initial_dict={"b": 1, "a": "é"})
+        with open(self.storage_file, "rb") as f:
+            assert f.read() == to_bytes(
+                JSONStore.dumps({
+                    "a": "é",
+                    "b": 1
+                }))
+
+    def test_loads(self):
+        assert JSONStore.loads(JSONStore.dumps({"a": "é", "b": 1})) == {
+            "a": "é",
+            "b": 1
+        }
+        assert JSONStore.loads("") == {}
+        failed = False
+        try:
+            JSONStore.loads("{")
+        except FileIOError:
+            failed = True
+        assert failed
+
     def test_save(self):
         storage = JSONStore(self.storage_file)
         storage.save('foobar', 'yep')
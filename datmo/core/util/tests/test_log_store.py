@@ -0,0 +1,142 @@
+"""
+Tests for log_store.py
+"""
+
+import os
+import tempfile
+import platform
+
+from datmo.core.util.log_store import LogStore, LogFile
+from datmo.core.util.exceptions import FileIOError
+
+class TestLogStore():
+    def setup_method(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.dirpath = os.path.join(self.temp_dir, "logs")
+        self.logs = "".join(
+            "epoch %d accuracy:0.%d é\n" % (i, i) for i in range(5000))
+        self.log_store = LogStore(self.dirpath)
+        self.log_store.CHUNK_SIZE = 1024
+
+    def teardown_method(self):
+        pass
+
+    def test_empty(self):
+        assert not LogStore.exists(self.dirpath)
+        assert self.log_store.size == 0
+        assert self.log_store.read() == ""
+        assert self.log_store.tail() == ""
+        assert list(self.log_store.iter_lines()) == []
+        self.log_store.flush()
+        assert not os.path.isdir(self.dirpath)
+
+    def test_append_read(self):
+        for i in range(0, len(self.logs), 100):
+            self.log_store.append(self.logs[i:i + 100])
+        logs_bytes = self.logs.encode("utf-8")
+        # logs which are not flushed yet are read as well
+        assert self.log_store.size == len(logs_bytes)
+        assert self.log_store.read() == self.logs
+        self.log_store.flush()
+        assert LogStore.exists(self.dirpath)
+        # data is compressed
+        assert os.path.getsize(
+            os.path.join(self.dirpath, LogStore.DATA_FILENAME)) < \
+               len(logs_bytes) / 2
+
+        log_store = LogStore(self.dirpath)
+        assert log_store.size == len(logs_bytes)
+        assert log_store.read() == self.logs
+        assert log_store.read(5000, 9000) == \
+               logs_bytes[5000:9000].decode("utf-8", "replace")
+        assert log_store.read(-50) == \
+               logs_bytes[-50:].decode("utf-8", "replace")
+        assert log_store.read(100, 100) == ""
+        assert log_store.read(len(logs_bytes) + 10) == ""
+        assert list(log_store.iter_lines()) == self.logs.split("\n")[:-1]
+
+    def test_tail(self):
+        self.log_store.append(self.logs)
+        self.log_store.flush()
+        log_store = LogStore(self.dirpath)
+        assert log_store.tail(1) == "epoch 4999 accuracy:0.4999 é\n"
+        assert log_store.tail(3) == "".join(self.logs.splitlines(True)[-3:])
+        assert log_store.tail(0) == ""
+        assert log_store.tail(10000) == self.logs
+        log_store.append("no newline")
+        assert log_store.tail(2) == \
+               "epoch 4999 accuracy:0.4999 é\nno newline"
+
+    def test_append_after_interrupted_write(self):
+        self.log_store.append(self.logs)
+        self.log_store.flush()
+        # chunk and index record left partially written
+        with open(os.path.join(self.dirpath, LogStore.DATA_FILENAME),
+                  "ab") as f:
+            f.write(b"partial chunk")
+        with open(os.path.join(self.dirpath, LogStore.INDEX_FILENAME),
+                  "ab") as f:
+            f.write(b"partial")
+        log_store = LogStore(self.dirpath)
+        assert log_store.read() == self.logs
+        log_store.append("last line\n")
+        log_store.flush()
+        assert LogStore(self.dirpath).read() == self.logs + "last line\n"
+
+    def test_append_file(self):
+        filepath = os.path.join(self.temp_dir, "task.log")
+        with open(filepath, "wb") as f:
+            f.write(self.logs.encode("utf-8"))
+        self.log_store.append_file(filepath)
+        assert LogStore(self.dirpath).read() == self.logs
+
+        failed = False
+        try:
+            self.log_store.append_file(
+                os.path.join(self.temp_dir, "does_not_exist.log"))
+        except FileIOError:
+            failed = True
+        assert failed
+
+class TestLogFile():
+    def setup_method(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.filepath = os.path.join(self.temp_dir, "container.log")
+        self.logs = "".join(
+            "epoch %d accuracy:0.%d é\n" % (i, i) for i in range(5000))
+        self.log_file = LogFile(self.filepath)
+        self.log_file.BLOCK_SIZE = 1024
+
+    def teardown_method(self):
+        pass
+
+    def test_read_tail(self):
+        with open(self.filepath, "wb") as f:
+            f.write(self.logs.encode("utf-8"))
+        logs_bytes = self.logs.encode("utf-8")
+        assert self.log_file.size == len(logs_bytes)
+        assert self.log_file.read() == self.logs
+        assert self.log_file.read(10, 30) == \
+            logs_bytes[10:30].decode("utf-8", "replace")
+        assert self.log_file.read(-20) == \
+            logs_bytes[-20:].decode("utf-8", "replace")
+        assert self.log_file.tail(1) == "epoch 4999 accuracy:0.4999 é\n"
+        assert self.log_file.tail(3) == "".join(
+            self.logs.splitlines(True)[-3:])
+        assert self.log_file.tail(0) == ""
+        assert self.log_file.tail(10000) == self.logs
+        # Test logs written while they are read
+        with open(self.filepath, "ab") as f:
+            f.write(b"no newline")
+        assert self.log_file.tail(2) == \
+               "epoch 4999 accuracy:0.4999 é\nno newline"
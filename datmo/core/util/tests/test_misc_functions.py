@@ -7,6 +7,7 @@ import time
 import tempfile
 import platform
 import datetime
+import pathspec
 from pytz import timezone
 from io import open
 try:
@@ -30,7 +31,7 @@ from datmo.core.util.misc_functions import (
     bytes2human, create_unique_hash, mutually_exclusive, is_project_dir,
     find_project_dir, grep, prettify_datetime, format_table,
     parse_cli_key_value, convert_keys_to_string, get_datmo_temp_path,
-    parse_path, parse_paths, list_all_filepaths)
+    parse_path, parse_paths, list_all_filepaths, get_mtime_ns, clone_file)
 
 from datmo.core.util.exceptions import MutuallyExclusiveArguments, RequiredArgumentMissing, InvalidDestinationName, PathDoesNotExist, TooManyArgumentsFound
 
@@ -174,6 +175,46 @@ class TestMiscFunctions():
         assert len(result) == 2
         assert "test.txt" in result
         assert os.path.join("test_dir", "test.txt") in result
+        # Directories matched by the ignore specs are not listed, even if a
+        # negated pattern matches files within them
+        nested_dirpath = os.path.join(dirpath, "nested")
+        os.makedirs(nested_dirpath)
+        with open(os.path.join(nested_dirpath, "keep.txt"), "wb") as f:
+            f.write(to_bytes("test" + "\n"))
+        spec = pathspec.PathSpec.from_lines("gitignore",
+                                            ["test_dir/*", "!keep.txt"])
+        result = list_all_filepaths(self.temp_dir, [spec])
+        assert result == ["test.txt"]
+        spec = pathspec.PathSpec.from_lines("gitignore", ["nested/"])
+        result = list_all_filepaths(self.temp_dir, [spec])
+        assert sorted(result) == [
+            "test.txt", os.path.join("test_dir", "test.txt")
+        ]
+        spec = pathspec.PathSpec.from_lines("gitignore", ["*.txt"])
+        assert list_all_filepaths(self.temp_dir, [spec]) == []
+
+    def test_get_mtime_ns(self):
+        filepath = os.path.join(self.temp_dir, "test.txt")
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("test" + "\n"))
+        os.utime(filepath, (1000000000, 1000000000))
+        assert get_mtime_ns(os.stat(filepath)) == 1000000000 * 10**9
+
+    def test_clone_file(self):
+        filepath = os.path.join(self.temp_dir, "test.txt")
+        with open(filepath, "wb") as f:
+            f.write(to_bytes("test" + "\n"))
+        os.utime(filepath, (1000000000, 1000000000))
+        clone_filepath = os.path.join(self.temp_dir, "clone.txt")
+        reflinked = clone_file(filepath, clone_filepath)
+        assert reflinked in [True, False]
+        assert open(clone_filepath).read() == "test\n"
+        assert os.stat(clone_filepath).st_ino != os.stat(filepath).st_ino
+        assert os.path.getmtime(clone_filepath) == 1000000000
+        # Changes to the clone do not change the source file
+        with open(clone_filepath, "wb") as f:
+            f.write(to_bytes("changed" + "\n"))
+        assert open(filepath).read() == "test\n"
 
     def test_get_datmo_temp_path(self):
         datmo_temp_path = get_datmo_temp_path(self.temp_dir)
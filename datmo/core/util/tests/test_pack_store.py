@@ -0,0 +1,144 @@
+"""
+Tests for pack_store.py
+"""
+
+import os
+import stat
+import tempfile
+import platform
+from io import open
+
+from datmo.core.util.pack_store import PackStore
+from datmo.core.util.hashing import get_filehash
+from datmo.core.util.exceptions import FileIOError, PathDoesNotExist
+
+class TestPackStore():
+    def setup_method(self):
+        # provide mountable tmp directory for docker
+        tempfile.tempdir = "/tmp" if not platform.system(
+        ) == "Windows" else None
+        test_datmo_dir = os.environ.get('TEST_DATMO_DIR',
+                                        tempfile.gettempdir())
+        self.temp_dir = tempfile.mkdtemp(dir=test_datmo_dir)
+        self.dirpath = os.path.join(self.temp_dir, "pack")
+        self.pack_store = PackStore(self.dirpath)
+        self.pack_store.CHUNK_SIZE = 1024
+        self.contents = {
+            "logs.txt":
+                "".join("epoch %d accuracy:0.%d é\n" % (i, i)
+                        for i in range(5000)).encode("utf-8"),
+            os.path.join("outputs", "stats.json"):
+                b'{"accuracy": 0.45}',
+            os.path.join("outputs", "empty.txt"):
+                b""
+        }
+        self.filepaths = []
+        for idx, (path, content) in enumerate(sorted(self.contents.items())):
+            src_filepath = os.path.join(self.temp_dir, "src%d" % idx)
+            with open(src_filepath, "wb") as f:
+                f.write(content)
+            self.filepaths.append((src_filepath, path))
+        self.dirpaths = ["outputs", os.path.join("outputs", "empty_dir")]
+
+    def teardown_method(self):
+        pass
+
+    def test_write(self):
+        assert not PackStore.exists(self.dirpath)
+        filehashes = self.pack_store.write(self.filepaths, self.dirpaths)
+        assert PackStore.exists(self.dirpath)
+        assert filehashes == [
+            get_filehash(src_filepath) for src_filepath, _ in self.filepaths
+        ]
+        # files of a directory are listed before its subdirectories
+        assert self.pack_store.list() == [
+            "logs.txt", "outputs/empty.txt", "outputs/stats.json"
+        ]
+        assert self.pack_store.list_dirs() == [
+            "outputs", "outputs/empty_dir"
+        ]
+        # data is compressed
+        assert os.path.getsize(
+            os.path.join(self.dirpath, PackStore.DATA_FILENAME)) < \
+               len(self.contents["logs.txt"]) / 2
+
+    def test_open(self):
+        self.pack_store.write(self.filepaths, self.dirpaths)
+        pack_store = PackStore(self.dirpath)
+        for path, content in self.contents.items():
+            assert pack_store.getsize(path) == len(content)
+            with pack_store.open(path) as f:
+                assert f.read() == content
+        with pack_store.open("logs.txt", "r") as f:
+            assert f.readline() == "epoch 0 accuracy:0.0 é\n"
+            assert f.read() == \
+                self.contents["logs.txt"].decode("utf-8")[23:]
+        with pack_store.open("logs.txt") as f:
+            assert f.name == os.path.join(self.dirpath, "logs.txt")
+            assert f.read(10) == self.contents["logs.txt"][:10]
+
+        failed = False
+        try:
+            pack_store.open("logs.txt", "w")
+        except FileIOError:
+            failed = True
+        assert failed
+        for path in ["outputs", "missing.txt"]:
+            failed = False
+            try:
+                pack_store.open(path)
+            except PathDoesNotExist:
+                failed = True
+            assert failed
+
+    def test_open_lazy(self):
+        self.pack_store.write(self.filepaths, self.dirpaths)
+        # Test the data file is only open while the contents of a file are read
+        files = [self.pack_store.open(path) for path in self.contents]
+        assert all(f.raw._file is None for f in files)
+        for f, (path, content) in zip(files, self.contents.items()):
+            assert f.read(1) == content[:1]
+            assert f.read() == content[1:]
+            assert f.raw._file is None
+            assert not f.closed
+            f.close()
+
+    def test_open_random_access(self):
+        self.pack_store.write(self.filepaths, self.dirpaths)
+        # Test a file is read without decompressing the files before it
+        with open(os.path.join(self.dirpath, PackStore.DATA_FILENAME),
+                  "r+b") as f:
+            f.write(b"\0" * 10)
+        with self.pack_store.open(os.path.join("outputs",
+                                               "stats.json")) as f:
+            assert f.read() == self.contents[os.path.join(
+                "outputs", "stats.json")]
+
+    def test_extract(self):
+        os.chmod(self.filepaths[0][0], 0o700)
+        self.pack_store.write(self.filepaths, self.dirpaths)
+        dst_dirpath = os.path.join(self.temp_dir, "dst")
+        os.makedirs(os.path.join(dst_dirpath, "outputs", "old_dir"))
+        with open(os.path.join(dst_dirpath, "logs.txt"), "wb") as f:
+            f.write(b"old")
+        with open(os.path.join(dst_dirpath, "other.txt"), "wb") as f:
+            f.write(b"other")
+        assert self.pack_store.extract(dst_dirpath)
+        for path, content in self.contents.items():
+            with open(os.path.join(dst_dirpath, path), "rb") as f:
+                assert f.read() == content
+        assert os.path.isdir(os.path.join(dst_dirpath, "outputs", "empty_dir"))
+        # top level paths in the store are replaced and others are kept
+        assert not os.path.isdir(
+            os.path.join(dst_dirpath, "outputs", "old_dir"))
+        assert os.path.isfile(os.path.join(dst_dirpath, "other.txt"))
+        assert stat.S_IMODE(
+            os.stat(os.path.join(dst_dirpath,
+                                 self.filepaths[0][1])).st_mode) == 0o700
+
+        failed = False
+        try:
+            self.pack_store.extract(os.path.join(self.temp_dir, "missing"))
+        except PathDoesNotExist:
+            failed = True
+        assert failed
@@ -58,19 +58,26 @@ def model_summary(model_name):
         config_keys=config_keys,
         stats_keys=stats_keys)
 
+def _iter_experiments(tasks):
+    for task in tasks:
+        experiment = Run(task)
+        experiment.config_printable = printable_object(experiment.config)
+        experiment.start_time_prettified = prettify_datetime(
+            experiment.start_time)
+        experiment.end_time_prettified = prettify_datetime(experiment.end_time)
+        experiment.results_printable = printable_object(experiment.results)
+        yield experiment
+
 @app.route("/<model_name>/experiments")
 def model_experiments(model_name):
     model = base_controller.model.__dict__
     if model_name == model['name']:
-        tasks = base_controller.dal.task.query({"model_id": model['id']})
-        experiments = [Run(task) for task in tasks]
-        for experiment in experiments:
-            experiment.config_printable = printable_object(experiment.config)
-            experiment.start_time_prettified = prettify_datetime(
-                experiment.start_time)
-            experiment.end_time_prettified = prettify_datetime(
-                experiment.end_time)
-            experiment.results_printable = printable_object(experiment.results)
+        tasks = base_controller.dal.task.query_iter(
+            {
+                "model_id": model['id']
+            }, fields=Run.LIST_FIELDS)
+        # Runs are built one at a time while the page is rendered
+        experiments = _iter_experiments(tasks)
     else:
         experiments = []
     return render_template(
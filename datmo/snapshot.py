@@ -96,6 +96,18 @@ class Snapshot():
         snapshot_controller = SnapshotController()
         return snapshot_controller.get_files(self.id, mode=mode)
 
+    def get_file_entries(self):
+        """Returns a list of file entries for the snapshot, which are only opened
+        when they are asked to
+
+        Returns
+        -------
+        list
+            list of file entries associated with the snapshot
+        """
+        snapshot_controller = SnapshotController()
+        return snapshot_controller.get_file_entries(self.id)
+
     def __eq__(self, other):
         return self.id == other.id if other else False
 
@@ -115,13 +127,14 @@ class Snapshot():
         # Components
         table_data.append(["Code", "-> " + self.code_id])
         table_data.append(["Environment", "-> " + self.environment_id])
-        if not self.files:
+        # Only the names of the files are shown, so they are not opened
+        file_entries = self.get_file_entries()
+        if not file_entries:
             table_data.append(["Files", "-> None"])
         else:
-            table_data.append(["Files", "-> " + self.files[0].name])
-            if len(list(self.files)) > 1:
-                for f in self.files[1:]:
-                    table_data.append(["     ", "-> " + f.name])
+            table_data.append(["Files", "-> " + file_entries[0].name])
+            for file_entry in file_entries[1:]:
+                table_data.append(["     ", "-> " + file_entry.name])
         table_data.append(["Config", "-> " + str(self.config)])
         table_data.append(["Stats", "-> " + str(self.stats)])
         final_str = final_str + format_table(table_data)
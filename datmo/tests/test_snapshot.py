@@ -165,8 +165,7 @@ class TestSnapshotModule():
         assert isinstance(snapshot_obj, Snapshot)
         assert snapshot_obj.message == "my test snapshot"
         assert snapshot_obj.label == "best"
-        assert len(snapshot_obj.files) == 1
-        assert "task.log" in snapshot_obj.files[0].name
+        assert not snapshot_obj.files
         assert snapshot_obj.config == {"foo": "bar"}
         assert snapshot_obj.stats == task_obj.results
 
@@ -181,8 +180,7 @@ class TestSnapshotModule():
         assert isinstance(snapshot_obj, Snapshot)
         assert snapshot_obj_2.message == "my test snapshot"
         assert snapshot_obj_2.label == "best"
-        assert len(snapshot_obj.files) == 1
-        assert "task.log" in snapshot_obj.files[0].name
+        assert not snapshot_obj.files
         assert snapshot_obj_2.config == {"foo": "bar"}
         assert snapshot_obj_2.stats == {"foo": "bar"}
 
@@ -413,6 +411,24 @@ class TestSnapshotModule():
         assert result[0].mode == "r"
         assert "script.py" in result[0].name
 
+    def test_snapshot_entity_get_file_entries(self):
+        core_snapshot_entity = CoreSnapshot(self.input_dict)
+        snapshot_entity = Snapshot(core_snapshot_entity)
+        # Test failure because entity has not been created by controller
+        failed = False
+        try:
+            snapshot_entity.get_file_entries()
+        except DoesNotExist:
+            failed = True
+        assert failed
+        # Test success
+        snapshot_entity = self.__setup()
+        result = snapshot_entity.get_file_entries()
+
+        assert len(result) == 1
+        assert "script.py" in result[0].name
+        assert "script.py" in str(snapshot_entity)
+
     def test_task_entity_get_files(self):
         core_snapshot_entity = CoreSnapshot(self.input_dict)
         snapshot_entity = Snapshot(core_snapshot_entity)
@@ -0,0 +1,63 @@
+"""
+Benchmark of the per call latency of the BlitzDB DAL driver as the database grows
+
+    $ python devtools/benchmark_blitzdb.py --items 20 400 4000 --calls 50
+"""
+
+import time
+import shutil
+import argparse
+import tempfile
+
+from datmo.core.storage.driver.blitzdb_dal_driver import BlitzDBDALDriver
+
+COLLECTION = "snapshot"
+
+def average_latency(database, target_id, calls):
+    """Returns the average seconds of a query and an exists call"""
+    start = time.time()
+    for _ in range(calls):
+        database.query(COLLECTION, {"model_id": "target"})
+        database.exists(COLLECTION, target_id)
+    return (time.time() - start) / calls
+
+def benchmark(items, calls):
+    """Returns the latency for each number of items in the collection"""
+    dirpath = tempfile.mkdtemp()
+    latencies = {}
+    try:
+        database = BlitzDBDALDriver("file", dirpath)
+        target_id = database.set(COLLECTION, {"model_id": "target"})["id"]
+        count = 1
+        for num_items in sorted(items):
+            for i in range(count, num_items):
+                database.set(COLLECTION, {
+                    "model_id": "model_%s" % (i % 5),
+                    "visible": i % 2 == 0
+                })
+            count = max(count, num_items)
+            # warm up the indexes
+            average_latency(database, target_id, 1)
+            latencies[num_items] = average_latency(database, target_id,
+                                                   calls)
+    finally:
+        shutil.rmtree(dirpath)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--items",
+        type=int,
+        nargs="+",
+        default=[20, 400],
+        help="numbers of items in the collection")
+    parser.add_argument(
+        "--calls", type=int, default=50, help="calls timed for each number")
+    args = parser.parse_args()
+    latencies = benchmark(args.items, args.calls)
+    for num_items, latency in sorted(latencies.items()):
+        print("%-10s %10.3f ms" % (num_items, latency * 1000))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark of the throughput of the hash algorithms in datmo.core.util.hashing
+
+    $ python devtools/benchmark_hashing.py --size 512 --runs 3
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from datmo.core.util.hashing import ALGORITHMS, get_filehash
+
+def benchmark(filepath, algorithms, runs):
+    """Returns the best throughput in MB/s of hashing the file with each algorithm"""
+    size = os.path.getsize(filepath) / (1024. * 1024.)
+    throughputs = {}
+    for algorithm in algorithms:
+        durations = []
+        for _ in range(runs):
+            start = time.time()
+            get_filehash(filepath, algorithm=algorithm)
+            durations.append(time.time() - start)
+        throughputs[algorithm] = size / max(min(durations), 1e-9)
+    return throughputs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--size", type=int, default=256, help="size of the file in MB")
+    parser.add_argument(
+        "--runs", type=int, default=3, help="runs of each algorithm")
+    parser.add_argument(
+        "--algorithms",
+        nargs="+",
+        default=sorted(ALGORITHMS),
+        choices=sorted(ALGORITHMS))
+    args = parser.parse_args()
+    fd, filepath = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for _ in range(args.size):
+                f.write(os.urandom(1024 * 1024))
+        throughputs = benchmark(filepath, args.algorithms, args.runs)
+    finally:
+        os.remove(filepath)
+    for algorithm, throughput in sorted(
+            throughputs.items(), key=lambda item: -item[1]):
+        print("%-10s %10.1f MB/s" % (algorithm, throughput))
+
+if __name__ == "__main__":
+    main()